@@ -0,0 +1,87 @@
+"""Report how much memory parsed ASTs take.
+
+Run from the repository root with ``python -m benchmarks.ast_memory [SCRIPT ...]``. Without scripts, a large
+program is generated."""
+import argparse
+import sys
+import tracemalloc
+from collections import Counter
+from dataclasses import fields, is_dataclass
+from pathlib import Path
+
+from pylox.lexer import Lexer
+from pylox.parser import Parser
+from pylox.grammar.token import Token
+
+
+def generate(statements: int) -> str:
+    lines = []
+    for i in range(statements):
+        lines.append(f"var v{i} = ({i} + 1) * 2 - {i} / 3;")
+        lines.append(f'if (v{i} > 10 and v{i} < 1000) {{ print "v" + "{i}"; }} else {{ v{i} = v{i} + 1; }}')
+    return "\n".join(lines)
+
+
+def node_sizes(statements: list) -> tuple[Counter, Counter, int]:
+    """Count the nodes of each type and their shallow sizes, and the size of everything they hold (tokens, lists,
+    literal values), walking the tree without recursion."""
+    counts: Counter = Counter()
+    sizes: Counter = Counter()
+    total = 0
+    seen: set[int] = set()
+    stack = list(statements)
+    total += sys.getsizeof(statements)
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        size = sys.getsizeof(obj)
+        if hasattr(obj, "__dict__"):
+            size += sys.getsizeof(obj.__dict__)
+        total += size
+        if is_dataclass(obj):
+            counts[type(obj).__name__] += 1
+            sizes[type(obj).__name__] += size
+            stack.extend(getattr(obj, f.name) for f in fields(obj))
+        elif isinstance(obj, list):
+            stack.extend(obj)
+        elif isinstance(obj, Token):
+            stack.append(obj.lexeme)
+            stack.append(obj.literal)
+    return counts, sizes, total
+
+
+def report(name: str, source: str):
+    tokens = Lexer(source).scan_tokens()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    statements = Parser(tokens).parse()
+    allocated = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del tokens
+
+    counts, sizes, total = node_sizes(statements)
+    nodes = sum(counts.values())
+    print(f"{name}: {len(source)} chars, {nodes} nodes, {total} bytes reachable from the AST "
+          f"({total / nodes:.1f} per node), {allocated} bytes allocated while parsing")
+    for type_, count in counts.most_common():
+        print(f"    {type_:<12} {count:>9} nodes {sizes[type_] / count:>7.1f} bytes/node")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("scripts", nargs="*", type=Path)
+    parser.add_argument("-n", "--statements", type=int, default=20000,
+                        help="size of the generated program (default: 20000)")
+    args = parser.parse_args()
+
+    if args.scripts:
+        for path in args.scripts:
+            report(str(path), path.read_text())
+    else:
+        report("generated", generate(args.statements))
+
+
+if __name__ == "__main__":
+    main()
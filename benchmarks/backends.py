@@ -0,0 +1,75 @@
+"""Compare the execution backends on a few loop-heavy scripts.
+
+Run from the repository root with ``python -m benchmarks.backends``."""
+import argparse
+from contextlib import redirect_stdout
+from io import StringIO
+from time import perf_counter
+
+from pylox.lexer import Lexer
+from pylox.parser import Parser
+from pylox.interpreter import Interpreter, BACKENDS
+from pylox.resolver import Resolver
+
+
+PROGRAMS = {
+    "arithmetic": """
+var total = 0;
+for (var i = 0; i < 50000; i = i + 1) {
+    total = total + i * 2 % 7 - 1;
+}
+print total;
+""",
+    "comparisons": """
+var count = 0;
+var i = 0;
+while (i < 50000) {
+    if (i > 100 and i <= 40000 or i == 3) count = count + 1;
+    i = i + 1;
+}
+print count;
+""",
+    "nested": """
+var total = 0;
+for (var i = 0; i < 200; i = i + 1) {
+    for (var j = 0; j < 200; j = j + 1) {
+        var k = i + j;
+        total = total + k;
+    }
+}
+print total;
+""",
+}
+
+
+def time_backend(source: str, backend: str, repeat: int) -> float:
+    stmts = Resolver().resolve(Parser(Lexer(source).scan_tokens()).parse())
+    best = float("inf")
+    for _ in range(repeat):
+        interpreter = Interpreter(backend=backend)
+        start = perf_counter()
+        with redirect_stdout(StringIO()):
+            interpreter.interpret(stmts)
+        best = min(best, perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="runs per backend, the best is reported")
+    parser.add_argument("-b", "--backend", action="append", choices=BACKENDS, dest="backends",
+                        help="backend to time, can be repeated (default: all)")
+    args = parser.parse_args()
+    backends = args.backends or list(BACKENDS)
+
+    print(f"{'program':<14}" + "".join(f"{b:>12}" for b in backends) + "   speedup vs tree")
+    for name, source in PROGRAMS.items():
+        times = {b: time_backend(source, b, args.repeat) for b in backends}
+        row = f"{name:<14}" + "".join(f"{times[b]:>11.3f}s" for b in backends)
+        if "tree" in times:
+            row += "   " + ", ".join(f"{b} {times['tree'] / times[b]:.2f}x" for b in backends if b != "tree")
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Time loops that exit early with ``break`` many times, on each backend.
+
+Run from the repository root with ``python -m benchmarks.break_loops``."""
+import argparse
+from contextlib import redirect_stdout
+from io import StringIO
+from time import perf_counter
+
+from pylox.lexer import Lexer
+from pylox.parser import Parser
+from pylox.interpreter import Interpreter, BACKENDS
+from pylox.resolver import Resolver
+
+
+PROGRAMS = {
+    # an inner loop that breaks on its first iteration, from inside nested blocks
+    "immediate": """
+var count = 0;
+for (var i = 0; i < 20000; i = i + 1) {
+    while (true) {
+        { { count = count + 1; break; } }
+    }
+}
+print count;
+""",
+    # an inner loop that runs a few iterations before breaking out of an if
+    "search": """
+var found = 0;
+for (var i = 0; i < 5000; i = i + 1) {
+    var j = 0;
+    while (j < 100) {
+        if (j == i % 7) {
+            found = found + 1;
+            break;
+        }
+        j = j + 1;
+    }
+}
+print found;
+""",
+}
+
+
+def time_program(source: str, backend: str, repeat: int) -> float:
+    stmts = Resolver().resolve(Parser(Lexer(source).scan_tokens()).parse())
+    best = float("inf")
+    for _ in range(repeat):
+        interpreter = Interpreter(backend=backend)
+        start = perf_counter()
+        with redirect_stdout(StringIO()):
+            interpreter.interpret(stmts)
+        best = min(best, perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="runs per backend, the best is reported")
+    args = parser.parse_args()
+
+    print(f"{'program':<12}" + "".join(f"{b:>12}" for b in BACKENDS))
+    for name, source in PROGRAMS.items():
+        print(f"{name:<12}" + "".join(f"{time_program(source, b, args.repeat):>11.3f}s" for b in BACKENDS))
+
+
+if __name__ == "__main__":
+    main()
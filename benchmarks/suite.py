@@ -0,0 +1,230 @@
+"""Time each phase of running a set of representative Lox workloads, and compare the results with a baseline.
+
+Run from the repository root with ``python -m benchmarks.suite``. ``--output results.json`` records the timings,
+and ``--baseline results.json`` compares against an earlier recording, exiting with status 1 when any phase has
+slowed down by more than ``--threshold``."""
+import argparse
+import json
+import platform
+import sys
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+from time import perf_counter
+from typing import Callable, Optional
+
+from pylox import __version__
+from pylox.lexer import Lexer
+from pylox.parser import Parser
+from pylox.interpreter import Interpreter, BACKENDS
+from pylox.optimizer import default_pipeline
+from pylox.resolver import Resolver
+
+
+PHASES = ("lex", "parse", "resolve", "interpret")
+
+
+def nested_loops(scale: int) -> str:
+    n = 30 * scale
+    return f"""
+var total = 0;
+for (var i = 0; i < {n}; i = i + 1) {{
+    for (var j = 0; j < {n}; j = j + 1) {{
+        for (var k = 0; k < 10; k = k + 1) {{
+            total = total + 1;
+        }}
+    }}
+}}
+print total;
+"""
+
+
+def string_concat(scale: int) -> str:
+    return f"""
+var s = "";
+var i = 0;
+while (i < {5000 * scale}) {{
+    s = s + "ab";
+    i = i + 1;
+}}
+print s == "";
+"""
+
+
+def deep_blocks(scale: int) -> str:
+    depth = 40
+    inner = "total = total + a;"
+    for level in range(depth):
+        inner = f"{{ var a = {level}; {inner} }}"
+    return f"""
+var total = 0;
+for (var i = 0; i < {400 * scale}; i = i + 1) {inner}
+print total;
+"""
+
+
+def shadowing(scale: int) -> str:
+    return f"""
+var x = 0;
+var total = 0;
+for (var i = 0; i < {3000 * scale}; i = i + 1) {{
+    var x = i;
+    {{
+        var x = x + 1;
+        {{
+            var x = x * 2;
+            {{
+                var x = x - 1;
+                total = total + x;
+            }}
+        }}
+    }}
+}}
+print total;
+"""
+
+
+def arithmetic_chain(scale: int) -> str:
+    chain = " + ".join(f"(x * {i} - {i} / 2) % 7" for i in range(1, 41))
+    return f"""
+var total = 0;
+for (var x = 0; x < {300 * scale}; x = x + 1) {{
+    total = total + {chain};
+}}
+print total;
+"""
+
+
+def huge_source(scale: int) -> str:
+    lines = []
+    for i in range(1000 * scale):
+        lines.append(f"var v{i} = ({i} + 1) * 2 - {i} / 3;")
+        lines.append(f'if (v{i} > 10 and v{i} < 1000) {{ v{i} = v{i} + 1; }} else {{ v{i} = "v" + "{i}"; }}')
+    return "\n".join(lines)
+
+
+WORKLOADS: dict[str, Callable[[int], str]] = {
+    "nested_loops": nested_loops,
+    "string_concat": string_concat,
+    "deep_blocks": deep_blocks,
+    "shadowing": shadowing,
+    "arithmetic_chain": arithmetic_chain,
+    "huge_source": huge_source,
+}
+
+
+def time_phases(source: str, backend: str = "tree", optimize: bool = True) -> dict[str, float]:
+    """Run ``source`` once, returning how long each phase took in seconds."""
+    times = {}
+
+    start = perf_counter()
+    tokens = Lexer(source).scan_tokens()
+    times["lex"] = perf_counter() - start
+
+    start = perf_counter()
+    stmts = Parser(tokens).parse()
+    times["parse"] = perf_counter() - start
+
+    # optimisation is counted with resolution, as both prepare the tree for the interpreter
+    start = perf_counter()
+    if optimize:
+        stmts = default_pipeline().run(stmts)
+    stmts = Resolver().resolve(stmts)
+    times["resolve"] = perf_counter() - start
+
+    interpreter = Interpreter(backend=backend)
+    start = perf_counter()
+    with redirect_stdout(StringIO()):
+        interpreter.interpret(stmts)
+    times["interpret"] = perf_counter() - start
+
+    return times
+
+
+def run_suite(names: list[str], backend: str = "tree", scale: int = 1, repeat: int = 3,
+              optimize: bool = True) -> dict[str, dict[str, float]]:
+    """Time every workload in ``names``, keeping the best time of ``repeat`` runs for each phase."""
+    results = {}
+    for name in names:
+        source = WORKLOADS[name](scale)
+        best = dict.fromkeys(PHASES, float("inf"))
+        for _ in range(repeat):
+            for phase, t in time_phases(source, backend, optimize).items():
+                best[phase] = min(best[phase], t)
+        results[name] = best
+    return results
+
+
+def compare(results: dict[str, dict[str, float]], baseline: dict[str, dict[str, float]],
+            threshold: float) -> list[tuple[str, str, float]]:
+    """Return the (workload, phase, ratio) of every phase that is more than ``threshold`` slower than the
+    baseline. Workloads or phases missing from the baseline are skipped."""
+    regressions = []
+    for name, phases in results.items():
+        for phase, t in phases.items():
+            old = baseline.get(name, {}).get(phase)
+            if not old:
+                continue
+            if (ratio := t / old) > 1 + threshold:
+                regressions.append((name, phase, ratio))
+    return regressions
+
+
+def format_table(results: dict[str, dict[str, float]], baseline: Optional[dict[str, dict[str, float]]] = None) -> str:
+    lines = [f"{'workload':<18}" + "".join(f"{p:>12}" for p in PHASES) + f"{'total':>12}"]
+    for name, phases in results.items():
+        row = f"{name:<18}" + "".join(f"{phases[p] * 1000:>10.2f}ms" for p in PHASES)
+        row += f"{sum(phases.values()) * 1000:>10.2f}ms"
+        lines.append(row)
+        if baseline is not None and name in baseline:
+            old = baseline[name]
+            lines.append(f"{'  vs baseline':<18}" + "".join(
+                f"{phases[p] / old[p]:>11.2f}x" if old.get(p) else f"{'-':>12}" for p in PHASES))
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("workloads", nargs="*", metavar="WORKLOAD",
+                        help=f"workloads to run (default: all of {', '.join(WORKLOADS)})")
+    parser.add_argument("-b", "--backend", choices=BACKENDS, default="tree")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="runs per workload, the best is reported")
+    parser.add_argument("-s", "--scale", type=int, default=1, help="multiplier for the size of each workload")
+    parser.add_argument("--no-optimize", action="store_false", dest="optimize")
+    parser.add_argument("-o", "--output", type=Path, help="write the results as JSON to this file")
+    parser.add_argument("--baseline", type=Path, help="JSON results from an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="fraction a phase may slow down by before it counts as a regression (default: 0.1)")
+    args = parser.parse_args()
+    if unknown := set(args.workloads) - WORKLOADS.keys():
+        parser.error(f"unknown workloads: {', '.join(sorted(unknown))}")
+
+    results = run_suite(args.workloads or list(WORKLOADS), args.backend, args.scale, args.repeat, args.optimize)
+
+    baseline = None
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text())["results"]
+
+    print(format_table(results, baseline))
+
+    if args.output is not None:
+        args.output.write_text(json.dumps({
+            "pylox": __version__,
+            "python": platform.python_version(),
+            "backend": args.backend,
+            "scale": args.scale,
+            "optimize": args.optimize,
+            "results": results,
+        }, indent=2) + "\n")
+
+    if baseline is not None:
+        if regressions := compare(results, baseline, args.threshold):
+            print("\nregressions:")
+            for name, phase, ratio in regressions:
+                print(f"  {name} {phase}: {ratio:.2f}x slower")
+            sys.exit(1)
+        print("\nno regressions")
+
+
+if __name__ == "__main__":
+    main()
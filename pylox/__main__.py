@@ -1,6 +1,12 @@
 import argparse
+import sys
 
 from .lox import Lox
+from . import batch, cache
+from .interpreter import BACKENDS
+from .limits import Limits
+from .profiler import Profiler
+from .util.dot import AstExport, FORMATS
 
 
 parser = argparse.ArgumentParser(prog="pylox",
@@ -8,20 +14,90 @@ parser = argparse.ArgumentParser(prog="pylox",
 parser.add_argument("-d", "--dot", required=False, default=False, action="store_true", dest="dot",
                     help=("output a graphviz representation of the AST to filename.dot (for files) or cmd.dot "
                           "(for inline scripts). Does not work for REPL"))
+parser.add_argument("--ast-format", required=False, default="dot", choices=FORMATS, dest="ast_format",
+                    help="the format --dot writes the AST in, 'json' writes filename.json instead (default: dot)")
+parser.add_argument("--ast-max-depth", type=int, metavar="N", dest="ast_max_depth",
+                    help="only export the AST --dot writes down to N levels below the top-level statements")
+parser.add_argument("--ast-max-nodes", type=int, metavar="N", dest="ast_max_nodes",
+                    help="stop exporting the AST --dot writes after N nodes")
+parser.add_argument("-b", "--backend", required=False, default="tree", choices=BACKENDS, dest="backend",
+                    help=("the execution backend: 'tree' walks the AST, 'closure' compiles it to nested Python "
+                          "closures, 'vm' compiles it to bytecode for a stack machine (default: tree)"))
+parser.add_argument("--no-optimize", required=False, default=True, action="store_false", dest="optimize",
+                    help=("skip the AST optimiser (constant folding and propagation, dead branch elimination). "
+                          "Combine with --dot to see the unoptimised tree"))
+parser.add_argument("-s", "--stream", required=False, default=False, action="store_true", dest="stream",
+                    help=("run SCRIPT while reading it, executing each top-level declaration as soon as it is parsed. "
+                          "Keeps memory use low for very large scripts. Does not work with --dot"))
+parser.add_argument("--no-cache", required=False, default=True, action="store_false", dest="use_cache",
+                    help=(f"don't read or write the compiled program cache ({cache.CACHE_DIR}/ next to SCRIPT)"))
+parser.add_argument("-p", "--profile", required=False, default=False, action="store_true", dest="profile",
+                    help=("count how often each line and AST node runs and how long it takes, and print a report to "
+                          "stderr when the program ends. Only works with the tree backend"))
+parser.add_argument("--profile-output", type=str, metavar="FILE", dest="profile_output",
+                    help="write the --profile report to FILE instead of stderr")
+parser.add_argument("--max-steps", type=int, metavar="N", dest="max_steps",
+                    help="stop the program after it has run N statements. Tree backend only")
+parser.add_argument("--timeout", type=float, metavar="SECONDS", dest="timeout",
+                    help="stop the program after it has run for SECONDS. Tree backend only")
+parser.add_argument("--max-string-length", type=int, metavar="N", dest="max_string_length",
+                    help="stop the program if it stores a string longer than N characters. Tree backend only")
+parser.add_argument("--max-depth", type=int, metavar="N", dest="max_depth",
+                    help="stop the program if it nests more than N block scopes. Tree backend only")
+parser.add_argument("-j", "--jobs", type=int, metavar="N", dest="jobs",
+                    help="the number of worker processes for --batch (default: one per core)")
+parser.add_argument("--batch-report", type=str, metavar="FILE", dest="batch_report",
+                    help="write the stdout, stderr, exit status and time of each --batch script to FILE as JSON")
 group = parser.add_mutually_exclusive_group()
 group.add_argument("-c", type=str, metavar="CMD", dest="cmd", action="store",
                    help="run an inline Lox script")
 group.add_argument("script", type=str, metavar="SCRIPT", nargs="?",
                    help="the filename of the Lox script to run")
+group.add_argument("--batch", type=str, metavar="TARGET", nargs="+", dest="batch",
+                   help=("run many scripts on a pool of worker processes, each in a fresh interpreter. A TARGET is a "
+                         "directory (every .lox file below it), a .lox file, a manifest file listing one script per "
+                         "line, or a glob pattern"))
 
 args = parser.parse_args()
+if args.stream and (args.dot or not args.script):
+    parser.error("--stream only works with a SCRIPT and without --dot")
+if (args.ast_format != "dot" or args.ast_max_depth is not None or args.ast_max_nodes is not None) and not args.dot:
+    parser.error("--ast-format, --ast-max-depth and --ast-max-nodes only work with --dot")
+if args.profile_output:
+    args.profile = True
+if args.profile and args.backend != "tree":
+    parser.error("--profile only works with the tree backend")
+limits = Limits(max_steps=args.max_steps, timeout=args.timeout, max_string_length=args.max_string_length,
+                max_depth=args.max_depth)
+if limits and args.backend != "tree":
+    parser.error("--max-steps, --timeout, --max-string-length and --max-depth only work with the tree backend")
+if args.batch and (args.dot or args.stream or args.profile or limits):
+    parser.error("--batch doesn't work with --dot, --stream, --profile or limits")
+if (args.jobs or args.batch_report) and not args.batch:
+    parser.error("--jobs and --batch-report only work with --batch")
+
+if args.batch:
+    raise SystemExit(batch.run_cli(args.batch, jobs=args.jobs, backend=args.backend, optimize=args.optimize,
+                                   use_cache=args.use_cache, report_file=args.batch_report))
+
+profiler = Profiler() if args.profile else None
+dot = AstExport(args.ast_format, args.ast_max_depth, args.ast_max_nodes) if args.dot else False
 
 try:
     if args.script:
-        Lox.run_file(path=args.script, dot=args.dot)
+        Lox.run_file(path=args.script, dot=dot, backend=args.backend, optimize=args.optimize,
+                     stream=args.stream, use_cache=args.use_cache, profiler=profiler, limits=limits)
     elif args.cmd:
-        Lox.run_inline(cmd=args.cmd, dot=args.dot)
+        Lox.run_inline(cmd=args.cmd, dot=dot, backend=args.backend, optimize=args.optimize, profiler=profiler,
+                       limits=limits)
     else:
-        Lox.run_repl()
+        Lox.run_repl(backend=args.backend, optimize=args.optimize, profiler=profiler, limits=limits)
 except KeyboardInterrupt:
     raise SystemExit(130)
+finally:
+    if profiler is not None:
+        if args.profile_output:
+            with open(args.profile_output, "w") as f:
+                profiler.report(f)
+        else:
+            profiler.report(sys.stderr)
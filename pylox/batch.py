@@ -0,0 +1,135 @@
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout, redirect_stderr
+from dataclasses import dataclass, asdict
+from glob import glob
+from io import StringIO
+import json
+import os
+from pathlib import Path
+import sys
+from time import perf_counter
+import traceback
+from typing import Iterable, Iterator, Optional
+
+from .lox import Lox
+
+
+# exit status for scripts that crash the interpreter itself, rather than failing with a Lox error
+EX_SOFTWARE = 70
+
+
+@dataclass
+class ScriptResult:
+    path: str
+    status: int
+    stdout: str
+    stderr: str
+    elapsed: float
+
+    @property
+    def ok(self) -> bool:
+        return self.status == 0
+
+
+def collect_scripts(targets: Iterable[str]) -> list[Path]:
+    """Expand each target into the scripts it names. A directory stands for every ``.lox`` file below it, a
+    ``.lox`` file for itself, any other file is a manifest listing one script per line (relative to the manifest,
+    ignoring blank lines and lines starting with #), and anything else is a glob pattern."""
+    scripts = []
+    for target in targets:
+        path = Path(target)
+        if path.is_dir():
+            scripts += sorted(path.rglob("*.lox"))
+        elif path.is_file() and path.suffix == ".lox":
+            scripts.append(path)
+        elif path.is_file():
+            for line in path.read_text().splitlines():
+                if (line := line.strip()) and not line.startswith("#"):
+                    scripts.append(path.parent / line)
+        else:
+            scripts += sorted(Path(p) for p in glob(target, recursive=True))
+    return scripts
+
+
+def run_script(path: Path, backend: str = "tree", optimize: bool = True, use_cache: bool = True) -> ScriptResult:
+    """Run one script in a fresh Lox instance, collecting what it writes and how it exits."""
+    stdout = StringIO()
+    stderr = StringIO()
+    start = perf_counter()
+    with redirect_stdout(stdout), redirect_stderr(stderr):
+        try:
+            Lox.run_file(path, backend=backend, optimize=optimize, use_cache=use_cache)
+            status = 0
+        except SystemExit as e:
+            status = e.code if isinstance(e.code, int) else 1
+        except Exception:
+            traceback.print_exc()
+            status = EX_SOFTWARE
+    return ScriptResult(str(path), status, stdout.getvalue(), stderr.getvalue(), perf_counter() - start)
+
+
+def _run_script(args: tuple) -> ScriptResult:
+    return run_script(*args)
+
+
+def run_batch(scripts: list[Path], jobs: Optional[int] = None, backend: str = "tree", optimize: bool = True,
+              use_cache: bool = True) -> Iterator[ScriptResult]:
+    """Run every script on a pool of ``jobs`` worker processes (one per core by default), yielding the results in
+    the order of ``scripts``."""
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(scripts) <= 1:
+        for script in scripts:
+            yield run_script(script, backend, optimize, use_cache)
+        return
+
+    # hand out scripts in chunks, small scripts take far less time to run than to send to a worker
+    chunksize = max(1, len(scripts) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        yield from pool.map(_run_script, [(script, backend, optimize, use_cache) for script in scripts],
+                            chunksize=chunksize)
+
+
+def summarise(results: list[ScriptResult], elapsed: float) -> dict:
+    failed = [result.path for result in results if not result.ok]
+    busy = sum(result.elapsed for result in results)
+    return {
+        "scripts": len(results),
+        "passed": len(results) - len(failed),
+        "failed": failed,
+        "elapsed": elapsed,
+        # total time spent running scripts, which is more than ``elapsed`` when the workers run in parallel
+        "script_time": busy,
+    }
+
+
+def report(results: list[ScriptResult], summary: dict) -> dict:
+    return {"summary": summary, "results": [asdict(result) for result in results]}
+
+
+def run_cli(targets: list[str], jobs: Optional[int] = None, backend: str = "tree", optimize: bool = True,
+            use_cache: bool = True, report_file: Optional[str] = None) -> int:
+    """Run a batch from the command line, printing a line per script and a summary, and return the exit status."""
+    scripts = collect_scripts(targets)
+    if not scripts:
+        print("No scripts found.", file=sys.stderr)
+        return 1
+
+    start = perf_counter()
+    results = []
+    for result in run_batch(scripts, jobs, backend, optimize, use_cache):
+        results.append(result)
+        print(f"{'ok' if result.ok else f'FAIL({result.status})':<10} {result.elapsed:>8.3f}s  {result.path}")
+        if not result.ok:
+            for line in result.stderr.splitlines():
+                print(f"    {line}")
+    summary = summarise(results, perf_counter() - start)
+
+    print(f"\n{summary['passed']}/{summary['scripts']} scripts passed in {summary['elapsed']:.3f}s "
+          f"({summary['script_time']:.3f}s of script time)")
+
+    if report_file is not None:
+        with open(report_file, "w") as f:
+            json.dump(report(results, summary), f, indent=2)
+            f.write("\n")
+
+    return 0 if not summary["failed"] else 1
@@ -0,0 +1,26 @@
+import asyncio
+
+
+class Budget:
+    """Counts the steps (statements and loop iterations) an asynchronously run program takes, so it can hand
+    control back to the event loop every ``steps`` steps.
+
+    Callers spend a step with ``spend``, and only await ``pause`` when it returns True, so steps between pauses
+    don't cost an await."""
+    __slots__ = ("steps", "remaining", "pauses")
+
+    def __init__(self, steps: int):
+        if steps < 1:
+            raise ValueError("A budget must allow at least one step.")
+        self.steps = steps
+        self.remaining = steps
+        self.pauses = 0
+
+    def spend(self) -> bool:
+        self.remaining -= 1
+        return self.remaining <= 0
+
+    async def pause(self):
+        self.remaining = self.steps
+        self.pauses += 1
+        await asyncio.sleep(0)
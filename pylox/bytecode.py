@@ -0,0 +1,72 @@
+from typing import Any
+
+
+OP_NAMES: list[str] = []
+# number of inline operands following each opcode
+OP_ARGS: list[int] = []
+
+
+def _op(name: str, args: int = 0) -> int:
+    OP_NAMES.append(name)
+    OP_ARGS.append(args)
+    return len(OP_NAMES) - 1
+
+
+# stack
+CONSTANT = _op("CONSTANT", 1)
+POP = _op("POP")
+POPN = _op("POPN", 1)
+
+# variables
+GET_LOCAL = _op("GET_LOCAL", 2)
+SET_LOCAL = _op("SET_LOCAL", 1)
+GET_GLOBAL = _op("GET_GLOBAL", 1)
+SET_GLOBAL = _op("SET_GLOBAL", 1)
+DEFINE_GLOBAL = _op("DEFINE_GLOBAL", 1)
+
+# operators, the operand is the constant index of the operator token for errors
+ADD = _op("ADD", 1)
+SUBTRACT = _op("SUBTRACT", 1)
+MULTIPLY = _op("MULTIPLY", 1)
+DIVIDE = _op("DIVIDE", 1)
+MODULO = _op("MODULO", 1)
+GREATER = _op("GREATER", 1)
+GREATER_EQUAL = _op("GREATER_EQUAL", 1)
+LESS = _op("LESS", 1)
+LESS_EQUAL = _op("LESS_EQUAL", 1)
+EQUAL = _op("EQUAL")
+NOT_EQUAL = _op("NOT_EQUAL")
+NOT = _op("NOT")
+NEGATE = _op("NEGATE", 1)
+
+# statements
+PRINT = _op("PRINT")
+REPR = _op("REPR")
+ECHO = _op("ECHO")
+
+# control flow, the operand is an absolute instruction index
+JUMP = _op("JUMP", 1)
+JUMP_IF_FALSE = _op("JUMP_IF_FALSE", 1)
+JUMP_IF_TRUE = _op("JUMP_IF_TRUE", 1)
+POP_JUMP_IF_FALSE = _op("POP_JUMP_IF_FALSE", 1)
+
+RETURN = _op("RETURN")
+
+
+class Chunk:
+    """A flat instruction stream: opcodes and their operands in ``code``, and the values they refer to in
+    ``constants``."""
+    def __init__(self):
+        self.code: list[int] = []
+        self.constants: list[Any] = []
+
+    def emit(self, *words: int) -> int:
+        self.code.extend(words)
+        return len(self.code) - len(words)
+
+    def add_constant(self, value: Any) -> int:
+        self.constants.append(value)
+        return len(self.constants) - 1
+
+    def __len__(self) -> int:
+        return len(self.code)
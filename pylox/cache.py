@@ -0,0 +1,116 @@
+import hashlib
+import marshal
+import os
+from dataclasses import fields
+from pathlib import Path
+from sys import intern
+from typing import Any, Optional
+
+from . import __version__
+from .grammar import expr, stmt
+from .grammar.literals import TRUE, FALSE, NIL
+from .grammar.token import Token, TOKEN_TYPES, TOKEN_TYPE_INDEX, TokenType
+
+
+MAGIC = b"LOXC"
+FORMAT_VERSION = 2
+CACHE_DIR = "__loxcache__"
+CACHE_TAG = f"pylox-{__version__}"
+
+NODE_CLASSES: list[type] = [
+    expr.Binary, expr.Grouping, expr.Literal, expr.Logical, expr.Unary, expr.Variable, expr.Assign,
+    stmt.Block, stmt.Expression, stmt.Print, stmt.Repr, stmt.Var, stmt.If, stmt.While, stmt.Break,
+]
+NODE_INDEX = {cls: i for i, cls in enumerate(NODE_CLASSES)}
+# Binary nodes that have run are stored as the plain Binary they started as
+NODE_INDEX.update({cls: NODE_INDEX[expr.Binary] for cls in expr.SPECIALISED})
+
+# tuples in the encoded tree start with one of these tags, everything else is stored as is
+TAG_NODE = 0
+TAG_TOKEN = 1
+TAG_TRUE = 2
+TAG_FALSE = 3
+TAG_NIL = 4
+
+
+def cache_path(script: Path) -> Path:
+    return script.parent / CACHE_DIR / f"{script.name}.{CACHE_TAG}.loxc"
+
+
+def source_key(source: str, optimize: bool) -> bytes:
+    """Identifies the program a cache entry was built from, and how."""
+    digest = hashlib.sha256(source.encode())
+    digest.update(f"{CACHE_TAG}:{int(optimize)}".encode())
+    return digest.digest()
+
+
+def load(script: Path, source: str, optimize: bool, path: Optional[Path] = None) -> Optional[list[stmt.Stmt]]:
+    """Return the cached program for ``source``, or None if there is no usable entry. Stale and corrupt entries
+    are treated as missing."""
+    path = path or cache_path(script)
+    try:
+        data = path.read_bytes()
+    except OSError:
+        return None
+
+    header = MAGIC + bytes((FORMAT_VERSION,)) + source_key(source, optimize)
+    if not data.startswith(header):
+        return None
+    try:
+        return [decode(node) for node in marshal.loads(data[len(header):])]
+    except Exception:
+        return None
+
+
+def store(script: Path, source: str, optimize: bool, statements: list[stmt.Stmt], path: Optional[Path] = None):
+    """Write the cache entry for ``source``. Failing to write the cache is not an error."""
+    path = path or cache_path(script)
+    header = MAGIC + bytes((FORMAT_VERSION,)) + source_key(source, optimize)
+    try:
+        payload = marshal.dumps([encode(node) for node in statements])
+        path.parent.mkdir(exist_ok=True)
+        # write to a temporary file first so a concurrent reader never sees half an entry
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp.write_bytes(header + payload)
+        os.replace(tmp, path)
+    except (OSError, ValueError, RecursionError):
+        pass
+
+
+def encode(obj: Any) -> Any:
+    if isinstance(obj, (expr.Expr, stmt.Stmt)):
+        return (TAG_NODE, NODE_INDEX[obj.__class__], *(encode(getattr(obj, f.name)) for f in fields(obj)))
+    elif isinstance(obj, Token):
+        return (TAG_TOKEN, TOKEN_TYPE_INDEX[obj.type], obj.lexeme, obj.line, encode(obj.literal))
+    elif isinstance(obj, list):
+        return [encode(item) for item in obj]
+    elif obj is TRUE:
+        return (TAG_TRUE,)
+    elif obj is FALSE:
+        return (TAG_FALSE,)
+    elif obj is NIL:
+        return (TAG_NIL,)
+    elif obj is None or isinstance(obj, (str, float, int)):
+        return obj
+    raise ValueError(f"Cannot cache {type(obj).__name__}")
+
+
+def decode(obj: Any) -> Any:
+    if isinstance(obj, tuple):
+        tag = obj[0]
+        if tag == TAG_NODE:
+            return NODE_CLASSES[obj[1]](*(decode(val) for val in obj[2:]))
+        elif tag == TAG_TOKEN:
+            type_ = TOKEN_TYPES[obj[1]]
+            lexeme = intern(obj[2]) if type_ is TokenType.IDENTIFIER else obj[2]
+            return Token(type_, lexeme, obj[3], decode(obj[4]))
+        elif tag == TAG_TRUE:
+            return TRUE
+        elif tag == TAG_FALSE:
+            return FALSE
+        elif tag == TAG_NIL:
+            return NIL
+        raise ValueError(f"Unknown tag {tag}")
+    elif isinstance(obj, list):
+        return [decode(item) for item in obj]
+    return obj
@@ -0,0 +1,304 @@
+from functools import singledispatchmethod
+from math import nan
+from operator import sub, mul, mod, gt, ge, lt, le
+from typing import Callable
+
+from .env import Scope, Frame
+from .grammar.expression import Binary, Unary, Literal, Grouping, Variable, Assign, Logical
+from .grammar.literals import TRUE, FALSE, NIL
+from .grammar.statement import Stmt, Print, Repr, Block, Expression, Var, If, While, Break, BREAK
+from .grammar.token import TokenType
+from .util.exceptions import LoxRuntimeError
+from .util.helpers import to_str, to_repr, is_truthy, is_equal, is_string, concat, check_num_operand
+
+
+Closure = Callable[[Scope], object]
+
+
+class ClosureCompiler:
+    """Turns a resolved AST into a tree of Python closures.
+
+    Each closure already holds its children, operator and variable slot, so running it avoids the attribute
+    lookups and operator dispatch that ``eval`` repeats on every evaluation. Like ``Stmt.eval``, statement closures
+    return a Signal, or None when they complete normally."""
+    def compile(self, statements: list[Stmt]) -> list[Closure]:
+        return [self.compile_node(stmt) for stmt in statements]
+
+    # !##### STATEMENTS #####!
+
+    @singledispatchmethod
+    def compile_node(self, node) -> Closure:
+        raise NotImplementedError(f"Cannot compile {type(node).__name__}")
+
+    @compile_node.register
+    def _(self, node: Block) -> Closure:
+        statements = tuple(self.compile_node(stmt) for stmt in node.statements)
+        size = node.size
+
+        if not size:
+            def scopeless_block(env):
+                for stmt in statements:
+                    if (signal := stmt(env)) is not None:
+                        return signal
+                return None
+            return scopeless_block
+
+        def block(env):
+            local_env = Frame(env, size)
+            for stmt in statements:
+                if (signal := stmt(local_env)) is not None:
+                    return signal
+            return None
+        return block
+
+    @compile_node.register
+    def _(self, node: Expression) -> Closure:
+        expression = self.compile_node(node.expression)
+
+        if isinstance(node.expression, Assign):
+            # statements return a Signal or None, so the assigned value mustn't be returned
+            def assign_stmt(env):
+                expression(env)
+            return assign_stmt
+
+        def expression_stmt(env):
+            val = expression(env)
+            if env.repl:
+                env.globals.output.writeline(to_repr(val))
+        return expression_stmt
+
+    @compile_node.register
+    def _(self, node: Print) -> Closure:
+        expression = self.compile_node(node.expression)
+
+        def print_stmt(env):
+            env.globals.output.writeline(to_str(expression(env)))
+        return print_stmt
+
+    @compile_node.register
+    def _(self, node: Repr) -> Closure:
+        expression = self.compile_node(node.expression)
+
+        def repr_stmt(env):
+            env.globals.output.writeline(to_repr(expression(env)))
+        return repr_stmt
+
+    @compile_node.register
+    def _(self, node: Var) -> Closure:
+        name = node.name
+        slot = node.slot
+        initialiser = self.compile_node(node.initialiser) if node.initialiser is not None else None
+
+        if slot is None:
+            def define_global(env):
+                env.globals.define(name, initialiser(env) if initialiser is not None else None)
+            return define_global
+
+        def define_local(env):
+            env.values[slot] = initialiser(env) if initialiser is not None else None
+        return define_local
+
+    @compile_node.register
+    def _(self, node: If) -> Closure:
+        condition = self.compile_node(node.condition)
+        then_branch = self.compile_node(node.then_branch)
+        if node.else_branch is None:
+            def if_stmt(env):
+                if is_truthy(condition(env)):
+                    return then_branch(env)
+                return None
+            return if_stmt
+
+        else_branch = self.compile_node(node.else_branch)
+
+        def if_else_stmt(env):
+            if is_truthy(condition(env)):
+                return then_branch(env)
+            return else_branch(env)
+        return if_else_stmt
+
+    @compile_node.register
+    def _(self, node: While) -> Closure:
+        condition = self.compile_node(node.condition)
+        body = self.compile_node(node.body)
+
+        def while_stmt(env):
+            while is_truthy(condition(env)):
+                if (signal := body(env)) is not None:
+                    if signal is BREAK:
+                        break
+                    return signal
+            return None
+        return while_stmt
+
+    @compile_node.register
+    def _(self, node: Break) -> Closure:
+        def break_stmt(env):
+            return BREAK
+        return break_stmt
+
+    # !##### EXPRESSIONS #####!
+
+    @compile_node.register
+    def _(self, node: Binary) -> Closure:
+        left = self.compile_node(node.left)
+        right = self.compile_node(node.right)
+        operator = node.operator
+        type_ = operator.type
+
+        if type_ is TokenType.PLUS:
+            def add(env):
+                lval = left(env)
+                rval = right(env)
+                if type(lval) is float and type(rval) is float:
+                    return lval + rval
+                if is_string(lval) and is_string(rval):
+                    return concat(lval, rval)
+                raise LoxRuntimeError(operator, "operands must be both numbers or both strings")
+            return add
+        elif type_ is TokenType.EQUAL_EQUAL:
+            def equal(env):
+                return is_equal(left(env), right(env))
+            return equal
+        elif type_ is TokenType.BANG_EQUAL:
+            def not_equal(env):
+                return FALSE if is_equal(left(env), right(env)) is TRUE else TRUE
+            return not_equal
+        elif type_ is TokenType.SLASH:
+            def divide(env):
+                lval = left(env)
+                rval = right(env)
+                check_num_operand(operator, lval, rval)
+                try:
+                    return lval / rval
+                except ZeroDivisionError:
+                    return nan
+            return divide
+
+        try:
+            fn, wrap = NUMERIC_OPS[type_]
+        except KeyError:
+            def unknown(env):
+                left(env)
+                right(env)
+                return NIL
+            return unknown
+
+        if wrap:
+            def compare(env):
+                lval = left(env)
+                rval = right(env)
+                if type(lval) is not float or type(rval) is not float:
+                    raise LoxRuntimeError(operator, "operand must be a number")
+                return TRUE if fn(lval, rval) else FALSE
+            return compare
+
+        def arithmetic(env):
+            lval = left(env)
+            rval = right(env)
+            if type(lval) is not float or type(rval) is not float:
+                raise LoxRuntimeError(operator, "operand must be a number")
+            return fn(lval, rval)
+        return arithmetic
+
+    @compile_node.register
+    def _(self, node: Grouping) -> Closure:
+        return self.compile_node(node.expression)
+
+    @compile_node.register
+    def _(self, node: Literal) -> Closure:
+        value = node.value
+
+        def literal(env):
+            return value
+        return literal
+
+    @compile_node.register
+    def _(self, node: Logical) -> Closure:
+        left = self.compile_node(node.left)
+        right = self.compile_node(node.right)
+
+        if node.operator.type is TokenType.OR:
+            def or_expr(env):
+                if is_truthy(lval := left(env)):
+                    return lval
+                return right(env)
+            return or_expr
+
+        def and_expr(env):
+            if not is_truthy(lval := left(env)):
+                return lval
+            return right(env)
+        return and_expr
+
+    @compile_node.register
+    def _(self, node: Unary) -> Closure:
+        right = self.compile_node(node.right)
+        operator = node.operator
+
+        if operator.type is TokenType.BANG:
+            def not_expr(env):
+                return FALSE if is_truthy(right(env)) else TRUE
+            return not_expr
+        elif operator.type is TokenType.MINUS:
+            def negate(env):
+                val = right(env)
+                check_num_operand(operator, val)
+                return -val
+            return negate
+
+        def unknown(env):
+            right(env)
+            return NIL
+        return unknown
+
+    @compile_node.register
+    def _(self, node: Variable) -> Closure:
+        name = node.name
+        depth = node.depth
+        slot = node.slot
+
+        if slot is None:
+            def get_global(env):
+                return env.globals[name]
+            return get_global
+
+        def get_local(env):
+            if depth:
+                env = env.ancestor(depth)
+            if (val := env.values[slot]) is not None:
+                return val
+            raise LoxRuntimeError(name, f"Uninitialised variable '{name.lexeme}'.")
+        return get_local
+
+    @compile_node.register
+    def _(self, node: Assign) -> Closure:
+        name = node.name
+        depth = node.depth
+        slot = node.slot
+        value = self.compile_node(node.value)
+
+        if slot is None:
+            def assign_global(env):
+                val = value(env)
+                env.globals.assign(name, val)
+                return val
+            return assign_global
+
+        def assign_local(env):
+            val = value(env)
+            (env.ancestor(depth) if depth else env).values[slot] = val
+            return val
+        return assign_local
+
+
+# operator function, and whether the result is a comparison that needs converting to a LoxBool
+NUMERIC_OPS: dict[TokenType, tuple[Callable, bool]] = {
+    TokenType.MINUS: (sub, False),
+    TokenType.STAR: (mul, False),
+    TokenType.PERCENT: (mod, False),
+    TokenType.GREATER: (gt, True),
+    TokenType.GREATER_EQUAL: (ge, True),
+    TokenType.LESS: (lt, True),
+    TokenType.LESS_EQUAL: (le, True),
+}
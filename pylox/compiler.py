@@ -0,0 +1,203 @@
+from functools import singledispatchmethod
+from typing import Optional
+
+from . import bytecode as op
+from .bytecode import Chunk
+from .grammar.expression import Binary, Unary, Literal, Grouping, Variable, Assign, Logical
+from .grammar.statement import Stmt, Print, Repr, Block, Expression, Var, If, While, Break
+from .grammar.token import Token, TokenType
+
+
+BINARY_OPS = {
+    TokenType.PLUS: op.ADD,
+    TokenType.MINUS: op.SUBTRACT,
+    TokenType.STAR: op.MULTIPLY,
+    TokenType.SLASH: op.DIVIDE,
+    TokenType.PERCENT: op.MODULO,
+    TokenType.GREATER: op.GREATER,
+    TokenType.GREATER_EQUAL: op.GREATER_EQUAL,
+    TokenType.LESS: op.LESS,
+    TokenType.LESS_EQUAL: op.LESS_EQUAL,
+}
+
+
+class Loop:
+    def __init__(self, local_count: int):
+        # number of locals live when the loop was entered, the rest must be popped on break
+        self.local_count = local_count
+        self.breaks: list[int] = []
+
+
+class Compiler:
+    """Lowers the statements produced by the Parser into a Chunk for the VM.
+
+    Variables declared inside blocks live in stack slots resolved at compile time, while top-level variables are
+    stored by name in the interpreter's global Env."""
+    def __init__(self, repl: bool = False):
+        self.repl = repl
+
+        self.chunk = Chunk()
+        self.scopes: list[dict[str, int]] = []
+        self.local_count = 0
+        self.loops: list[Loop] = []
+
+    def compile(self, statements: list[Stmt]) -> Chunk:
+        for stmt in statements:
+            self.compile_node(stmt)
+        self.chunk.emit(op.RETURN)
+        return self.chunk
+
+    # !##### STATEMENTS #####!
+
+    @singledispatchmethod
+    def compile_node(self, node):
+        raise NotImplementedError(f"Cannot compile {type(node).__name__}")
+
+    @compile_node.register
+    def _(self, node: Block):
+        self.scopes.append({})
+        for stmt in node.statements:
+            self.compile_node(stmt)
+        scope = self.scopes.pop()
+        if scope:
+            self.chunk.emit(op.POPN, len(scope))
+            self.local_count -= len(scope)
+
+    @compile_node.register
+    def _(self, node: Expression):
+        self.compile_node(node.expression)
+        if self.repl and not isinstance(node.expression, Assign):
+            self.chunk.emit(op.ECHO)
+        else:
+            self.chunk.emit(op.POP)
+
+    @compile_node.register
+    def _(self, node: Print):
+        self.compile_node(node.expression)
+        self.chunk.emit(op.PRINT)
+
+    @compile_node.register
+    def _(self, node: Repr):
+        self.compile_node(node.expression)
+        self.chunk.emit(op.REPR)
+
+    @compile_node.register
+    def _(self, node: Var):
+        if node.initialiser is not None:
+            self.compile_node(node.initialiser)
+        else:
+            self.chunk.emit(op.CONSTANT, self.chunk.add_constant(None))
+
+        if not self.scopes:
+            self.chunk.emit(op.DEFINE_GLOBAL, self.chunk.add_constant(node.name))
+        elif (slot := self.scopes[-1].get(node.name.lexeme)) is not None:
+            # redeclaring a variable in the same scope just overwrites it
+            self.chunk.emit(op.SET_LOCAL, slot)
+            self.chunk.emit(op.POP)
+        else:
+            # the value left on the stack by the initialiser becomes the local's slot
+            self.scopes[-1][node.name.lexeme] = self.local_count
+            self.local_count += 1
+
+    @compile_node.register
+    def _(self, node: If):
+        self.compile_node(node.condition)
+        else_jump = self.emit_jump(op.POP_JUMP_IF_FALSE)
+        self.compile_node(node.then_branch)
+        if node.else_branch is not None:
+            end_jump = self.emit_jump(op.JUMP)
+            self.patch_jump(else_jump)
+            self.compile_node(node.else_branch)
+            self.patch_jump(end_jump)
+        else:
+            self.patch_jump(else_jump)
+
+    @compile_node.register
+    def _(self, node: While):
+        start = len(self.chunk)
+        self.compile_node(node.condition)
+        exit_jump = self.emit_jump(op.POP_JUMP_IF_FALSE)
+
+        loop = Loop(self.local_count)
+        self.loops.append(loop)
+        self.compile_node(node.body)
+        self.loops.pop()
+
+        self.chunk.emit(op.JUMP, start)
+        self.patch_jump(exit_jump)
+        for jump in loop.breaks:
+            self.patch_jump(jump)
+
+    @compile_node.register
+    def _(self, node: Break):
+        loop = self.loops[-1]
+        if (n := self.local_count - loop.local_count) > 0:
+            self.chunk.emit(op.POPN, n)
+        loop.breaks.append(self.emit_jump(op.JUMP))
+
+    # !##### EXPRESSIONS #####!
+
+    @compile_node.register
+    def _(self, node: Binary):
+        self.compile_node(node.left)
+        self.compile_node(node.right)
+        if node.operator.type is TokenType.EQUAL_EQUAL:
+            self.chunk.emit(op.EQUAL)
+        elif node.operator.type is TokenType.BANG_EQUAL:
+            self.chunk.emit(op.NOT_EQUAL)
+        else:
+            self.chunk.emit(BINARY_OPS[node.operator.type], self.chunk.add_constant(node.operator))
+
+    @compile_node.register
+    def _(self, node: Grouping):
+        self.compile_node(node.expression)
+
+    @compile_node.register
+    def _(self, node: Literal):
+        self.chunk.emit(op.CONSTANT, self.chunk.add_constant(node.value))
+
+    @compile_node.register
+    def _(self, node: Logical):
+        self.compile_node(node.left)
+        # the left operand is the result if it short-circuits
+        end_jump = self.emit_jump(op.JUMP_IF_TRUE if node.operator.type is TokenType.OR else op.JUMP_IF_FALSE)
+        self.chunk.emit(op.POP)
+        self.compile_node(node.right)
+        self.patch_jump(end_jump)
+
+    @compile_node.register
+    def _(self, node: Unary):
+        self.compile_node(node.right)
+        if node.operator.type is TokenType.BANG:
+            self.chunk.emit(op.NOT)
+        else:
+            self.chunk.emit(op.NEGATE, self.chunk.add_constant(node.operator))
+
+    @compile_node.register
+    def _(self, node: Variable):
+        if (slot := self.resolve_local(node.name)) is not None:
+            self.chunk.emit(op.GET_LOCAL, slot, self.chunk.add_constant(node.name))
+        else:
+            self.chunk.emit(op.GET_GLOBAL, self.chunk.add_constant(node.name))
+
+    @compile_node.register
+    def _(self, node: Assign):
+        self.compile_node(node.value)
+        if (slot := self.resolve_local(node.name)) is not None:
+            self.chunk.emit(op.SET_LOCAL, slot)
+        else:
+            self.chunk.emit(op.SET_GLOBAL, self.chunk.add_constant(node.name))
+
+    # !##### UTILITY #####!
+
+    def resolve_local(self, name: Token) -> Optional[int]:
+        for scope in reversed(self.scopes):
+            if (slot := scope.get(name.lexeme)) is not None:
+                return slot
+        return None
+
+    def emit_jump(self, opcode: int) -> int:
+        return self.chunk.emit(opcode, -1)
+
+    def patch_jump(self, offset: int):
+        self.chunk.code[offset + 1] = len(self.chunk)
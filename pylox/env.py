@@ -1,15 +1,26 @@
 from collections.abc import MutableMapping
-from typing import Iterator
+from typing import TYPE_CHECKING, Iterator, Optional, Union
 
 from .grammar.token import Token
 from .grammar.literals import AnyLiteral, OptAnyLiteral
+from .output import OutputSink
 from .util.exceptions import LoxRuntimeError
 
+if TYPE_CHECKING:
+    from .limits import LimitUsage
+
 
 class Env(MutableMapping):
-    def __init__(self, enclosing: 'Env' = None, repl: bool = False):
+    def __init__(self, enclosing: 'Env' = None, repl: bool = False, output: OutputSink = None):
         self.enclosing = enclosing
         self.repl = repl
+        self.globals: Env = enclosing.globals if enclosing is not None else self
+        # where print statements write, shared by every scope. Without an Interpreter to flush it, write directly
+        if output is None:
+            output = enclosing.output if enclosing is not None else OutputSink(buffer_size=0)
+        self.output = output
+        # what the program has used of its resource limits, on the global Env of a program that has some
+        self.limits: Optional['LimitUsage'] = None
 
         self._values: dict[str, OptAnyLiteral] = {}
 
@@ -38,6 +49,10 @@ class Env(MutableMapping):
     def define(self, name: Token, value: OptAnyLiteral):
         self._values[name.lexeme] = value
 
+    def peek(self, name: Token) -> OptAnyLiteral:
+        """The value of ``name`` in this Env alone, None if it's uninitialised or not defined here."""
+        return self._values.get(name.lexeme)
+
     def assign(self, name: Token, value: AnyLiteral):
         if name.lexeme in self._values:
             self[name] = value
@@ -46,3 +61,26 @@ class Env(MutableMapping):
                 self.enclosing.assign(name, value)
             else:
                 raise LoxRuntimeError(name, f"Undefined variable '{name.lexeme}'.")
+
+
+class Frame:
+    """Storage for the variables declared directly in one block.
+
+    The Resolver gives every local variable a slot in its block's frame and every use of it a (depth, slot) pair,
+    so lookups index into ``values`` instead of searching by name. Top-level variables stay in the global Env."""
+    __slots__ = ("values", "enclosing", "globals", "repl")
+
+    def __init__(self, enclosing: 'Scope', size: int):
+        self.values: list[OptAnyLiteral] = [None] * size
+        self.enclosing = enclosing
+        self.globals: Env = enclosing.globals
+        self.repl: bool = enclosing.repl
+
+    def ancestor(self, depth: int) -> 'Frame':
+        frame = self
+        for _ in range(depth):
+            frame = frame.enclosing
+        return frame
+
+
+Scope = Union[Env, Frame]
@@ -1,38 +1,68 @@
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from math import nan
+from typing import Optional
 
-from .literals import LoxBool, LoxNil, OptAnyLiteral, AnyLiteral, NotStr
+from .literals import TRUE, FALSE, NIL, OptAnyLiteral, AnyLiteral, NotStr
 from .token import Token, TokenType
 from ..util.exceptions import LoxRuntimeError
-from ..util.helpers import is_truthy, is_equal, check_num_operand
-from ..env import Env
+from ..util.helpers import ROPE_THRESHOLD, is_truthy, is_equal, is_string, concat, check_num_operand
+from ..env import Scope
 
 
 class Expr(ABC):
+    # nodes are slotted dataclasses, so the base must not add a __dict__ either
+    __slots__ = ()
+
     @abstractmethod
-    def eval(self, env: Env):
+    def eval(self, env: Scope):
         pass
 
 
-@dataclass
+@dataclass(slots=True)
 class Binary(Expr):
     left: Expr
     operator: Token
     right: Expr
 
-    def eval(self, env: Env) -> AnyLiteral:
+    def eval(self, env: Scope) -> AnyLiteral:
         left = self.left.eval(env)
         right = self.right.eval(env)
 
+        if type(self) is Binary:
+            self.quicken(left, right)
+        return self.operate(left, right)
+
+    def quicken(self, left, right):
+        """Switch this node to a subclass specialised for its operator and the types of the operands it has just
+        seen, which checks that later operands have the same types. Nodes that can't be specialised, and
+        specialised nodes that see other types, become GenericBinary, which never specialises again."""
+        type_ = self.operator.type
+        if type_ in EQUALITY_SPECIALISED:
+            cls = EQUALITY_SPECIALISED[type_]
+        elif type(left) is float and type(right) is float:
+            cls = FLOAT_SPECIALISED.get(type_, GenericBinary)
+        elif type_ is TokenType.PLUS and is_string(left) and is_string(right):
+            cls = StringConcat
+        else:
+            cls = GenericBinary
+        self.__class__ = cls
+
+    def deoptimise(self, left, right) -> AnyLiteral:
+        # nodes an Instrumenter has switched to a subclass of a specialised class keep their class
+        if type(self) in SPECIALISED:
+            self.__class__ = GenericBinary
+        return self.operate(left, right)
+
+    def operate(self, left, right) -> AnyLiteral:
         if self.operator.type is TokenType.MINUS:
             check_num_operand(self.operator, left, right)
             return left - right
         elif self.operator.type is TokenType.PLUS:
             if isinstance(left, float) and isinstance(right, float):
                 return left + right
-            elif isinstance(left, str) and isinstance(right, str):
-                return left + right
+            elif is_string(left) and is_string(right):
+                return concat(left, right)
             else:
                 raise LoxRuntimeError(self.operator, "operands must be both numbers or both strings")
         elif self.operator.type is TokenType.SLASH:
@@ -50,48 +80,217 @@ class Binary(Expr):
 
         elif self.operator.type is TokenType.GREATER:
             check_num_operand(self.operator, left, right)
-            return LoxBool(left > right)
+            return TRUE if left > right else FALSE
         elif self.operator.type is TokenType.GREATER_EQUAL:
             check_num_operand(self.operator, left, right)
-            return LoxBool(left >= right)
+            return TRUE if left >= right else FALSE
         elif self.operator.type is TokenType.LESS:
             check_num_operand(self.operator, left, right)
-            return LoxBool(left < right)
+            return TRUE if left < right else FALSE
         elif self.operator.type is TokenType.LESS_EQUAL:
             check_num_operand(self.operator, left, right)
-            return LoxBool(left <= right)
+            return TRUE if left <= right else FALSE
 
         elif self.operator.type is TokenType.BANG_EQUAL:
-            return not is_equal(left, right)
+            return FALSE if is_equal(left, right) is TRUE else TRUE
         elif self.operator.type is TokenType.EQUAL_EQUAL:
             return is_equal(left, right)
 
-        return LoxNil()
+        return NIL
+
+
+# !##### SPECIALISED BINARY NODES #####!
+# Binary nodes switch themselves to these subclasses the first time they run, see Binary.quicken. They add no slots,
+# so only the class of a node changes, and they are shown, pickled and copied as plain Binary nodes.
+
+
+class SpecialisedBinary(Binary):
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return repr(Binary(self.left, self.operator, self.right))
 
+    def __reduce__(self):
+        return Binary, (self.left, self.operator, self.right)
 
-@dataclass
+
+class GenericBinary(SpecialisedBinary):
+    __slots__ = ()
+
+
+class FloatAdd(SpecialisedBinary):
+    __slots__ = ()
+
+    def eval(self, env: Scope) -> AnyLiteral:
+        left = self.left.eval(env)
+        right = self.right.eval(env)
+        if type(left) is float and type(right) is float:
+            return left + right
+        return self.deoptimise(left, right)
+
+
+class FloatSubtract(SpecialisedBinary):
+    __slots__ = ()
+
+    def eval(self, env: Scope) -> AnyLiteral:
+        left = self.left.eval(env)
+        right = self.right.eval(env)
+        if type(left) is float and type(right) is float:
+            return left - right
+        return self.deoptimise(left, right)
+
+
+class FloatMultiply(SpecialisedBinary):
+    __slots__ = ()
+
+    def eval(self, env: Scope) -> AnyLiteral:
+        left = self.left.eval(env)
+        right = self.right.eval(env)
+        if type(left) is float and type(right) is float:
+            return left * right
+        return self.deoptimise(left, right)
+
+
+class FloatDivide(SpecialisedBinary):
+    __slots__ = ()
+
+    def eval(self, env: Scope) -> AnyLiteral:
+        left = self.left.eval(env)
+        right = self.right.eval(env)
+        if type(left) is float and type(right) is float:
+            return left / right if right else nan
+        return self.deoptimise(left, right)
+
+
+class FloatModulo(SpecialisedBinary):
+    __slots__ = ()
+
+    def eval(self, env: Scope) -> AnyLiteral:
+        left = self.left.eval(env)
+        right = self.right.eval(env)
+        if type(left) is float and type(right) is float:
+            return left % right
+        return self.deoptimise(left, right)
+
+
+class FloatGreater(SpecialisedBinary):
+    __slots__ = ()
+
+    def eval(self, env: Scope) -> AnyLiteral:
+        left = self.left.eval(env)
+        right = self.right.eval(env)
+        if type(left) is float and type(right) is float:
+            return TRUE if left > right else FALSE
+        return self.deoptimise(left, right)
+
+
+class FloatGreaterEqual(SpecialisedBinary):
+    __slots__ = ()
+
+    def eval(self, env: Scope) -> AnyLiteral:
+        left = self.left.eval(env)
+        right = self.right.eval(env)
+        if type(left) is float and type(right) is float:
+            return TRUE if left >= right else FALSE
+        return self.deoptimise(left, right)
+
+
+class FloatLess(SpecialisedBinary):
+    __slots__ = ()
+
+    def eval(self, env: Scope) -> AnyLiteral:
+        left = self.left.eval(env)
+        right = self.right.eval(env)
+        if type(left) is float and type(right) is float:
+            return TRUE if left < right else FALSE
+        return self.deoptimise(left, right)
+
+
+class FloatLessEqual(SpecialisedBinary):
+    __slots__ = ()
+
+    def eval(self, env: Scope) -> AnyLiteral:
+        left = self.left.eval(env)
+        right = self.right.eval(env)
+        if type(left) is float and type(right) is float:
+            return TRUE if left <= right else FALSE
+        return self.deoptimise(left, right)
+
+
+class StringConcat(SpecialisedBinary):
+    __slots__ = ()
+
+    def eval(self, env: Scope) -> AnyLiteral:
+        left = self.left.eval(env)
+        right = self.right.eval(env)
+        if type(left) is str and type(right) is str and len(left) + len(right) < ROPE_THRESHOLD:
+            return left + right
+        if is_string(left) and is_string(right):
+            return concat(left, right)
+        return self.deoptimise(left, right)
+
+
+class Equal(SpecialisedBinary):
+    # equality works on operands of any type, so there is nothing to guard
+    __slots__ = ()
+
+    def eval(self, env: Scope) -> AnyLiteral:
+        return is_equal(self.left.eval(env), self.right.eval(env))
+
+
+class NotEqual(SpecialisedBinary):
+    __slots__ = ()
+
+    def eval(self, env: Scope) -> AnyLiteral:
+        return FALSE if is_equal(self.left.eval(env), self.right.eval(env)) is TRUE else TRUE
+
+
+FLOAT_SPECIALISED: dict[TokenType, type[SpecialisedBinary]] = {
+    TokenType.PLUS: FloatAdd,
+    TokenType.MINUS: FloatSubtract,
+    TokenType.STAR: FloatMultiply,
+    TokenType.SLASH: FloatDivide,
+    TokenType.PERCENT: FloatModulo,
+    TokenType.GREATER: FloatGreater,
+    TokenType.GREATER_EQUAL: FloatGreaterEqual,
+    TokenType.LESS: FloatLess,
+    TokenType.LESS_EQUAL: FloatLessEqual,
+}
+EQUALITY_SPECIALISED: dict[TokenType, type[SpecialisedBinary]] = {
+    TokenType.EQUAL_EQUAL: Equal,
+    TokenType.BANG_EQUAL: NotEqual,
+}
+SPECIALISED: set[type] = {GenericBinary, StringConcat, *FLOAT_SPECIALISED.values(), *EQUALITY_SPECIALISED.values()}
+
+
+def node_name(node) -> str:
+    """The name of the class of ``node``, as parsed. Specialised Binary nodes are named Binary."""
+    return "Binary" if isinstance(node, SpecialisedBinary) else type(node).__name__
+
+
+@dataclass(slots=True)
 class Grouping(Expr):
     expression: Expr
 
-    def eval(self, env: Env) -> AnyLiteral:
+    def eval(self, env: Scope) -> AnyLiteral:
         return self.expression.eval(env)
 
 
-@dataclass
+@dataclass(slots=True)
 class Literal(Expr):
     value: AnyLiteral
 
-    def eval(self, env: Env) -> AnyLiteral:
+    def eval(self, env: Scope) -> AnyLiteral:
         return self.value
 
 
-@dataclass
+@dataclass(slots=True)
 class Logical(Expr):
     left: Expr
     operator: Token
     right: Expr
 
-    def eval(self, env: Env):
+    def eval(self, env: Scope):
         left = self.left.eval(env)
 
         if self.operator.type == TokenType.OR:
@@ -107,37 +306,54 @@ class Logical(Expr):
         return self.right.eval(env)
 
 
-@dataclass
+@dataclass(slots=True)
 class Unary(Expr):
     operator: Token
     right: Expr
 
-    def eval(self, env: Env) -> NotStr:
+    def eval(self, env: Scope) -> NotStr:
         right = self.right.eval(env)
 
         if self.operator.type is TokenType.BANG:
-            return not is_truthy(right)
+            return FALSE if is_truthy(right) else TRUE
         elif self.operator.type is TokenType.MINUS:
             check_num_operand(self.operator, right)
             return -right
-        return LoxNil()
+        return NIL
 
 
-@dataclass
+@dataclass(slots=True)
 class Variable(Expr):
     name: Token
+    # set by the Resolver, a slot of None means a global
+    depth: Optional[int] = field(default=None, repr=False, compare=False)
+    slot: Optional[int] = field(default=None, repr=False, compare=False)
 
-    def eval(self, env: Env) -> OptAnyLiteral:
-        return env[self.name]
+    def eval(self, env: Scope) -> OptAnyLiteral:
+        if self.slot is None:
+            return env.globals[self.name]
+        if self.depth:
+            env = env.ancestor(self.depth)
+        if (val := env.values[self.slot]) is not None:
+            return val
+        raise LoxRuntimeError(self.name, f"Uninitialised variable '{self.name.lexeme}'.")
 
 
-@dataclass
+@dataclass(slots=True)
 class Assign(Expr):
     name: Token
     value: Expr
+    # set by the Resolver, a slot of None means a global
+    depth: Optional[int] = field(default=None, repr=False, compare=False)
+    slot: Optional[int] = field(default=None, repr=False, compare=False)
 
-    def eval(self, env: Env) -> AnyLiteral:
+    def eval(self, env: Scope) -> AnyLiteral:
         val = self.value.eval(env)
 
-        env.assign(self.name, val)
+        if self.slot is None:
+            env.globals.assign(self.name, val)
+        elif self.depth:
+            env.ancestor(self.depth).values[self.slot] = val
+        else:
+            env.values[self.slot] = val
         return val
@@ -2,21 +2,38 @@ from typing import Union, Optional
 
 
 class LoxBool:
-    def __init__(self, value: bool = False):
-        self.value = value
+    """Lox booleans. There are only ever two instances, TRUE and FALSE, so they can be compared by identity."""
+    __slots__ = ("value",)
+
+    def __new__(cls, value: bool = False) -> 'LoxBool':
+        return TRUE if value else FALSE
 
     def __repr__(self) -> str:
-        return str(self.value).lower()
+        return "true" if self.value else "false"
 
     __str__ = __repr__
 
     def __eq__(self, o: object) -> bool:
+        if isinstance(o, LoxBool):
+            return self is o
         return self.value == o
 
+    def __hash__(self) -> int:
+        return hash(self.value)
+
+    def __bool__(self) -> bool:
+        return self.value
+
+    def __reduce__(self):
+        return LoxBool, (self.value,)
+
 
 class LoxNil:
-    def __init__(self):
-        self.value = None
+    """Lox nil. NIL is the only instance."""
+    __slots__ = ()
+
+    def __new__(cls) -> 'LoxNil':
+        return NIL
 
     def __str__(self) -> str:
         return "nil"
@@ -25,13 +42,83 @@ class LoxNil:
         return "nil"
 
     def __eq__(self, o: object) -> bool:
-        if isinstance(o, LoxNil):
-            return True
-        return o is None
+        return o is self or o is None
+
+    def __hash__(self) -> int:
+        return hash(None)
+
+    def __bool__(self) -> bool:
+        return False
+
+    def __reduce__(self):
+        return LoxNil, ()
+
+    @property
+    def value(self) -> None:
+        return None
+
+
+class LoxRope:
+    """A Lox string built by concatenation, kept as the pieces it was built from until its text is needed.
+
+    Appending to the newest rope built from a list of pieces extends that list in place, so building a string with
+    repeated ``s = s + piece`` takes linear time. Older ropes sharing the list only look at the pieces they had,
+    and copy them if they are appended to themselves. Use ``flatten`` to get the text."""
+    __slots__ = ("parts", "count", "length")
+
+    def __init__(self, parts: list[str], count: int, length: int):
+        self.parts = parts
+        # the number of pieces of ``parts`` that belong to this rope
+        self.count = count
+        self.length = length
+
+    def append(self, text: str) -> 'LoxRope':
+        parts = self.parts
+        if len(parts) != self.count:
+            # a newer rope has already been built from these pieces
+            parts = parts[:self.count]
+        parts.append(text)
+        return LoxRope(parts, self.count + 1, self.length + len(text))
+
+    def flatten(self) -> str:
+        if self.count == 1:
+            return self.parts[0]
+        parts = self.parts if len(self.parts) == self.count else self.parts[:self.count]
+        text = "".join(parts)
+        # keep the text so the pieces aren't joined again, in a new list so that other ropes aren't affected
+        self.parts = [text]
+        self.count = 1
+        return text
+
+    def __str__(self) -> str:
+        return self.flatten()
+
+    def __repr__(self) -> str:
+        return repr(self.flatten())
+
+    def __eq__(self, o: object) -> bool:
+        if isinstance(o, LoxRope):
+            o = o.flatten()
+        return self.flatten() == o
+
+    def __hash__(self) -> int:
+        return hash(self.flatten())
+
+    def __len__(self) -> int:
+        return self.length
 
 
-AnyLiteral = Union[str, float, LoxBool, LoxNil]
+TRUE: LoxBool = object.__new__(LoxBool)
+TRUE.value = True
+FALSE: LoxBool = object.__new__(LoxBool)
+FALSE.value = False
+NIL: LoxNil = object.__new__(LoxNil)
+
+
+AnyLiteral = Union[str, LoxRope, float, LoxBool, LoxNil]
 
 OptAnyLiteral = Optional[AnyLiteral]
 
 NotStr = Union[float, LoxBool, LoxNil]
+
+LoxString = Union[str, LoxRope]
@@ -1,96 +1,159 @@
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional
 
 from ..util.helpers import to_str, to_repr, is_truthy
-from ..util.exceptions import LoxBreakException
 from . import token, expression, literals
-from ..env import Env
+from ..env import Scope, Frame
+from ..budget import Budget
+
+
+class Signal:
+    """Returned by ``Stmt.eval`` when a statement stops the statements enclosing it from running normally, such as
+    ``break``. Statements that complete normally return None, so the common case costs a single identity check.
+    ``value`` is there for signals that carry a result out, like a future ``return``."""
+    __slots__ = ("kind", "value")
+
+    def __init__(self, kind: str, value: literals.OptAnyLiteral = None):
+        self.kind = kind
+        self.value = value
+
+    def __repr__(self) -> str:
+        return f"Signal({self.kind!r}, {self.value!r})"
+
+
+BREAK = Signal("break")
 
 
 class Stmt(ABC):
+    # nodes are slotted dataclasses, so the base must not add a __dict__ either
+    __slots__ = ()
+
     @abstractmethod
-    def eval(self, env: Env):
+    def eval(self, env: Scope) -> Optional[Signal]:
         pass
 
+    async def aeval(self, env: Scope, budget: Budget) -> Optional[Signal]:
+        """Like ``eval``, but pausing whenever ``budget`` runs out. Statements that can't run for long are simply
+        evaluated, only those containing other statements need to override this."""
+        return self.eval(env)
+
 
-@dataclass
+@dataclass(slots=True)
 class Block(Stmt):
     statements: list[Stmt]
+    # set by the Resolver, the size of the Frame this block needs, or 0 if it runs in the enclosing one
+    size: int = field(default=0, repr=False, compare=False)
 
-    def eval(self, env: Env):
-        local_env = Env(env, repl=env.repl)
+    def eval(self, env: Scope) -> Optional[Signal]:
+        local_env = Frame(env, self.size) if self.size else env
 
         for stmt in self.statements:
-            stmt.eval(local_env)
+            if (signal := stmt.eval(local_env)) is not None:
+                return signal
+        return None
 
+    async def aeval(self, env: Scope, budget: Budget) -> Optional[Signal]:
+        local_env = Frame(env, self.size) if self.size else env
 
-@dataclass
+        for stmt in self.statements:
+            if budget.spend():
+                await budget.pause()
+            if (signal := await stmt.aeval(local_env, budget)) is not None:
+                return signal
+        return None
+
+
+@dataclass(slots=True)
 class Expression(Stmt):
     expression: expression.Expr
 
-    def eval(self, env: Env):
+    def eval(self, env: Scope):
         val = self.expression.eval(env)
         if env.repl and not isinstance(self.expression, expression.Assign):
-            print(to_repr(val))
+            env.globals.output.writeline(to_repr(val))
 
 
-@dataclass
+@dataclass(slots=True)
 class Print(Stmt):
     expression: expression.Expr
 
-    def eval(self, env: Env):
-        print(to_str(self.expression.eval(env)))
+    def eval(self, env: Scope):
+        env.globals.output.writeline(to_str(self.expression.eval(env)))
 
 
-@dataclass
+@dataclass(slots=True)
 class Repr(Stmt):
     expression: expression.Expr
 
-    def eval(self, env: Env):
-        print(to_repr(self.expression.eval(env)))
+    def eval(self, env: Scope):
+        env.globals.output.writeline(to_repr(self.expression.eval(env)))
 
 
-@dataclass
+@dataclass(slots=True)
 class Var(Stmt):
     name: token.Token
     initialiser: Optional[expression.Expr]
+    # set by the Resolver, a slot of None means a global
+    slot: Optional[int] = field(default=None, repr=False, compare=False)
 
-    def eval(self, env: Env):
+    def eval(self, env: Scope):
         val: literals.OptAnyLiteral = None
         if self.initialiser is not None:
             val = self.initialiser.eval(env)
 
-        env.define(self.name, val)
+        if self.slot is None:
+            env.globals.define(self.name, val)
+        else:
+            env.values[self.slot] = val
 
 
-@dataclass
+@dataclass(slots=True)
 class If(Stmt):
     condition: expression.Expr
     then_branch: Stmt
     else_branch: Optional[Stmt]
 
-    def eval(self, env: Env):
+    def eval(self, env: Scope) -> Optional[Signal]:
+        if is_truthy(self.condition.eval(env)):
+            return self.then_branch.eval(env)
+        elif self.else_branch is not None:
+            return self.else_branch.eval(env)
+        return None
+
+    async def aeval(self, env: Scope, budget: Budget) -> Optional[Signal]:
         if is_truthy(self.condition.eval(env)):
-            self.then_branch.eval(env)
+            return await self.then_branch.aeval(env, budget)
         elif self.else_branch is not None:
-            self.else_branch.eval(env)
+            return await self.else_branch.aeval(env, budget)
+        return None
 
 
-@dataclass
+@dataclass(slots=True)
 class While(Stmt):
     condition: expression.Expr
     body: Stmt
 
-    def eval(self, env: Env):
-        try:
-            while is_truthy(self.condition.eval(env)):
-                self.body.eval(env)
-        except LoxBreakException:
-            pass
-
-
-@dataclass
+    def eval(self, env: Scope) -> Optional[Signal]:
+        while is_truthy(self.condition.eval(env)):
+            if (signal := self.body.eval(env)) is not None:
+                if signal is BREAK:
+                    break
+                return signal
+        return None
+
+    async def aeval(self, env: Scope, budget: Budget) -> Optional[Signal]:
+        while is_truthy(self.condition.eval(env)):
+            if budget.spend():
+                await budget.pause()
+            if (signal := await self.body.aeval(env, budget)) is not None:
+                if signal is BREAK:
+                    break
+                return signal
+        return None
+
+
+@dataclass(slots=True)
 class Break(Stmt):
-    def eval(self, env: Env):
-        raise LoxBreakException
+    def eval(self, env: Scope) -> Optional[Signal]:
+        return BREAK
@@ -1,5 +1,7 @@
+from array import array
 from enum import Enum, auto
-from typing import Union
+from sys import intern
+from typing import Iterator, Union
 
 from .literals import LoxBool, LoxNil
 
@@ -64,6 +66,8 @@ class TokenType(Enum):
 
 
 class Token:
+    __slots__ = ("type", "lexeme", "literal", "line")
+
     def __init__(self, type_: TokenType, lexeme: str, line: int, literal: Union[str, float, LoxBool, LoxNil] = None):
         self.type = type_
         self.lexeme = lexeme
@@ -76,3 +80,69 @@ class Token:
     def __repr__(self) -> str:
         return (f"{type(self).__name__}(type={self.type.name}, lexeme={self.lexeme!r}, literal={self.literal!r}, "
                 f"line={self.line})")
+
+
+TOKEN_TYPES = list(TokenType)
+TOKEN_TYPE_INDEX = {type_: i for i, type_ in enumerate(TOKEN_TYPES)}
+
+
+class TokenBuffer:
+    """A compact store for a whole token stream.
+
+    Types, offsets and lines are kept in parallel arrays rather than one Token object per token. Lexemes and
+    literals are sliced from the source and identifiers interned only when asked for. Iterating over the buffer
+    yields Token objects one at a time, so a Parser can consume it just like a list of Tokens."""
+    def __init__(self, source: str):
+        self.source = source
+        self.types = array("B")
+        self.starts = array("I")
+        self.ends = array("I")
+        self.lines = array("I")
+
+    def append(self, type_: TokenType, start: int, end: int, line: int):
+        self.types.append(TOKEN_TYPE_INDEX[type_])
+        self.starts.append(start)
+        self.ends.append(end)
+        self.lines.append(line)
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    def type(self, i: int) -> TokenType:
+        return TOKEN_TYPES[self.types[i]]
+
+    def line(self, i: int) -> int:
+        return self.lines[i]
+
+    def lexeme(self, i: int) -> str:
+        text = self.source[self.starts[i]:self.ends[i]]
+        if self.types[i] == IDENTIFIER_INDEX:
+            return intern(text)
+        return text
+
+    def literal(self, i: int) -> Union[str, float, None]:
+        type_ = self.type(i)
+        if type_ is TokenType.NUMBER:
+            return float(self.lexeme(i))
+        elif type_ is TokenType.STRING:
+            return self.source[self.starts[i] + 1:self.ends[i] - 1]
+        elif type_ is TokenType.NAN:
+            return float("nan")
+        elif type_ is TokenType.INFINITY:
+            return float("inf")
+        return None
+
+    def __getitem__(self, i: int) -> Token:
+        return Token(self.type(i), self.lexeme(i), self.lines[i], self.literal(i))
+
+    def __iter__(self) -> Iterator[Token]:
+        for i in range(len(self.types)):
+            yield self[i]
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the token arrays, not counting the source."""
+        return sum(buf.itemsize * len(buf) for buf in (self.types, self.starts, self.ends, self.lines))
+
+
+IDENTIFIER_INDEX = TOKEN_TYPE_INDEX[TokenType.IDENTIFIER]
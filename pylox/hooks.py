@@ -0,0 +1,118 @@
+from typing import Callable, Optional, Sequence
+
+from .grammar.expression import Assign
+from .grammar.statement import Stmt, Var, While
+from .instrument import Instrumenter, Node, defined_value
+
+
+# callback arguments for each event
+EVENTS = {
+    "statement_enter": "(stmt, env)",
+    "statement_exit": "(stmt, env)",
+    "define": "(name, value, env)",
+    "assign": "(name, value, env)",
+    "loop_iteration": "(stmt, env)",
+    "error": "(error)",
+}
+
+
+class Hooks(Instrumenter):
+    """Callbacks run on execution events, for embedders that want to observe a program.
+
+    Programs are only instrumented while at least one callback is registered, and only the node classes involved in
+    an event with callbacks are swapped, so unused events cost nothing. The Interpreter switches the nodes back once
+    the program has run, so the same statements can be run elsewhere without the callbacks. ``define`` and
+    ``assign`` fire for local and global variables alike, with the variable's name token. The wrappers call the
+    ``eval`` they replace, so they stack with the Profiler and resource limits."""
+    def __init__(self):
+        super().__init__()
+        self.callbacks: dict[str, list[Callable]] = {event: [] for event in EVENTS}
+        # the loop whose body each instrumented node is, by the id of the node
+        self.loops: dict[int, While] = {}
+
+    def __bool__(self) -> bool:
+        return any(self.callbacks.values())
+
+    def add(self, event: str, callback: Callable):
+        if event not in EVENTS:
+            raise ValueError(f"Unknown event '{event}', expected one of {', '.join(EVENTS)}.")
+        self.callbacks[event].append(callback)
+        # classes built before this event had callbacks may not fire it
+        self.classes.clear()
+
+    def remove(self, event: str, callback: Callable):
+        self.callbacks[event].remove(callback)
+        # rebuild the classes, so events without callbacks any more stop being wrapped
+        self.classes.clear()
+
+    def register(self, node: Node, line: Optional[int]):
+        if isinstance(node, While):
+            self.loops[id(node.body)] = node
+
+    def uninstrument(self, statements: Sequence[Stmt]):
+        super().uninstrument(statements)
+        self.loops.clear()
+
+    def error(self, err: Exception):
+        for callback in self.callbacks["error"]:
+            callback(err)
+
+    def wrap(self, cls: type) -> Optional[dict]:
+        callbacks = self.callbacks
+        original = cls.eval
+
+        if issubclass(cls, Assign):
+            if not callbacks["assign"]:
+                return None
+            on_assign = callbacks["assign"]
+
+            def eval_assign(self, env):
+                val = original(self, env)
+                for callback in on_assign:
+                    callback(self.name, val, env)
+                return val
+            return {"eval": eval_assign}
+
+        if not issubclass(cls, Stmt):
+            return None
+
+        on_enter = callbacks["statement_enter"]
+        on_exit = callbacks["statement_exit"]
+        on_iteration = callbacks["loop_iteration"]
+        loops = self.loops
+
+        run: Callable = original
+        if issubclass(cls, Var) and callbacks["define"]:
+            on_define = callbacks["define"]
+
+            def eval_var(self, env):
+                original(self, env)
+                val = defined_value(self, env)
+                for callback in on_define:
+                    callback(self.name, val, env)
+            run = eval_var
+
+        if on_enter or on_exit:
+            inner = run
+
+            def eval_stmt(self, env):
+                for callback in on_enter:
+                    callback(self, env)
+                try:
+                    return inner(self, env)
+                finally:
+                    for callback in on_exit:
+                        callback(self, env)
+            run = eval_stmt
+
+        if on_iteration:
+            # an iteration is a run of a loop's body, which can be any statement
+            statement = run
+
+            def eval_body(self, env):
+                if (loop := loops.get(id(self))) is not None:
+                    for callback in on_iteration:
+                        callback(loop, env)
+                return statement(self, env)
+            run = eval_body
+        return None if run is original else {"eval": run}
@@ -0,0 +1,154 @@
+from bisect import bisect_left
+from itertools import islice
+from typing import Optional
+
+from .lexer import Lexer, LOOKAHEAD
+from .parser import Parser
+from .grammar.statement import Stmt
+from .grammar.token import Token
+
+
+class Declaration:
+    """A top-level declaration, and the tokens it was parsed from: ``start`` up to but not including ``end``."""
+    __slots__ = ("stmt", "start", "end")
+
+    def __init__(self, stmt: Stmt, start: int, end: int):
+        self.stmt = stmt
+        self.start = start
+        self.end = end
+
+
+class Document:
+    """Source that is edited over time, kept lexed and parsed with as little work as possible after each edit.
+
+    ``edit`` re-lexes from shortly before the edit until the tokens line up with the old ones again, and re-parses
+    from the first top-level declaration whose tokens (or the token after them, which the parser may have looked at)
+    changed, until a declaration ends where an unchanged old one started. The result is always the same as lexing
+    and parsing the whole source again. Tokens and statements after an edit are reused, with their lines updated
+    in place, so the statements must not be optimised or resolved in place either. Lexing and syntax errors are
+    raised just like a full parse would, and the next edit then starts over from the whole source."""
+    def __init__(self, source: str = "", repl: bool = False):
+        self.source = source
+        self.repl = repl
+
+        self.tokens: Optional[list[Token]] = None
+        # offset in the source of the start of each token
+        self.starts: list[int] = []
+        self.declarations: Optional[list[Declaration]] = None
+
+        self.reparse()
+
+    @property
+    def statements(self) -> list[Stmt]:
+        if self.declarations is None:
+            raise ValueError("The document has errors.")
+        return [declaration.stmt for declaration in self.declarations]
+
+    def reparse(self) -> list[Stmt]:
+        """Lex and parse the whole source."""
+        self.tokens = None
+        self.declarations = None
+        tokens, starts = [], []
+        for token, start in Lexer(self.source).iter_spans():
+            tokens.append(token)
+            starts.append(start)
+        self.tokens, self.starts = tokens, starts
+        self.declarations = self.parse_from(0, [], {}, 0)
+        return self.statements
+
+    def edit(self, offset: int, removed: int, inserted: str) -> list[Stmt]:
+        """Replace ``removed`` characters at ``offset`` with ``inserted``, returning the new statements."""
+        if not 0 <= offset <= offset + removed <= len(self.source):
+            raise ValueError("The edit is outside the source.")
+        old_source = self.source
+        self.source = old_source[:offset] + inserted + old_source[offset + removed:]
+
+        if self.tokens is None:
+            return self.reparse()
+        try:
+            first, last, shift = self.relex(offset, removed, inserted, old_source)
+        except Exception:
+            self.tokens = None
+            self.declarations = None
+            raise
+
+        if self.declarations is None:
+            self.declarations = self.parse_from(0, [], {}, 0)
+            return self.statements
+
+        # declarations that ended, and whose lookahead token ended, before the first changed token are unaffected
+        old = self.declarations
+        self.declarations = None
+        keep = 0
+        while keep < len(old) and old[keep].end < first:
+            keep += 1
+        resume = old[keep - 1].end if keep else 0
+
+        # old declarations starting at or after the first unchanged token can be reused if parsing reaches them
+        reusable = {old[i].start: i for i in range(keep, len(old)) if old[i].start >= last}
+        self.declarations = self.parse_from(resume, old[:keep], reusable, shift, old)
+        return self.statements
+
+    def relex(self, offset: int, removed: int, inserted: str, old_source: str) -> tuple[int, int, int]:
+        """Re-lex the edited part of the source, returning the index of the first old token that changed, the index
+        of the first old token after the edit that is unchanged, and how far later tokens' indices have moved."""
+        tokens = self.tokens
+        assert tokens is not None
+        starts = self.starts
+        delta = len(inserted) - removed
+        line_delta = inserted.count("\n") - old_source.count("\n", offset, offset + removed)
+
+        # a token can depend on up to LOOKAHEAD characters after it, so restart after the last token that ends
+        # further than that before the edit
+        first = bisect_left(range(len(tokens)), offset, key=lambda i: starts[i] + len(tokens[i].lexeme) + LOOKAHEAD)
+        restart = starts[first - 1] + len(tokens[first - 1].lexeme) if first else 0
+
+        lexer = Lexer(self.source)
+        lexer.line = tokens[first - 1].line if first else 1
+        edit_end = offset + len(inserted)
+        new_tokens, new_starts = [], []
+        last = len(tokens)
+        for token, start in lexer.iter_spans(restart):
+            if start >= edit_end and start - delta >= offset + removed:
+                # the old and new source are identical from here, so once a token starts where an old one did,
+                # every token from there on is the same apart from its position
+                index = bisect_left(starts, start - delta, first)
+                if index < len(tokens) - 1 and starts[index] == start - delta:
+                    last = index
+                    break
+            new_tokens.append(token)
+            new_starts.append(start)
+
+        if last == len(tokens):
+            # lexed up to and including the EOF token
+            rest_tokens: list[Token] = []
+            rest_starts: list[int] = []
+        else:
+            rest_tokens = tokens[last:]
+            rest_starts = [start + delta for start in starts[last:]]
+            if line_delta:
+                for token in rest_tokens:
+                    token.line += line_delta
+
+        self.tokens = tokens[:first] + new_tokens + rest_tokens
+        self.starts = starts[:first] + new_starts + rest_starts
+        return first, last, len(new_tokens) - (last - first)
+
+    def parse_from(self, resume: int, declarations: list[Declaration], reusable: dict[int, int], shift: int,
+                   old: Optional[list[Declaration]] = None) -> list[Declaration]:
+        tokens = self.tokens
+        assert tokens is not None
+        parser = Parser(islice(tokens, resume, None), repl=self.repl)
+        start = resume
+        for stmt in parser.parse_iter():
+            end = resume + parser.current
+            declarations.append(Declaration(stmt, start, end))
+            start = end
+            if old is not None and (index := reusable.get(start - shift)) is not None:
+                # parsing has lined up with an unchanged declaration, the rest are the same as before
+                for declaration in old[index:]:
+                    declaration.start += shift
+                    declaration.end += shift
+                    declarations.append(declaration)
+                break
+        return declarations
@@ -0,0 +1,106 @@
+from dataclasses import fields
+from typing import Optional, Sequence, Union
+
+from .env import Scope
+from .grammar.expression import Expr
+from .grammar.literals import OptAnyLiteral
+from .grammar.statement import Stmt, Var
+from .grammar.token import Token
+
+
+Node = Union[Expr, Stmt]
+
+
+def children(node: Node) -> list[Node]:
+    nodes = []
+    for field in fields(node):
+        if not field.repr:
+            continue
+        val = getattr(node, field.name)
+        if isinstance(val, (Expr, Stmt)):
+            nodes.append(val)
+        elif isinstance(val, list):
+            nodes += val
+    return nodes
+
+
+def first_line(node: Node) -> Optional[int]:
+    for field in fields(node):
+        if not field.repr:
+            continue
+        val = getattr(node, field.name)
+        if isinstance(val, Token):
+            return val.line
+        for child in val if isinstance(val, list) else [val]:
+            if isinstance(child, (Expr, Stmt)) and (line := first_line(child)) is not None:
+                return line
+    return None
+
+
+def defined_value(stmt: Var, env: Scope) -> OptAnyLiteral:
+    """The value ``stmt`` has just given its variable, so wrappers can call the original ``eval`` and then look."""
+    if stmt.slot is None:
+        return env.globals.peek(stmt.name)
+    return env.values[stmt.slot]  # type: ignore
+
+
+class Instrumenter:
+    """Switches the class of the nodes of a program to subclasses that wrap ``eval``.
+
+    The subclasses add no slots, so the layout of a node is unchanged and its ``__class__`` can be reassigned.
+    Programs that are never instrumented keep running the original ``eval`` methods, with no overhead at all.
+    Subclasses implement ``wrap`` to build the instrumented class for a node class, returning None to leave it
+    alone, and can override ``register`` to record each node as it is instrumented. Clearing ``classes`` makes the
+    next ``instrument`` rebuild the classes of nodes that were already instrumented."""
+    def __init__(self):
+        # the class to switch nodes of each class to, which is the class itself if it isn't instrumented
+        self.classes: dict[type, type] = {}
+        self.instrumented: set[type] = set()
+
+    def instrument(self, statements: Sequence[Stmt]):
+        for stmt in statements:
+            self.instrument_node(stmt, None)
+
+    def instrument_node(self, node: Node, line: Optional[int]):
+        # nodes without a token of their own, such as literals, are attributed to the line of their parent
+        if (first := first_line(node)) is not None:
+            line = first
+        for child in children(node):
+            self.instrument_node(child, line)
+
+        cls = type(node)
+        if cls in self.instrumented:
+            # instrumented before, rebuild it from the class it was made from in case ``classes`` has changed
+            cls = cls.__base__
+        if cls not in self.classes:
+            if (attrs := self.wrap(cls)) is not None:
+                instrumented = type(cls.__name__, (cls,), {"__slots__": (), "__qualname__": cls.__qualname__, **attrs})
+                self.instrumented.add(instrumented)
+                self.classes[cls] = instrumented
+            else:
+                self.classes[cls] = cls
+
+        if (instrumented := self.classes[cls]) is not type(node) and self.select(node):
+            if instrumented is not cls:
+                self.register(node, line)
+            node.__class__ = instrumented
+
+    def uninstrument(self, statements: Sequence[Stmt]):
+        """Switch the nodes of a program that ``instrument`` switched back to their original classes."""
+        nodes: list[Node] = list(statements)
+        while nodes:
+            node = nodes.pop()
+            if type(node) in self.instrumented:
+                node.__class__ = type(node).__base__
+            nodes += children(node)
+
+    def wrap(self, cls: type) -> Optional[dict]:
+        """The attributes, usually just ``eval``, to override in the instrumented subclass of ``cls``."""
+        raise NotImplementedError
+
+    def select(self, node: Node) -> bool:
+        """Whether to switch ``node`` to the instrumented subclass of its class, if there is one."""
+        return True
+
+    def register(self, node: Node, line: Optional[int]):
+        pass
@@ -1,11 +1,121 @@
+from typing import Callable, Optional, Sequence, Union
+
+from .budget import Budget
+from .bytecode import Chunk
+from .closures import ClosureCompiler, Closure
+from .compiler import Compiler
 from .env import Env
 from .grammar.statement import Stmt
+from .hooks import Hooks
+from .limits import Limits, LimitEnforcer, LimitUsage
+from .output import OutputSink
+from .util.exceptions import LoxException
+from .vm import VM
+
+
+BACKENDS = ("tree", "closure", "vm")
+
+# statements for the tree backend, closures for the closure backend or a Chunk for the vm
+Code = Union[tuple[Stmt, ...], tuple[Closure, ...], Chunk]
 
 
 class Interpreter:
-    def __init__(self) -> None:
-        self.env = Env(repl=True)
+    def __init__(self, backend: str = "tree", output: Optional[OutputSink] = None,
+                 limits: Optional[Limits] = None) -> None:
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}', expected one of {', '.join(BACKENDS)}.")
+        self.backend = backend
+        # what the program prints is buffered, and flushed whenever interpret returns or raises
+        self.output = output if output is not None else OutputSink()
+        self.env = Env(repl=True, output=self.output)
+        self.hooks = Hooks()
+
+        # limits are enforced by instrumenting the program, so only cost anything when some are set
+        self.limits: Optional[LimitEnforcer] = None
+        if limits:
+            if backend != "tree":
+                raise ValueError("Resource limits are only supported by the 'tree' backend.")
+            self.limits = LimitEnforcer(limits)
+            self.env.limits = LimitUsage(limits)
+
+    def add_hook(self, event: str, callback: Callable):
+        """Call ``callback`` on each ``event``, one of ``hooks.EVENTS``. Hooks observe the tree-walking evaluator,
+        so they aren't supported by the other backends."""
+        if self.backend != "tree":
+            raise ValueError("Hooks are only supported by the 'tree' backend.")
+        self.hooks.add(event, callback)
+
+    def remove_hook(self, event: str, callback: Callable):
+        self.hooks.remove(event, callback)
+
+    def restart_limits(self):
+        """Give the resource limits a fresh budget, for a new program. Until then, everything this Interpreter runs
+        shares the budget started when it first ran something."""
+        if self.env.limits is not None:
+            self.env.limits.start()
 
     def interpret(self, statements: list[Stmt]):
-        for stmt in statements:
-            stmt.eval(self.env)
+        self.execute(self.compile(statements))
+
+    async def interpret_async(self, statements: list[Stmt], budget: int = 1000):
+        """Run ``statements`` as a coroutine that lets other tasks run every ``budget`` steps (statements and loop
+        iterations), so a long-running program doesn't block the event loop. Only the tree backend can pause, and
+        hooks aren't called."""
+        if self.backend != "tree":
+            raise ValueError("Asynchronous execution is only supported by the 'tree' backend.")
+        if self.limits is not None:
+            raise ValueError("Resource limits aren't supported by asynchronous execution.")
+        if self.hooks:
+            raise ValueError("Hooks aren't supported by asynchronous execution.")
+
+        steps = Budget(budget)
+        try:
+            for stmt in statements:
+                if steps.spend():
+                    await steps.pause()
+                await stmt.aeval(self.env, steps)
+        finally:
+            self.output.flush()
+
+    def compile(self, statements: list[Stmt]) -> Code:
+        """Translate resolved statements into what the backend runs. The result doesn't depend on this
+        Interpreter's state, so ``execute`` on any Interpreter with the same backend can run it, any number of times.
+        Running it only changes the classes of its Binary nodes to equivalent specialised ones (see
+        ``Binary.quicken``)."""
+        if self.backend == "vm":
+            return Compiler(repl=self.env.repl).compile(statements)
+        elif self.backend == "closure":
+            return tuple(ClosureCompiler().compile(statements))
+        return tuple(statements)
+
+    def execute(self, code: Code):
+        try:
+            if self.backend == "vm":
+                VM(self.env).run(code)  # type: ignore
+            elif self.backend == "closure":
+                for closure in code:  # type: ignore
+                    closure(self.env)
+            elif self.hooks or self.limits is not None:
+                self.run_instrumented(code)  # type: ignore
+            else:
+                for stmt in code:  # type: ignore
+                    stmt.eval(self.env)
+        finally:
+            self.output.flush()
+
+    def run_instrumented(self, statements: Sequence[Stmt]):
+        # the statements may belong to the caller, and be run by other Interpreters later
+        instrumenters = [instrumenter for instrumenter in (self.limits, self.hooks) if instrumenter]
+        if self.env.limits is not None and not self.env.limits.started:
+            self.env.limits.start()
+        for instrumenter in instrumenters:
+            instrumenter.instrument(statements)
+        try:
+            for stmt in statements:
+                stmt.eval(self.env)
+        except LoxException as e:
+            self.hooks.error(e)
+            raise
+        finally:
+            for instrumenter in reversed(instrumenters):
+                instrumenter.uninstrument(statements)
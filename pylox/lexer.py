@@ -1,7 +1,9 @@
-from typing import Any
+import re
+from sys import intern
+from typing import Any, Iterable, Iterator, Optional, TextIO
 
 from .util.exceptions import LoxParseError
-from .grammar.token import Token, TokenType
+from .grammar.token import Token, TokenBuffer, TokenType
 
 
 KWDS = {
@@ -28,174 +30,153 @@ KWDS = {
 }
 
 
+OPERATORS = {
+    "(": TokenType.LEFT_PAREN,
+    ")": TokenType.RIGHT_PAREN,
+    "{": TokenType.LEFT_BRACE,
+    "}": TokenType.RIGHT_BRACE,
+    ",": TokenType.COMMA,
+    ".": TokenType.DOT,
+    "-": TokenType.MINUS,
+    "+": TokenType.PLUS,
+    ";": TokenType.SEMICOLON,
+    "*": TokenType.STAR,
+    "%": TokenType.PERCENT,
+    "/": TokenType.SLASH,
+    "!": TokenType.BANG,
+    "!=": TokenType.BANG_EQUAL,
+    "=": TokenType.EQUAL,
+    "==": TokenType.EQUAL_EQUAL,
+    "<": TokenType.LESS,
+    "<=": TokenType.LESS_EQUAL,
+    ">": TokenType.GREATER,
+    ">=": TokenType.GREATER_EQUAL,
+}
+
+# every alternative is tried in order at the current position, so each match is one whole lexeme
+TOKEN_RE = re.compile(r"""
+    (?P<space>[ \t\r]+)
+  | (?P<newline>\n+)
+  | (?P<identifier>[A-Za-z_][A-Za-z0-9_]*)
+  | (?P<line_comment>//[^\n]*)
+  | (?P<block_comment>/\*.*?\*/)
+  | (?P<unterminated_comment>/\*)
+  | (?P<operator>[!=<>]=?|[-(){},.+;*/%])
+  | (?P<number>[0-9]+(?:\.[0-9]+)?(?:e[0-9]+)?(?:e[+-][0-9]+)?)
+  | (?P<string>"[^"]*")
+  | (?P<unterminated_string>")
+  | (?P<error>.)
+""", re.VERBOSE | re.DOTALL)
+
+
+# a match ending this close to the end of a partially read buffer might continue into the next chunk
+LOOKAHEAD = 4
+
+CHUNK_SIZE = 64 * 1024
+
+
 class Lexer:
-    def __init__(self, source: str):
+    def __init__(self, source: str = "", chunks: Optional[Iterable[str]] = None):
         self.source = source
+        self.chunks = chunks
         self.tokens: list[Token] = []
-        self.start = 0
-        self.current = 0
         self.line = 1
 
-    def scan_tokens(self) -> list[Token]:
-        while not self.is_at_end():
-            self.start = self.current
-            self.scan_token()
+    @classmethod
+    def from_file(cls, file: TextIO, chunk_size: int = CHUNK_SIZE) -> 'Lexer':
+        """Create a Lexer that reads ``file`` lazily, ``chunk_size`` characters at a time, when used with
+        ``iter_tokens``."""
+        return cls(chunks=iter(lambda: file.read(chunk_size), ""))
 
-        self.tokens.append(Token(TokenType.EOF, "", self.line))
+    def scan_tokens(self) -> list[Token]:
+        self.tokens.extend(self.iter_tokens())
         return self.tokens
 
-    def scan_token(self) -> Token:  # type: ignore
-        c = self.advance()
-
-        if c == "(":
-            self.add_token(TokenType.LEFT_PAREN)
-        elif c == ")":
-            self.add_token(TokenType.RIGHT_PAREN)
-        elif c == "{":
-            self.add_token(TokenType.LEFT_BRACE)
-        elif c == "}":
-            self.add_token(TokenType.RIGHT_BRACE)
-        elif c == ",":
-            self.add_token(TokenType.COMMA)
-        elif c == ".":
-            self.add_token(TokenType.DOT)
-        elif c == "-":
-            self.add_token(TokenType.MINUS)
-        elif c == "+":
-            self.add_token(TokenType.PLUS)
-        elif c == ";":
-            self.add_token(TokenType.SEMICOLON)
-        elif c == "*":
-            self.add_token(TokenType.STAR)
-        elif c == "%":
-            self.add_token(TokenType.PERCENT)
-        elif c == "!":
-            self.add_token(TokenType.BANG_EQUAL if self.match("=") else TokenType.BANG)
-        elif c == "=":
-            self.add_token(TokenType.EQUAL_EQUAL if self.match("=") else TokenType.EQUAL)
-        elif c == "<":
-            self.add_token(TokenType.LESS_EQUAL if self.match("=") else TokenType.LESS)
-        elif c == ">":
-            self.add_token(TokenType.GREATER_EQUAL if self.match("=") else TokenType.GREATER)
-        elif c == "/":
-            if self.match("/"):
-                while self.peek() != "\n" and not self.is_at_end():
-                    self.advance()
-            elif self.match("*"):
-                while self.peek() + self.peek(2) != "*/" and not self.is_at_end():
-                    if self.peek() == "\n":
-                        self.line += 1
-                    self.advance()
-
-                if self.is_at_end():
-                    raise LoxParseError(self.line, "Unterminated comment.")
-
-                # two more times to consume the closing */
-                self.advance()
-                self.advance()
+    def iter_tokens(self) -> Iterator[Token]:
+        for type_, text, line, literal, _ in self._scan():
+            yield Token(type_, text, line, literal)
+
+    def iter_spans(self, start: int = 0) -> Iterator[tuple[Token, int]]:
+        """Like ``iter_tokens``, but yielding each token with its offset in the source. Scanning can begin part way
+        through the source at ``start``, which must be the end of a token, with ``line`` set to the line there."""
+        for type_, text, line, literal, offset in self._scan(start):
+            yield Token(type_, text, line, literal), offset
+
+    def scan_buffer(self) -> TokenBuffer:
+        """Scan the whole source into a compact TokenBuffer instead of a list of Tokens."""
+        buffer = TokenBuffer(self.source)
+        append = buffer.append
+        for type_, text, line, _, start in self._scan():
+            append(type_, start, start + len(text), line)
+        return buffer
+
+    def _scan(self, start: int = 0) -> Iterator[tuple[TokenType, str, int, Any, int]]:
+        """Yield the type, lexeme, line, literal and starting offset of each token."""
+        chunks = self.chunks if self.chunks is not None else iter((self.source[start:] if start else self.source,))
+        buffer = ""
+        pos = 0
+        # offset in the source of the start of the buffer
+        offset = start
+        # whether the whole source has been read into the buffer
+        eof = False
+        line = self.line
+
+        while True:
+            match = TOKEN_RE.match(buffer, pos)
+
+            if not eof and (match is None or match.end() + LOOKAHEAD > len(buffer)
+                            or match.lastgroup in ("unterminated_string", "unterminated_comment")):
+                if (chunk := next(chunks, None)) is None:
+                    eof = True
+                else:
+                    offset += pos
+                    buffer = buffer[pos:] + chunk
+                    pos = 0
+                continue
+            if match is None:
+                break
+
+            pos = match.end()
+            kind = match.lastgroup
+
+            if kind == "space":
+                continue
+            elif kind == "identifier":
+                text = match.group()
+                type_ = KWDS.get(text, TokenType.IDENTIFIER)
+                if type_ is TokenType.IDENTIFIER:
+                    yield type_, intern(text), line, None, offset + match.start()
+                elif type_ is TokenType.NAN:
+                    yield type_, text, line, float("nan"), offset + match.start()
+                elif type_ is TokenType.INFINITY:
+                    yield type_, text, line, float("inf"), offset + match.start()
+                else:
+                    yield type_, text, line, None, offset + match.start()
+            elif kind == "operator":
+                text = match.group()
+                yield OPERATORS[text], text, line, None, offset + match.start()
+            elif kind == "newline":
+                line += pos - match.start()
+            elif kind == "number":
+                text = match.group()
+                try:
+                    yield TokenType.NUMBER, text, line, float(text), offset + match.start()
+                except ValueError:
+                    raise LoxParseError(line, "Unable to parse number.")
+            elif kind == "string":
+                text = match.group()
+                line += text.count("\n")
+                yield TokenType.STRING, text, line, text[1:-1], offset + match.start()
+            elif kind == "line_comment":
+                continue
+            elif kind == "block_comment":
+                line += match.group().count("\n")
+            elif kind == "unterminated_string":
+                raise LoxParseError(line + buffer.count("\n", match.start()), "Unterminated string.")
+            elif kind == "unterminated_comment":
+                raise LoxParseError(line + buffer.count("\n", match.start()), "Unterminated comment.")
             else:
-                self.add_token(TokenType.SLASH)
-        elif c in (" ", "\r", "\t"):
-            pass
-        elif c == "\n":
-            self.line += 1
-        elif c == '"':
-            self.string()
-        else:
-            if isdigit(c):
-                self.number()
-            elif isalpha(c):
-                self.identifier()
-            else:
-                raise LoxParseError(self.line, "Unexepected character.")
-
-    def is_at_end(self) -> bool:
-        return self.current >= len(self.source)
-
-    def advance(self) -> str:
-        self.current += 1
-        return self.source[self.current - 1]
-
-    def match(self, expected: str) -> bool:
-        if self.is_at_end() or self.source[self.current] != expected:
-            return False
-        self.current += 1
-        return True
-
-    def peek(self, n: int = 1) -> str:
-        # self.current has already been incremented, but it's handy for n to default to 1
-        n -= 1
-        if n <= 0:
-            n = 0
-
-        if self.is_at_end() or self.current + n >= len(self.source):
-            return ""
-        return self.source[self.current + n]
-
-    def string(self):
-        while self.peek() != '"' and not self.is_at_end():
-            if self.peek() == "\n":
-                self.line += 1
-            self.advance()
-
-        if self.is_at_end():
-            raise LoxParseError(self.line, "Unterminated string.")
-
-        self.advance()
-        self.add_token(TokenType.STRING, self.source[self.start+1:self.current-1])
-
-    def number(self):
-        while isdigit(self.peek()):
-            self.advance()
-        if self.peek() == "." and isdigit(self.peek(2)):
-            self.advance()
-            while isdigit(self.peek()):
-                self.advance()
-        if self.peek() == "e" and isdigit(self.peek(2)):
-            self.advance()
-            while isdigit(self.peek()):
-                self.advance()
-        if self.peek() == "e" and self.peek(2) in ("+", "-") and isdigit(self.peek(3)):
-            self.advance()
-            self.advance()
-            while isdigit(self.peek()):
-                self.advance()
-        try:
-            self.add_token(TokenType.NUMBER, float(self.source[self.start:self.current]))
-        except ValueError:
-            raise LoxParseError(self.line, "Unable to parse number.")
-
-    def identifier(self):
-        while isalnum(self.peek()):
-            self.advance()
-
-        type_ = KWDS.get(self.source[self.start:self.current], TokenType.IDENTIFIER)
-
-        if type_ == TokenType.NAN:
-            self.add_token(type_, float("nan"))
-        elif type_ == TokenType.INFINITY:
-            self.add_token(type_, float("inf"))
-        else:
-            self.add_token(type_)
-
-    def add_token(self, type_: TokenType, literal: Any = None):
-        text = self.source[self.start:self.current]
-        self.tokens.append(Token(type_, text, self.line, literal))
-
-
-def isdigit(c: str) -> bool:
-    if len(c) <= 1:
-        return "0" <= c <= "9"
-    else:
-        return isdigit(c[0]) and isdigit(c[1:])
-
-
-def isalpha(c: str) -> bool:
-    if len(c) <= 1:
-        return "a" <= c <= "z" or "A" <= c <= "Z" or c == "_"
-    else:
-        return isalpha(c[0]) and isalpha(c[1:])
-
-
-def isalnum(c: str) -> bool:
-    return isalpha(c) or isdigit(c)
+                raise LoxParseError(line, "Unexepected character.")
+
+        self.line = line
+        yield TokenType.EOF, "", line, None, offset + len(buffer)
@@ -0,0 +1,149 @@
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Callable, Optional
+
+from .grammar.expression import Assign
+from .grammar.literals import LoxRope
+from .grammar.statement import Stmt, Block, Var
+from .grammar.token import Token
+from .instrument import Instrumenter, Node, defined_value, first_line
+from .util.exceptions import LoxLimitError
+
+
+# steps between checks of the limits, reading the clock on every step would cost more than the step itself
+CHECK_INTERVAL = 1024
+
+
+@dataclass(frozen=True)
+class Limits:
+    """Resource limits for running programs that can't be trusted. None means unlimited."""
+    # statements executed, so each iteration of a loop is at least one step, for its body
+    max_steps: Optional[int] = None
+    # wall-clock seconds
+    timeout: Optional[float] = None
+    max_string_length: Optional[int] = None
+    # number of nested block frames
+    max_depth: Optional[int] = None
+
+    def __bool__(self) -> bool:
+        return any(limit is not None for limit in
+                   (self.max_steps, self.timeout, self.max_string_length, self.max_depth))
+
+
+class LimitUsage:
+    """What one run of a program has used of its Limits, kept on the run's global Env so the same instrumented
+    nodes can be shared by any number of runs.
+
+    Steps are counted down in batches of up to CHECK_INTERVAL, so the step and time limits are only checked once a
+    batch has run out. A batch never goes past ``max_steps``, so that is still enforced exactly. ``start`` begins a
+    new program's budget."""
+    __slots__ = ("limits", "started", "steps", "batch", "countdown", "depth", "deadline")
+
+    def __init__(self, limits: Limits):
+        self.limits = limits
+        self.started = False
+        # steps taken in the batches before the current one
+        self.steps = 0
+        self.batch = 0
+        # steps left in the current batch, a step that takes it below zero checks the limits
+        self.countdown = 0
+        self.depth = 0
+        self.deadline = 0.0
+
+    def start(self):
+        self.started = True
+        self.steps = 0
+        self.depth = 0
+        if self.limits.timeout is not None:
+            self.deadline = perf_counter() + self.limits.timeout
+        self.batch = self.next_batch()
+        self.countdown = self.batch
+
+    def next_batch(self) -> int:
+        if self.limits.max_steps is not None:
+            return max(0, min(CHECK_INTERVAL, self.limits.max_steps - self.steps))
+        return CHECK_INTERVAL
+
+    def check(self, stmt: Stmt):
+        """Called on the first step after a batch has run out."""
+        self.steps += self.batch
+        limits = self.limits
+        if limits.max_steps is not None and self.steps >= limits.max_steps:
+            raise LoxLimitError(first_line(stmt), f"exceeded the limit of {limits.max_steps} steps.")
+        if limits.timeout is not None and perf_counter() > self.deadline:
+            raise LoxLimitError(first_line(stmt), f"exceeded the time limit of {limits.timeout:g}s.")
+        self.batch = self.next_batch()
+        # this step is the first of the new batch
+        self.countdown = self.batch - 1
+
+    def check_string(self, name: Token, value):
+        if isinstance(value, (str, LoxRope)) and len(value) > self.limits.max_string_length:  # type: ignore
+            raise LoxLimitError(name.line, f"'{name.lexeme}' exceeded the limit of {self.limits.max_string_length} "
+                                           "characters for a string.")
+
+
+class LimitEnforcer(Instrumenter):
+    """Enforces Limits by switching the classes of a program's nodes, like Hooks, so programs run without limits pay
+    nothing for them. Only the classes needed for the limits that are set are switched, and for ``max_depth`` alone
+    only the blocks with a frame of their own.
+
+    The instrumented nodes keep no state: they charge the LimitUsage of the global Env they run in, which must have
+    one. The wrappers call the ``eval`` they replace, so they stack with the Profiler and Hooks."""
+    def __init__(self, limits: Limits):
+        super().__init__()
+        self.limits = limits
+        self.counting = limits.max_steps is not None or limits.timeout is not None
+
+    def select(self, node: Node) -> bool:
+        return self.counting or not isinstance(node, Block) or node.size > 0
+
+    def wrap(self, cls: type) -> Optional[dict]:
+        limits = self.limits
+        original = cls.eval  # type: ignore
+
+        if issubclass(cls, Assign):
+            if limits.max_string_length is None:
+                return None
+
+            def eval_assign(self, env):
+                val = original(self, env)
+                env.globals.limits.check_string(self.name, val)
+                return val
+            return {"eval": eval_assign}
+
+        if not issubclass(cls, Stmt):
+            return None
+
+        run: Callable = original
+        if issubclass(cls, Var) and limits.max_string_length is not None:
+            def eval_var(self, env):
+                original(self, env)
+                env.globals.limits.check_string(self.name, defined_value(self, env))
+            run = eval_var
+        elif issubclass(cls, Block) and limits.max_depth is not None:
+            max_depth = limits.max_depth
+
+            def eval_block(self, env):
+                if not self.size:
+                    return original(self, env)
+                usage = env.globals.limits
+                usage.depth += 1
+                try:
+                    if usage.depth > max_depth:
+                        raise LoxLimitError(first_line(self), f"exceeded the limit of {max_depth} nested scopes.")
+                    return original(self, env)
+                finally:
+                    usage.depth -= 1
+            run = eval_block
+
+        if self.counting:
+            inner = run
+
+            def eval_stmt(self, env):
+                usage = env.globals.limits
+                usage.countdown -= 1
+                if usage.countdown < 0:
+                    usage.check(self)
+                return inner(self, env)
+            run = eval_stmt
+        return None if run is original else {"eval": run}
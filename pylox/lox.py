@@ -1,39 +1,65 @@
 from os import PathLike
 from pathlib import Path
-from sys import stderr
-from typing import Union
+import sys
+from typing import Optional, TextIO, Union
 
 from .lexer import Lexer
+from . import cache
+from .limits import Limits
 from .parser import Parser
 from .interpreter import Interpreter
-from .util.dot import dot_diagram
+from .optimizer import default_pipeline
+from .output import OutputSink
+from .profiler import Profiler
+from .program import PreparedProgram
+from .resolver import Resolver
+from .grammar.statement import Stmt
+from .util.dot import AstExport
 from .util.exceptions import LoxException
 
 
 class Lox:
-    def __init__(self):
+    def __init__(self, backend: str = "tree", optimize: bool = True, profiler: Optional[Profiler] = None,
+                 output: Optional[OutputSink] = None, limits: Optional[Limits] = None):
+        if profiler is not None and backend != "tree":
+            raise ValueError("Profiling is only supported by the 'tree' backend.")
         self.had_error = False
-        self.interpreter = Interpreter()
+        self.interpreter = Interpreter(backend=backend, output=output, limits=limits)
+        self.limits = limits
         self.repl = False
+        self.optimize = optimize
+        self.profiler = profiler
 
     @classmethod
-    def run_file(cls, path: Union[str, PathLike], dot: bool = False):
-        obj = cls()
+    def run_file(cls, path: Union[str, PathLike], dot: Union[bool, AstExport] = False, backend: str = "tree",
+                 optimize: bool = True, stream: bool = False, use_cache: bool = True,
+                 profiler: Optional[Profiler] = None, limits: Optional[Limits] = None):
+        obj = cls(backend=backend, optimize=optimize, profiler=profiler, limits=limits)
 
         path = Path(path)
         with path.open() as f:
-            script = f.read()
-        try:
-            obj.run(script, dot_file=path.with_suffix(".dot") if dot else None)
-        except LoxException as e:
-            obj.print_error(e)
+            try:
+                if stream:
+                    obj.run_stream(f)
+                else:
+                    source = f.read()
+                    stmts = cache.load(path, source, optimize) if use_cache else None
+                    if stmts is None:
+                        stmts = obj.compile(source)
+                        if use_cache:
+                            cache.store(path, source, optimize, stmts)
+                    export = AstExport.of(dot)
+                    obj.execute(stmts, dot_file=path.with_suffix(export.suffix) if export else None, export=export)
+            except LoxException as e:
+                obj.print_error(e)
 
         if obj.had_error:
             raise SystemExit(65)
 
     @classmethod
-    def run_repl(cls):
-        obj = cls()
+    def run_repl(cls, backend: str = "tree", optimize: bool = True, profiler: Optional[Profiler] = None,
+                 limits: Optional[Limits] = None):
+        obj = cls(backend=backend, optimize=optimize, profiler=profiler, limits=limits)
 
         obj.repl = True
 
@@ -51,29 +77,69 @@ class Lox:
             obj.had_error = False
 
     @classmethod
-    def run_inline(cls, cmd: str, dot: bool = False):
-        obj = cls()
+    def run_inline(cls, cmd: str, dot: Union[bool, AstExport] = False, backend: str = "tree",
+                   optimize: bool = True, profiler: Optional[Profiler] = None, limits: Optional[Limits] = None):
+        obj = cls(backend=backend, optimize=optimize, profiler=profiler, limits=limits)
 
         try:
-            obj.run(cmd, dot_file=Path("cmd.dot") if dot else None)
+            export = AstExport.of(dot)
+            obj.run(cmd, dot_file=Path("cmd").with_suffix(export.suffix) if export else None, export=export)
         except LoxException as e:
             obj.print_error(e)
 
-    def run(self, source: str, dot_file: Path = None):
+    def run(self, source: str, dot_file: Path = None, export: Optional[AstExport] = None):
+        self.execute(self.compile(source), dot_file=dot_file, export=export)
+
+    def prepare(self, source: str) -> PreparedProgram:
+        """Compile ``source`` once for running many times, see PreparedProgram. Syntax errors are raised."""
+        return PreparedProgram(self.interpreter.compile(self.compile(source)), self.interpreter.backend, self.limits)
+
+    def compile(self, source: str) -> list[Stmt]:
+        """Lex, parse, optimise and resolve ``source``, ready for ``execute``."""
         scanner = Lexer(source)
         tokens = scanner.scan_tokens()
 
         parser = Parser(tokens, repl=self.repl)
         stmts = parser.parse()
+        if self.optimize:
+            stmts = default_pipeline().run(stmts)
+        return Resolver().resolve(stmts)
 
+    def execute(self, stmts: list[Stmt], dot_file: Path = None, export: Optional[AstExport] = None):
         if stmts:
             if dot_file is not None:
-                dot_file.write_text(dot_diagram(stmts[0], stmts))
+                with dot_file.open("w") as f:
+                    (export or AstExport()).write(stmts, f)
+            if self.profiler is not None:
+                self.profiler.instrument(stmts)
+            self.interpreter.restart_limits()
+            try:
+                self.interpreter.interpret(stmts)
+            except LoxException as e:
+                self.print_error(e)
+
+    def run_stream(self, file: TextIO):
+        """Run a script while it is being read: each top-level declaration is executed as soon as it has been
+        parsed, so only the declaration being parsed is held in memory. Unlike ``run``, a syntax error is only
+        reported once it is reached, after everything before it has run."""
+        parser = Parser(Lexer.from_file(file).iter_tokens(), repl=self.repl)
+
+        # the limits apply to the whole script, not each declaration
+        self.interpreter.restart_limits()
+        for stmt in parser.parse_iter():
+            stmts = [stmt]
+            if self.optimize:
+                stmts = default_pipeline().run(stmts)
+            Resolver().resolve(stmts)
+            if self.profiler is not None:
+                self.profiler.instrument(stmts)
+
             try:
                 self.interpreter.interpret(stmts)
             except LoxException as e:
                 self.print_error(e)
+                return
 
     def print_error(self, err: LoxException):
-        print(err, file=stderr)
+        print(err, file=sys.stderr)
         self.had_error = True
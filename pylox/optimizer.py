@@ -0,0 +1,251 @@
+from dataclasses import fields
+from typing import Callable, Optional, get_args, get_origin
+
+from .grammar.expression import Expr, Binary, Unary, Literal, Grouping, Variable, Assign, Logical
+from .grammar.statement import Stmt, Block, Var, If, While
+from .grammar.literals import LoxRope
+from .grammar.token import TokenType
+from .util.exceptions import LoxRuntimeError
+from .util.helpers import is_truthy
+
+
+# the fields of each node class that can hold other nodes, with the kind of value they hold: Expr, Stmt or list
+_CHILDREN: dict[type, tuple[tuple[str, type], ...]] = {}
+# the visit method for each Transformer class and node class
+_VISITORS: dict[tuple[type, type], Callable] = {}
+
+
+def child_kind(annotation) -> Optional[type]:
+    if get_origin(annotation) is list:
+        return list
+    for kind in (Expr, Stmt):
+        # Optional[kind] too
+        if annotation is kind or kind in get_args(annotation):
+            return kind
+    return None
+
+
+def child_fields(cls: type) -> tuple[tuple[str, type], ...]:
+    children = _CHILDREN.get(cls)
+    if children is None:
+        children = _CHILDREN[cls] = tuple((field.name, kind) for field in fields(cls)
+                                          if field.repr and (kind := child_kind(field.type)) is not None)
+    return children
+
+
+class Transformer:
+    """Walks the AST, calling ``visit_<NodeClass>`` where one is defined and ``generic_visit`` otherwise.
+
+    Visit methods return the node to replace the visited one with. A statement visit may return None to remove the
+    statement; where a statement can't be removed, it is replaced with an empty Block."""
+    def visit(self, node):
+        key = (type(self), type(node))
+        if (method := _VISITORS.get(key)) is None:
+            method = _VISITORS[key] = self.visitor(type(node))
+        return method(self, node)
+
+    @classmethod
+    def visitor(cls, node_cls: type) -> Callable:
+        for base in node_cls.__mro__:
+            if (method := getattr(cls, "visit_" + base.__name__, None)) is not None:
+                return method
+        return cls.generic_visit
+
+    def generic_visit(self, node):
+        for name, kind in child_fields(type(node)):
+            if (val := getattr(node, name)) is None:
+                continue
+            if kind is Expr:
+                setattr(node, name, self.visit(val))
+            elif kind is Stmt:
+                new = self.visit(val)
+                setattr(node, name, new if new is not None else Block([]))
+            else:
+                setattr(node, name, self.visit_statements(val))
+        return node
+
+    def visit_statements(self, statements: list[Stmt]) -> list[Stmt]:
+        new = []
+        for stmt in statements:
+            if (stmt := self.visit(stmt)) is not None:
+                new.append(stmt)
+        return new
+
+
+class Pass(Transformer):
+    """An optimisation pass. Passes set ``changed`` whenever they rewrite the tree, so the PassManager can tell
+    when it has reached a fixed point."""
+    def __init__(self):
+        self.changed = False
+
+    def run(self, statements: list[Stmt]) -> list[Stmt]:
+        self.changed = False
+        return self.visit_statements(statements)
+
+
+class ConstantFolding(Pass):
+    """Evaluates operators whose operands are all literals. Operations that would fail at runtime are left for the
+    interpreter to report."""
+    def visit_Grouping(self, node: Grouping) -> Expr:
+        self.generic_visit(node)
+        if isinstance(node.expression, Literal):
+            self.changed = True
+            return node.expression
+        return node
+
+    def visit_Unary(self, node: Unary) -> Expr:
+        self.generic_visit(node)
+        if isinstance(node.right, Literal):
+            return self.fold(node)
+        return node
+
+    def visit_Binary(self, node: Binary) -> Expr:
+        self.generic_visit(node)
+        if isinstance(node.left, Literal) and isinstance(node.right, Literal):
+            return self.fold(node)
+        return node
+
+    def visit_Logical(self, node: Logical) -> Expr:
+        self.generic_visit(node)
+        if isinstance(node.left, Literal):
+            self.changed = True
+            short_circuits = is_truthy(node.left.value) == (node.operator.type is TokenType.OR)
+            return node.left if short_circuits else node.right
+        return node
+
+    def fold(self, node: Expr) -> Expr:
+        try:
+            # operands are all literals, so no environment is needed. Binary.eval would specialise the node, which
+            # must not happen if the fold fails and the node is kept
+            if isinstance(node, Binary):
+                value = node.operate(node.left.value, node.right.value)  # type: ignore
+            else:
+                value = node.eval(None)  # type: ignore
+        except (LoxRuntimeError, ArithmeticError):
+            return node
+        self.changed = True
+        # literals hold plain text, ropes are only for strings built at runtime
+        return Literal(value.flatten() if isinstance(value, LoxRope) else value)
+
+
+class Binding:
+    def __init__(self, declaration: Var):
+        self.declaration = declaration
+        self.reassigned = False
+
+    @property
+    def value(self) -> Optional[Literal]:
+        if not self.reassigned and isinstance(self.declaration.initialiser, Literal):
+            return self.declaration.initialiser
+        return None
+
+
+class ConstantPropagation(Pass):
+    """Replaces reads of variables that are initialised with a literal and never reassigned with that literal.
+
+    Declarations are matched to uses with the same scoping rules as the Resolver, so shadowed and redeclared
+    variables are told apart."""
+    def __init__(self):
+        super().__init__()
+        self.uses: dict[int, Binding] = {}
+
+    def run(self, statements: list[Stmt]) -> list[Stmt]:
+        # first find which declaration each read refers to, and which declarations are reassigned anywhere
+        collector = _BindingCollector()
+        collector.visit_statements(statements)
+        self.uses = collector.uses
+        try:
+            return super().run(statements)
+        finally:
+            self.uses = {}
+
+    def visit_Variable(self, node: Variable) -> Expr:
+        if (binding := self.uses.get(id(node))) is not None and (value := binding.value) is not None:
+            self.changed = True
+            return Literal(value.value)
+        return node
+
+
+class _BindingCollector(Transformer):
+    def __init__(self):
+        self.scopes: list[dict[str, Binding]] = [{}]
+        # id of each Variable node to the declaration it reads
+        self.uses: dict[int, Binding] = {}
+
+    def visit_Block(self, node: Block) -> Block:
+        self.scopes.append({})
+        self.generic_visit(node)
+        self.scopes.pop()
+        return node
+
+    def visit_Var(self, node: Var) -> Var:
+        self.generic_visit(node)
+        self.scopes[-1][node.name.lexeme] = Binding(node)
+        return node
+
+    def visit_Variable(self, node: Variable) -> Expr:
+        if (binding := self.lookup(node.name.lexeme)) is not None:
+            self.uses[id(node)] = binding
+        return node
+
+    def visit_Assign(self, node: Assign) -> Expr:
+        self.generic_visit(node)
+        if (binding := self.lookup(node.name.lexeme)) is not None:
+            binding.reassigned = True
+        return node
+
+    def lookup(self, name: str) -> Optional[Binding]:
+        for scope in reversed(self.scopes):
+            if (binding := scope.get(name)) is not None:
+                return binding
+        return None
+
+
+class DeadBranchElimination(Pass):
+    """Removes branches of ifs with a literal condition that can never run, and while loops that never run."""
+    def visit_If(self, node: If) -> Optional[Stmt]:
+        self.generic_visit(node)
+        if isinstance(node.condition, Literal):
+            self.changed = True
+            return node.then_branch if is_truthy(node.condition.value) else node.else_branch
+        return node
+
+    def visit_While(self, node: While) -> Optional[Stmt]:
+        self.generic_visit(node)
+        if isinstance(node.condition, Literal) and not is_truthy(node.condition.value):
+            self.changed = True
+            return None
+        return node
+
+
+class PassManager:
+    """Runs registered passes in order, repeating the pipeline while any pass still changes the tree (up to
+    ``max_iterations`` times) since one pass can expose new opportunities for another."""
+    def __init__(self, max_iterations: int = 4):
+        self.max_iterations = max_iterations
+        self.passes: list[Pass] = []
+
+    def register(self, pass_: Pass) -> 'PassManager':
+        self.passes.append(pass_)
+        return self
+
+    def run(self, statements: list[Stmt]) -> list[Stmt]:
+        for _ in range(self.max_iterations):
+            changed = False
+            for pass_ in self.passes:
+                statements = pass_.run(statements)
+                changed = changed or pass_.changed
+            if not changed:
+                break
+        return statements
+
+
+def default_pipeline() -> PassManager:
+    return (PassManager()
+            .register(ConstantFolding())
+            .register(ConstantPropagation())
+            .register(DeadBranchElimination()))
+
+
+def optimize(statements: list[Stmt]) -> list[Stmt]:
+    return default_pipeline().run(statements)
@@ -0,0 +1,50 @@
+from io import StringIO
+import sys
+from typing import Optional, TextIO
+
+
+DEFAULT_BUFFER_SIZE = 8192
+
+
+class OutputSink:
+    """Where ``print`` and ``repr`` statements (and expressions echoed by the REPL) write their lines.
+
+    Lines are collected and written to ``stream`` in bulk once ``buffer_size`` characters are waiting, and whenever
+    ``flush`` is called, which the Interpreter does when a program finishes or fails. A ``buffer_size`` of 0 writes
+    every line straight away. By default, the sink writes to whatever ``sys.stdout`` is when it flushes, and is
+    unbuffered if that is a terminal so interactive output isn't held back."""
+    def __init__(self, stream: Optional[TextIO] = None, buffer_size: Optional[int] = None):
+        self.stream = stream
+        if buffer_size is None:
+            isatty = getattr(stream if stream is not None else sys.stdout, "isatty", None)
+            buffer_size = 0 if isatty is not None and isatty() else DEFAULT_BUFFER_SIZE
+        self.buffer_size = buffer_size
+
+        self.pending: list[str] = []
+        self.pending_size = 0
+
+    @classmethod
+    def capture(cls, buffer_size: Optional[int] = DEFAULT_BUFFER_SIZE) -> 'OutputSink':
+        """A sink that keeps everything written to it in memory, see ``getvalue``."""
+        return cls(StringIO(), buffer_size)
+
+    def writeline(self, text: str):
+        self.pending.append(text)
+        self.pending_size += len(text) + 1
+        if self.pending_size >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        stream = self.stream if self.stream is not None else sys.stdout
+        self.pending.append("")
+        stream.write("\n".join(self.pending))
+        self.pending = []
+        self.pending_size = 0
+        stream.flush()
+
+    def getvalue(self) -> str:
+        """Everything written to a sink made with ``capture``."""
+        self.flush()
+        return self.stream.getvalue()  # type: ignore
@@ -1,25 +1,60 @@
-from typing import Optional
+from typing import Iterable, Iterator, Optional
 
 from .util.exceptions import LoxSyntaxError
 from .grammar.expression import Expr, Binary, Unary, Literal, Grouping, Variable, Assign, Logical
 from .grammar.statement import Stmt, Print, Repr, Block, Expression, Var, If, While, Break
 from .grammar.token import Token, TokenType
-from .grammar.literals import LoxBool, LoxNil
+from .grammar.literals import TRUE, FALSE, NIL
+
+
+# binding powers of the operators, the higher the power the tighter an operator binds
+ASSIGNMENT, OR, AND, EQUALITY, COMPARISON, TERM, FACTOR, UNARY = range(1, 9)
+
+INFIX = {
+    TokenType.EQUAL: ASSIGNMENT,
+    TokenType.OR: OR,
+    TokenType.AND: AND,
+    TokenType.BANG_EQUAL: EQUALITY,
+    TokenType.EQUAL_EQUAL: EQUALITY,
+    TokenType.GREATER: COMPARISON,
+    TokenType.GREATER_EQUAL: COMPARISON,
+    TokenType.LESS: COMPARISON,
+    TokenType.LESS_EQUAL: COMPARISON,
+    TokenType.MINUS: TERM,
+    TokenType.PLUS: TERM,
+    TokenType.SLASH: FACTOR,
+    TokenType.STAR: FACTOR,
+    TokenType.PERCENT: FACTOR,
+}
+PREFIX = frozenset((TokenType.BANG, TokenType.MINUS))
+KEYWORD_LITERALS = {TokenType.FALSE: FALSE, TokenType.TRUE: TRUE, TokenType.NIL: NIL}
+LITERALS = frozenset((TokenType.NUMBER, TokenType.NAN, TokenType.INFINITY, TokenType.STRING))
+
+# kinds of operators waiting for their right operand in Parser.expression
+INFIX_OPERATOR, PREFIX_OPERATOR, GROUP = range(3)
 
 
 class Parser:
-    def __init__(self, tokens: list[Token], repl: bool = False):
-        self.tokens = tokens
+    def __init__(self, tokens: Iterable[Token], repl: bool = False):
+        # tokens are pulled from the iterable as they are needed, so it can be a generator such as
+        # Lexer.iter_tokens(). It must end with an EOF token.
+        self.tokens = iter(tokens)
         self.repl = repl
 
+        # number of tokens consumed
         self.current = 0
         self.loop_depth = 0
 
+        self._previous: Optional[Token] = None
+        self._peek: Token = next(self.tokens)
+
     def parse(self) -> list[Stmt]:
-        statements = []
+        return list(self.parse_iter())
+
+    def parse_iter(self) -> Iterator[Stmt]:
+        """Parse and yield one top-level declaration at a time."""
         while not self.is_at_end():
-            statements.append(self.declaration())
-        return statements
+            yield self.declaration()
 
     # !##### STATEMENTS #####!
 
@@ -81,7 +116,7 @@ class Parser:
         if not self.check(TokenType.SEMICOLON):
             condition = self.expression()
         else:
-            condition = Literal(LoxBool(True))
+            condition = Literal(TRUE)
         self.consume(TokenType.SEMICOLON, "Expected ';' after for loop condition.")
 
         if not self.check(TokenType.RIGHT_PAREN):
@@ -164,103 +199,75 @@ class Parser:
     # !##### EXPRESSIONS #####!
 
     def expression(self) -> Expr:
-        return self.assignment()
-
-    def assignment(self) -> Expr:
-        expr = self.or_expr()
-
-        if self.match(TokenType.EQUAL):
-            equals = self.previous()
-            value = self.assignment()
-
-            if isinstance(expr, Variable):
-                name = expr.name
-                return Assign(name, value)
-
-            raise LoxSyntaxError(equals, "Invalid assignment target.")
-        return expr
-
-    def or_expr(self) -> Expr:
-        expr = self.and_expr()
-
-        while self.match(TokenType.OR):
-            operator = self.previous()
-            right = self.and_expr()
-            expr = Logical(expr, operator, right)
-
-        return expr
-
-    def and_expr(self) -> Expr:
-        expr = self.equality()
-
-        while self.match(TokenType.AND):
-            operator = self.previous()
-            right = self.equality()
-            expr = Logical(expr, operator, right)
-
-        return expr
-
-    def equality(self) -> Expr:
-        expr = self.comparison()
-
-        while self.match(TokenType.BANG_EQUAL, TokenType.EQUAL_EQUAL):
-            operator = self.previous()
-            right = self.comparison()
-            expr = Binary(expr, operator, right)
-        return expr
-
-    def comparison(self) -> Expr:
-        expr = self.term()
-
-        while self.match(TokenType.GREATER, TokenType.GREATER_EQUAL, TokenType.LESS, TokenType.LESS_EQUAL):
-            operator = self.previous()
-            right = self.term()
-            expr = Binary(expr, operator, right)
-        return expr
-
-    def term(self) -> Expr:
-        expr = self.factor()
-
-        while self.match(TokenType.MINUS, TokenType.PLUS):
-            operator = self.previous()
-            right = self.factor()
-            expr = Binary(expr, operator, right)
-        return expr
-
-    def factor(self) -> Expr:
-        expr = self.unary()
-
-        while self.match(TokenType.SLASH, TokenType.STAR, TokenType.PERCENT):
-            operator = self.previous()
-            right = self.unary()
-            expr = Binary(expr, operator, right)
-        return expr
-
-    def unary(self) -> Expr:
-        if self.match(TokenType.BANG, TokenType.MINUS):
-            operator = self.previous()
-            right = self.unary()
-            return Unary(operator, right)
-        return self.primary()
+        """Parse an expression by precedence climbing. Rather than recursing for each operand, the operators (and
+        opening parentheses) still waiting for their right operand are kept on a stack, with the binding power that
+        was required before them, so nesting is only limited by memory."""
+        # (kind, operator, left operand, binding power to restore) for each operator waiting for its right operand
+        pending: list[tuple[int, Token, Optional[Expr], int]] = []
+        # operators that bind less tightly than this end the current operand
+        min_power = 0
+
+        while True:
+            # the prefix of an operand
+            token = self._peek
+            type_ = token.type
+            if type_ in PREFIX:
+                self.advance()
+                pending.append((PREFIX_OPERATOR, token, None, min_power))
+                min_power = UNARY
+                continue
+            elif type_ == TokenType.LEFT_PAREN:
+                self.advance()
+                pending.append((GROUP, token, None, min_power))
+                min_power = 0
+                continue
+
+            expr = self.primary()
+
+            # apply the operators that follow, and those pending that bind tighter than them
+            while True:
+                token = self._peek
+                power = INFIX.get(token.type, 0)
+                if power > min_power:
+                    self.advance()
+                    pending.append((INFIX_OPERATOR, token, expr, min_power))
+                    # assignment is right-associative, so the right operand may contain another
+                    min_power = power if power != ASSIGNMENT else ASSIGNMENT - 1
+                    break
+                elif not pending:
+                    return expr
+
+                kind, operator, left, min_power = pending.pop()
+                if kind == INFIX_OPERATOR:
+                    type_ = operator.type
+                    if type_ == TokenType.EQUAL:
+                        if not isinstance(left, Variable):
+                            raise LoxSyntaxError(operator, "Invalid assignment target.")
+                        expr = Assign(left.name, expr)
+                    elif type_ == TokenType.OR or type_ == TokenType.AND:
+                        expr = Logical(left, operator, expr)  # type: ignore
+                    else:
+                        expr = Binary(left, operator, expr)  # type: ignore
+                elif kind == PREFIX_OPERATOR:
+                    expr = Unary(operator, expr)
+                else:
+                    self.consume(TokenType.RIGHT_PAREN, "Expected ')' after expression.")
+                    expr = Grouping(expr)
 
     def primary(self) -> Expr:
-        if self.match(TokenType.FALSE):
-            return Literal(LoxBool(False))
-        if self.match(TokenType.TRUE):
-            return Literal(LoxBool(True))
-        if self.match(TokenType.NIL):
-            return Literal(LoxNil())
-        if self.match(TokenType.NUMBER, TokenType.NAN, TokenType.INFINITY, TokenType.STRING):
-            if (lit := self.previous().literal) is not None:
-                return Literal(lit)
-        if self.match(TokenType.IDENTIFIER):
-            return Variable(self.previous())
-        if self.match(TokenType.LEFT_PAREN):
-            expr = self.expression()
-            self.consume(TokenType.RIGHT_PAREN, "Expected ')' after expression.")
-            return Grouping(expr)
-
-        raise LoxSyntaxError(self.peek(), "Expected expression.")
+        token = self._peek
+        type_ = token.type
+        if type_ in KEYWORD_LITERALS:
+            self.advance()
+            return Literal(KEYWORD_LITERALS[type_])
+        if type_ in LITERALS and token.literal is not None:
+            self.advance()
+            return Literal(token.literal)
+        if type_ == TokenType.IDENTIFIER:
+            self.advance()
+            return Variable(token)
+
+        raise LoxSyntaxError(token, "Expected expression.")
 
     # !##### UTILITY #####!
 
@@ -279,16 +286,18 @@ class Parser:
     def advance(self) -> Token:
         if not self.is_at_end():
             self.current += 1
+            self._previous = self._peek
+            self._peek = next(self.tokens)
         return self.previous()
 
     def is_at_end(self) -> bool:
-        return self.peek().type == TokenType.EOF
+        return self._peek.type == TokenType.EOF
 
     def peek(self) -> Token:
-        return self.tokens[self.current]
+        return self._peek
 
     def previous(self) -> Token:
-        return self.tokens[self.current - 1]
+        return self._previous  # type: ignore
 
     def consume(self, type_: TokenType, message: str) -> Token:
         if self.check(type_):
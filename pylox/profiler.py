@@ -0,0 +1,83 @@
+from dataclasses import fields
+from time import perf_counter
+from typing import Optional, TextIO
+
+from .grammar.expression import node_name
+from .grammar.token import Token
+from .instrument import Instrumenter, Node
+
+
+class NodeStats:
+    __slots__ = "node", "line", "count", "total", "own"
+
+    def __init__(self, node: Node, line: Optional[int]):
+        self.node = node
+        self.line = line
+        self.count = 0
+        # time spent in the node including its children, and excluding them
+        self.total = 0.0
+        self.own = 0.0
+
+    @property
+    def label(self) -> str:
+        for field in fields(self.node):
+            if isinstance(val := getattr(self.node, field.name), Token):
+                return f"{node_name(self.node)} {val.lexeme}"
+        return node_name(self.node)
+
+
+class Profiler(Instrumenter):
+    """Counts how many times each node of a tree-walked program is evaluated and how long it takes."""
+    def __init__(self):
+        super().__init__()
+        self.stats: dict[int, NodeStats] = {}
+        # time spent in the children of the node currently being evaluated
+        self.children = 0.0
+
+    def register(self, node: Node, line: Optional[int]):
+        self.stats[id(node)] = NodeStats(node, line)
+
+    def wrap(self, cls: type) -> dict:
+        original = cls.eval
+        stats = self.stats
+        profiler = self
+
+        def eval(self, env):
+            outer = profiler.children
+            profiler.children = 0.0
+            start = perf_counter()
+            try:
+                return original(self, env)
+            finally:
+                elapsed = perf_counter() - start
+                entry = stats[id(self)]
+                entry.count += 1
+                entry.total += elapsed
+                entry.own += elapsed - profiler.children
+                profiler.children = outer + elapsed
+
+        return {"eval": eval}
+
+    def lines(self) -> list[tuple[Optional[int], int, float]]:
+        """(line, executions, time) for each source line, where a line's executions are those of its most
+        frequently run node and its time is the time spent in its own nodes, excluding their children elsewhere."""
+        lines: dict[Optional[int], tuple[int, float]] = {}
+        for entry in self.stats.values():
+            count, own = lines.get(entry.line, (0, 0.0))
+            lines[entry.line] = (max(count, entry.count), own + entry.own)
+        return [(line, count, own) for line, (count, own) in lines.items()]
+
+    def report(self, file: TextIO, limit: int = 20):
+        """Write the hottest lines and nodes to ``file``, sorted by the time spent in them excluding children."""
+        lines = sorted(self.lines(), key=lambda entry: entry[2], reverse=True)
+        print(f"{'line':>6} {'executions':>12} {'self ms':>12}", file=file)
+        for line, count, own in lines[:limit]:
+            print(f"{'-' if line is None else line:>6} {count:>12} {own * 1000:>12.3f}", file=file)
+
+        nodes = sorted(self.stats.values(), key=lambda entry: entry.own, reverse=True)
+        print(f"\n{'line':>6} {'executions':>12} {'self ms':>12} {'total ms':>12}  node", file=file)
+        for entry in nodes[:limit]:
+            if not entry.count:
+                break
+            print(f"{'-' if entry.line is None else entry.line:>6} {entry.count:>12} {entry.own * 1000:>12.3f} "
+                  f"{entry.total * 1000:>12.3f}  {entry.label}", file=file)
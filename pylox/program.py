@@ -0,0 +1,65 @@
+from typing import Mapping, Optional, Union
+
+from .env import Env
+from .grammar.literals import TRUE, FALSE, NIL, AnyLiteral
+from .grammar.token import Token, TokenType
+from .interpreter import Interpreter, Code
+from .limits import Limits, LimitEnforcer, LimitUsage
+from .output import OutputSink
+
+
+# Python values that can be bound to a Lox global, and the Lox values they become
+PyValue = Union[None, bool, int, float, str]
+
+
+def to_lox(value: PyValue) -> AnyLiteral:
+    if value is None:
+        return NIL
+    elif value is True:
+        return TRUE
+    elif value is False:
+        return FALSE
+    elif isinstance(value, (int, float)):
+        return float(value)
+    elif isinstance(value, str):
+        return value
+    raise TypeError(f"Cannot bind a value of type '{type(value).__name__}' to a Lox variable.")
+
+
+class PreparedProgram:
+    """A program compiled once and ready to run any number of times.
+
+    Each ``run`` gets a fresh global environment, optionally pre-populated with ``bindings``, so runs can't see each
+    other's variables. Running only changes the classes of the program's Binary nodes to equivalent specialised
+    ones (see ``Binary.quicken``), so it can be shared between threads and run concurrently. Use ``Lox.prepare`` to
+    make one.
+
+    Programs prepared with Limits enforce them on every run. The program's nodes are instrumented once, here, and
+    each run counts what it uses in a LimitUsage of its own, so runs still share the program."""
+    __slots__ = ("_code", "_backend", "_limits")
+
+    def __init__(self, code: Code, backend: str, limits: Optional[Limits] = None):
+        if limits and backend != "tree":
+            raise ValueError("Resource limits are only supported by the 'tree' backend.")
+        self._code = code
+        self._backend = backend
+        self._limits = limits or None
+        if self._limits is not None:
+            LimitEnforcer(self._limits).instrument(code)  # type: ignore
+
+    @property
+    def backend(self) -> str:
+        return self._backend
+
+    def run(self, bindings: Optional[Mapping[str, PyValue]] = None, output: Optional[OutputSink] = None) -> Env:
+        """Run the program, returning its global environment. Runtime errors are raised, as LoxRuntimeError."""
+        # the program is already instrumented, so the Interpreter only needs the usage to charge
+        interpreter = Interpreter(self._backend, output=output)
+        if self._limits is not None:
+            interpreter.env.limits = LimitUsage(self._limits)
+            interpreter.env.limits.start()
+        if bindings:
+            for name, value in bindings.items():
+                interpreter.env.define(Token(TokenType.IDENTIFIER, name, 0), to_lox(value))
+        interpreter.execute(self._code)
+        return interpreter.env
@@ -0,0 +1,157 @@
+from functools import singledispatchmethod
+from typing import Optional
+
+from .grammar.expression import Binary, Unary, Literal, Grouping, Variable, Assign, Logical
+from .grammar.statement import Stmt, Print, Repr, Block, Expression, Var, If, While, Break
+
+
+class FrameLayout:
+    __slots__ = ("size",)
+
+    def __init__(self):
+        self.size = 0
+
+    def allocate(self) -> int:
+        self.size += 1
+        return self.size - 1
+
+
+class Scope:
+    """The names declared in one block, and the slots they have in the Frame that holds them."""
+    __slots__ = ("names", "frame")
+
+    def __init__(self, frame: FrameLayout):
+        self.names: dict[str, int] = {}
+        self.frame = frame
+
+
+class Resolver:
+    """Statically binds every variable to where it is stored at runtime.
+
+    Each Block is given the size of the Frame it needs (``size``), each local Var a ``slot`` in a Frame, and each
+    Variable and Assign the ``depth`` (number of frames to walk up) and ``slot`` of the declaration it refers to.
+    Names that are not declared in any enclosing block are left unresolved and looked up by name in the global Env.
+
+    Not every block needs a frame of its own. Blocks that declare nothing, such as those the parser wraps ``for``
+    loop bodies in, run in the enclosing frame. Blocks inside a loop body that is itself inside a frame have their
+    variables hoisted into that frame, so a loop allocates no frames per iteration. This is safe because each
+    variable still gets its own slot and every Var writes its slot before the variable can be read, and because
+    nothing can capture a frame and outlive the iteration. Either way the block gets a ``size`` of 0."""
+    def __init__(self):
+        self.scopes: list[Scope] = []
+        # the frame that blocks inside the loop being resolved hoist their variables into, if any
+        self.hoist_into: Optional[FrameLayout] = None
+
+    def resolve(self, statements: list[Stmt]) -> list[Stmt]:
+        for stmt in statements:
+            self.resolve_node(stmt)
+        return statements
+
+    # !##### STATEMENTS #####!
+
+    @singledispatchmethod
+    def resolve_node(self, node):
+        raise NotImplementedError(f"Cannot resolve {type(node).__name__}")
+
+    @resolve_node.register
+    def _(self, node: Block):
+        if not any(isinstance(stmt, Var) for stmt in node.statements):
+            for stmt in node.statements:
+                self.resolve_node(stmt)
+            node.size = 0
+            return
+
+        frame = self.hoist_into if self.hoist_into is not None else FrameLayout()
+        self.scopes.append(Scope(frame))
+        for stmt in node.statements:
+            self.resolve_node(stmt)
+        self.scopes.pop()
+        node.size = frame.size if frame is not self.hoist_into else 0
+
+    @resolve_node.register(Expression)
+    @resolve_node.register(Print)
+    @resolve_node.register(Repr)
+    def _(self, node):
+        self.resolve_node(node.expression)
+
+    @resolve_node.register
+    def _(self, node: Var):
+        # the initialiser can't see the variable it initialises, unless it redeclares one from the same scope
+        if node.initialiser is not None:
+            self.resolve_node(node.initialiser)
+
+        if self.scopes:
+            scope = self.scopes[-1]
+            if (slot := scope.names.get(node.name.lexeme)) is None:
+                slot = scope.names[node.name.lexeme] = scope.frame.allocate()
+            node.slot = slot
+        else:
+            node.slot = None
+
+    @resolve_node.register
+    def _(self, node: If):
+        self.resolve_node(node.condition)
+        self.resolve_node(node.then_branch)
+        if node.else_branch is not None:
+            self.resolve_node(node.else_branch)
+
+    @resolve_node.register
+    def _(self, node: While):
+        self.resolve_node(node.condition)
+
+        outer = self.hoist_into
+        if self.scopes:
+            self.hoist_into = self.scopes[-1].frame
+        try:
+            self.resolve_node(node.body)
+        finally:
+            self.hoist_into = outer
+
+    @resolve_node.register
+    def _(self, node: Break):
+        pass
+
+    # !##### EXPRESSIONS #####!
+
+    @resolve_node.register(Binary)
+    @resolve_node.register(Logical)
+    def _(self, node):
+        self.resolve_node(node.left)
+        self.resolve_node(node.right)
+
+    @resolve_node.register
+    def _(self, node: Grouping):
+        self.resolve_node(node.expression)
+
+    @resolve_node.register
+    def _(self, node: Literal):
+        pass
+
+    @resolve_node.register
+    def _(self, node: Unary):
+        self.resolve_node(node.right)
+
+    @resolve_node.register
+    def _(self, node: Variable):
+        self.resolve_local(node)
+
+    @resolve_node.register
+    def _(self, node: Assign):
+        self.resolve_node(node.value)
+        self.resolve_local(node)
+
+    # !##### UTILITY #####!
+
+    def resolve_local(self, node):
+        depth = 0
+        frame = self.scopes[-1].frame if self.scopes else None
+        for scope in reversed(self.scopes):
+            if scope.frame is not frame:
+                depth += 1
+                frame = scope.frame
+            if (slot := scope.names.get(node.name.lexeme)) is not None:
+                node.depth = depth
+                node.slot = slot
+                return
+        node.depth = None
+        node.slot = None
@@ -1,8 +1,11 @@
-from dataclasses import fields
-from typing import Union
+from dataclasses import dataclass, fields
+import json
+import math
+from typing import Any, Iterable, Iterator, Optional, TextIO, Union
 
 from ..grammar import token, expr, stmt
-from .helpers import to_repr
+from ..grammar.literals import LoxBool, LoxNil
+from .helpers import to_repr, to_str
 
 
 HEADERS = """\
@@ -11,50 +14,235 @@ HEADERS = """\
     splines = true;
 """
 
+FORMATS = ("dot", "json")
+
+# events yielded by Walker
+ENTER, EXIT, STUB, LEAF, OPEN, CLOSE = range(6)
+
+
+ESCAPES = str.maketrans({
+    "&":  "&amp;",
+    '"':  "&quot;",
+    "]":  "&#x5D;",
+    "<":  "&#x3C;",
+    ">":  "&#x3E;",
+    " ":  "&#x2423;",
+    "\a": "\\a",
+    "\b": "\\b",
+    "\f": "\\f",
+    "\n": "\\n",
+    "\r": "\\r",
+    "\t": "\\t",
+    "\v": "\\v",
+})
+
 
 def escape(inp: str) -> str:
-    substitutions = {
-        "&":  "&amp;",
-        '"':  "&quot;",
-        "]":  "&#x5D;",
-        "<":  "&#x3C;",
-        ">":  "&#x3E;",
-        " ":  "&#x2423;",
-        "\a": "\\a",
-        "\b": "\\b",
-        "\f": "\\f",
-        "\n": "\\n",
-        "\r": "\\r",
-        "\t": "\\t",
-        "\v": "\\v",
-    }
-    return inp.translate(inp.maketrans(substitutions))  # type: ignore
-
-
-def dot(obj: Union[expr.Expr, stmt.Stmt], root: bool = True) -> list[str]:
-    output = []
-    if root:
-        output.append(f"n{id(obj):x} [ label = <{escape(type(obj).__name__)}> ];")
-    for field in fields(obj):
-        val = getattr(obj, field.name)
-        if isinstance(val, expr.Expr) or isinstance(val, stmt.Stmt):
-            output.append(f"n{id(val):x} [ label = <{escape(type(val).__name__)}> ];")
-            output += dot(val)
-        elif isinstance(val, token.Token):
-            if val.literal is not None:
-                output.append(f"n{id(val):x} "
-                              f"[ label = <{'{'}{escape(val.type.name)}|{escape(repr(val.literal))}{'}'}> ];")
-            output.append(f"n{id(val):x} [ label = <{'{'}{escape(val.type.name)}{'}'}> ];")
+    return inp.translate(ESCAPES)
+
+
+# names of the fields of each node class worth exporting, internal annotations such as those added by the Resolver
+# are left out
+_FIELDS: dict[type, tuple[str, ...]] = {}
+
+
+def node_fields(node: Union[expr.Expr, stmt.Stmt]) -> tuple[str, ...]:
+    cls = type(node)
+    names = _FIELDS.get(cls)
+    if names is None:
+        names = _FIELDS[cls] = tuple(field.name for field in fields(node) if field.repr)
+    return names
+
+
+class Walker:
+    """Walks a tree of statements depth first without recursion, yielding ``(event, value, name)`` events:
+
+    * ``ENTER`` and ``EXIT`` a node.
+    * ``STUB`` for a node that isn't expanded: nodes deeper than ``max_depth`` (top-level statements are at depth
+      0), and every node once ``max_nodes`` nodes have been entered.
+    * ``LEAF`` for a token or value.
+    * ``OPEN`` and ``CLOSE`` a list of nodes. Once ``max_nodes`` nodes have been entered lists are closed early.
+
+    ``name`` is the field the value is in, or None for items of lists. Only the lists being walked are held in
+    memory, so ``tree`` can be a generator. ``truncated`` is set once the walk has left something out."""
+    def __init__(self, tree: Iterable[stmt.Stmt], max_depth: Optional[int] = None, max_nodes: Optional[int] = None):
+        self.tree = tree
+        self.max_depth = max_depth
+        self.max_nodes = max_nodes
+        self.nodes = 0
+        self.truncated = False
+
+    def full(self) -> bool:
+        return self.max_nodes is not None and self.nodes >= self.max_nodes
+
+    def __iter__(self) -> Iterator[tuple[int, Any, Optional[str]]]:
+        # a stack of (event, value, name, depth), where LEAF stands for any value, and CLOSE for a list iterator
+        stack: list[tuple[int, Any, Optional[str], int]] = [(CLOSE, iter(self.tree), None, 0)]
+        yield OPEN, None, None
+
+        while stack:
+            event, value, name, depth = stack.pop()
+            if event == CLOSE:
+                if not self.full():
+                    item = next(value, None)
+                    if item is not None:
+                        stack.append((event, value, name, depth))
+                        stack.append((LEAF, item, None, depth))
+                        continue
+                elif next(value, None) is not None:
+                    self.truncated = True
+                yield CLOSE, None, name
+            elif event == LEAF and isinstance(value, (expr.Expr, stmt.Stmt)):
+                if self.full() or (self.max_depth is not None and depth > self.max_depth):
+                    self.truncated = True
+                    yield STUB, value, name
+                    continue
+                self.nodes += 1
+                yield ENTER, value, name
+                stack.append((EXIT, value, name, depth))
+                for field in reversed(node_fields(value)):
+                    child = getattr(value, field)
+                    if isinstance(child, list):
+                        stack.append((CLOSE, iter(child), field, depth + 1))
+                        stack.append((OPEN, None, field, depth + 1))
+                    else:
+                        stack.append((LEAF, child, field, depth + 1))
+            else:
+                yield event, value, name
+
+
+def label(value: Any) -> str:
+    if isinstance(value, token.Token):
+        detail = repr(value.literal) if value.literal is not None else value.lexeme
+        return f"{{{escape(value.type.name)}|{escape(detail)}}}"
+    return escape(to_repr(value))
+
+
+def iter_dot(tree: Iterable[stmt.Stmt], max_depth: Optional[int] = None, max_nodes: Optional[int] = None,
+             root: Optional[stmt.Stmt] = None) -> Iterator[str]:
+    """Yield a graphviz diagram of ``tree`` line by line. ``root`` is the node layouts are centred on, by default
+    the first statement."""
+    walker = Walker(tree, max_depth, max_nodes)
+    # ids of the nodes being walked, the last is the parent of the next node or leaf
+    parents: list[str] = []
+    root_id = None
+    count = 0
+
+    yield "digraph G {\n"
+    yield HEADERS
+    for event, value, name in walker:
+        if event in (ENTER, STUB, LEAF):
+            node_id = f"n{count}"
+            count += 1
+            if event == LEAF:
+                yield f"    {node_id} [ label = <{label(value)}> ];\n"
+            elif event == STUB:
+                yield f"    {node_id} [ label = <{{{escape(expr.node_name(value))}|...}}> style = dashed ];\n"
+            else:
+                yield f"    {node_id} [ label = <{escape(expr.node_name(value))}> ];\n"
+            if parents:
+                yield f"    {parents[-1]} -> {node_id};\n"
+            if event == ENTER:
+                parents.append(node_id)
+                if root_id is None and (root is None or value is root):
+                    root_id = node_id
+        elif event == EXIT:
+            parents.pop()
+
+    if walker.truncated:
+        yield f"    truncated [ label = <truncated after {walker.nodes} nodes> shape = note ];\n"
+    if root_id is not None:
+        yield f"    root = {root_id};\n"
+    yield "}\n"
+
+
+def json_value(value: Any) -> Any:
+    if isinstance(value, token.Token):
+        obj = {"token": value.type.name, "lexeme": value.lexeme, "line": value.line}
+        if value.literal is not None:
+            obj["literal"] = json_value(value.literal)
+        return obj
+    elif isinstance(value, (LoxBool, LoxNil)):
+        return value.value
+    elif isinstance(value, float) and not math.isfinite(value):
+        # JSON has no NaN or Infinity, so these are written the way Lox prints them
+        return to_str(value)
+    return value
+
+
+def iter_json(tree: Iterable[stmt.Stmt], max_depth: Optional[int] = None,
+              max_nodes: Optional[int] = None) -> Iterator[str]:
+    """Yield a JSON document of ``tree`` in pieces. Nodes are objects with their class as ``"type"`` followed by
+    their fields, tokens are objects with ``"token"``, ``"lexeme"``, ``"line"`` and, if they have one,
+    ``"literal"``. Numbers that aren't finite are strings: ``"nan"``, ``"inf"`` or ``"-inf"``. Nodes that were
+    left out are ``{"type": ..., "truncated": true}``."""
+    walker = Walker(tree, max_depth, max_nodes)
+    # for each list being written, whether it has had an item yet
+    lists: list[bool] = []
+    # field and class names, encoded
+    names: dict[str, str] = {}
+
+    yield '{"statements": '
+    for event, value, name in walker:
+        if event == EXIT:
+            yield "}"
+            continue
+        elif event == CLOSE:
+            lists.pop()
+            yield "]"
+            continue
+
+        if name is not None:
+            # fields always follow a node's type
+            prefix = names.get(name) or names.setdefault(name, f", {json.dumps(name)}: ")
+        elif lists and lists[-1]:
+            prefix = ", "
+        else:
+            prefix = ""
+            if lists:
+                lists[-1] = True
+
+        if event == OPEN:
+            lists.append(False)
+            yield prefix + "["
+        elif event in (ENTER, STUB):
+            cls = expr.node_name(value)
+            node = names.get(cls) or names.setdefault(cls, f'{{"type": {json.dumps(cls)}')
+            yield prefix + node if event == ENTER else f'{prefix}{node}, "truncated": true}}'
+        else:
+            yield prefix + json.dumps(json_value(value), allow_nan=False)
+    yield f', "truncated": {json.dumps(walker.truncated)}}}\n'
+
+
+@dataclass(frozen=True)
+class AstExport:
+    """How to export a program's AST: as graphviz (``dot``) or ``json``, and how much of it. None means no limit."""
+    format: str = "dot"
+    max_depth: Optional[int] = None
+    max_nodes: Optional[int] = None
+
+    def __post_init__(self):
+        if self.format not in FORMATS:
+            raise ValueError(f"Unknown AST export format '{self.format}'.")
+
+    @classmethod
+    def of(cls, dot: Union[bool, 'AstExport']) -> Optional['AstExport']:
+        """The export for a ``dot`` argument, which is an AstExport, or True for the default one."""
+        if isinstance(dot, AstExport):
+            return dot
+        return cls() if dot else None
+
+    @property
+    def suffix(self) -> str:
+        return f".{self.format}"
+
+    def write(self, tree: Iterable[stmt.Stmt], file: TextIO):
+        if self.format == "dot":
+            chunks = iter_dot(tree, self.max_depth, self.max_nodes)
         else:
-            output.append(f"n{id(val):x} [ label = <{escape(to_repr(val))}> ];")
-        output.append(f"n{id(obj):x} -> n{id(val):x}")
-    return output
+            chunks = iter_json(tree, self.max_depth, self.max_nodes)
+        file.writelines(chunks)
 
 
 def dot_diagram(root: stmt.Stmt, tree: list[stmt.Stmt]) -> str:
-    lines = []
-    for s in tree:
-        lines += dot(s)
-    root_id = id(root)
-    nodes = "\n".join("    " + ln for ln in lines)
-    return "digraph G {\n" + HEADERS + f"    root = n{root_id:x};" + "\n\n" + nodes + "\n" + "}"
+    return "".join(iter_dot(tree, root=root))
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from ..grammar.token import Token, TokenType
 
 
@@ -39,6 +41,11 @@ class LoxRuntimeError(LoxException):
         return f"[line {self.token.line}] RuntimeError at '{self.token.lexeme}': {self.message}"
 
 
-class LoxBreakException(LoxException):
-    def __init__(self):
-        pass
+class LoxLimitError(LoxException):
+    """Raised when a program exceeds one of the Interpreter's resource limits."""
+    def __init__(self, line: Optional[int], message: str):
+        super().__init__(line, message)
+
+    def __str__(self) -> str:
+        where = f"[line {self.line}] " if self.line is not None else ""
+        return f"{where}LimitError: {self.message}"
@@ -1,6 +1,10 @@
 from . import exceptions
 from ..grammar import token
-from ..grammar.literals import AnyLiteral, LoxBool, LoxNil
+from ..grammar.literals import AnyLiteral, LoxBool, LoxNil, LoxRope, LoxString, TRUE, FALSE, NIL
+
+
+# concatenations shorter than this produce a plain str, it isn't worth deferring them
+ROPE_THRESHOLD = 64
 
 
 def to_repr(obj: AnyLiteral) -> str:
@@ -8,6 +12,8 @@ def to_repr(obj: AnyLiteral) -> str:
         return f"{obj:g}"
     elif isinstance(obj, str):
         return f'"{obj}"'
+    elif isinstance(obj, LoxRope):
+        return f'"{obj.flatten()}"'
     return str(obj)
 
 
@@ -16,25 +22,43 @@ def to_str(obj: AnyLiteral) -> str:
         return f"{obj:g}"
     elif isinstance(obj, str):
         return f'{obj}'
+    elif isinstance(obj, LoxRope):
+        return obj.flatten()
     return str(obj)
 
 
+def is_string(obj: AnyLiteral) -> bool:
+    return type(obj) is str or type(obj) is LoxRope
+
+
+def concat(left: LoxString, right: LoxString) -> LoxString:
+    if type(right) is LoxRope:
+        right = right.flatten()
+    if type(left) is LoxRope:
+        return left.append(right)
+    if len(left) + len(right) < ROPE_THRESHOLD:
+        return left + right
+    return LoxRope([left, right], 2, len(left) + len(right))
+
+
 def is_truthy(obj: AnyLiteral) -> bool:
-    if obj == LoxNil():
-        return False
-    elif isinstance(obj, LoxBool):
-        return obj.value
-    return True
+    return obj is not NIL and obj is not FALSE
 
 
 def is_equal(a: AnyLiteral, b: AnyLiteral) -> LoxBool:
-    if isinstance(a, LoxNil) and isinstance(b, LoxNil):
-        return LoxBool(True)
-    if type(a) == type(b):
-        return LoxBool(a == b)
-    return LoxBool(False)
+    if type(a) is LoxRope:
+        a = a.flatten()
+    if type(b) is LoxRope:
+        b = b.flatten()
+    if type(a) is not type(b):
+        return FALSE
+    # nil, true and false are singletons
+    if type(a) is LoxBool or type(a) is LoxNil:
+        return TRUE if a is b else FALSE
+    return TRUE if a == b else FALSE
 
 
 def check_num_operand(operator: token.Token, *operands: AnyLiteral):
-    if not all(isinstance(operand, float) for operand in operands):
-        raise exceptions.LoxRuntimeError(operator, "operand must be a number")
+    for operand in operands:
+        if not isinstance(operand, float):
+            raise exceptions.LoxRuntimeError(operator, "operand must be a number")
@@ -0,0 +1,173 @@
+from math import nan
+
+from .bytecode import (Chunk, CONSTANT, POP, POPN, GET_LOCAL, SET_LOCAL, GET_GLOBAL, SET_GLOBAL, DEFINE_GLOBAL,
+                       ADD, SUBTRACT, MULTIPLY, DIVIDE, MODULO, GREATER, GREATER_EQUAL, LESS, LESS_EQUAL, EQUAL,
+                       NOT_EQUAL, NOT, NEGATE, PRINT, REPR, ECHO, JUMP, JUMP_IF_FALSE, JUMP_IF_TRUE,
+                       POP_JUMP_IF_FALSE, RETURN)
+from .env import Env
+from .grammar.literals import TRUE, FALSE
+from .util.exceptions import LoxRuntimeError
+from .util.helpers import to_str, to_repr, is_truthy, is_equal, is_string, concat, check_num_operand
+
+
+class VM:
+    """Runs a Chunk produced by the Compiler, using ``env`` for global variables."""
+    def __init__(self, env: Env):
+        self.env = env
+
+    def run(self, chunk: Chunk):
+        code = chunk.code
+        constants = chunk.constants
+        env = self.env
+        writeline = env.output.writeline
+
+        stack: list = []
+        push = stack.append
+        pop = stack.pop
+        ip = 0
+
+        # the most frequently executed instructions are checked first
+        while True:
+            op = code[ip]
+
+            if op == GET_LOCAL:
+                if (val := stack[code[ip + 1]]) is None:
+                    name = constants[code[ip + 2]]
+                    raise LoxRuntimeError(name, f"Uninitialised variable '{name.lexeme}'.")
+                push(val)
+                ip += 3
+            elif op == CONSTANT:
+                push(constants[code[ip + 1]])
+                ip += 2
+            elif op == GET_GLOBAL:
+                push(env[constants[code[ip + 1]]])
+                ip += 2
+            elif op == POP_JUMP_IF_FALSE:
+                if is_truthy(pop()):
+                    ip += 2
+                else:
+                    ip = code[ip + 1]
+            elif op == JUMP:
+                ip = code[ip + 1]
+            elif op == SET_LOCAL:
+                stack[code[ip + 1]] = stack[-1]
+                ip += 2
+            elif op == POP:
+                pop()
+                ip += 1
+            elif op == ADD:
+                right = pop()
+                left = stack[-1]
+                if type(left) is float and type(right) is float:
+                    stack[-1] = left + right
+                elif is_string(left) and is_string(right):
+                    stack[-1] = concat(left, right)
+                else:
+                    raise LoxRuntimeError(constants[code[ip + 1]], "operands must be both numbers or both strings")
+                ip += 2
+            elif op == SUBTRACT:
+                right = pop()
+                left = stack[-1]
+                if type(left) is not float or type(right) is not float:
+                    raise LoxRuntimeError(constants[code[ip + 1]], "operand must be a number")
+                stack[-1] = left - right
+                ip += 2
+            elif op == MULTIPLY:
+                right = pop()
+                left = stack[-1]
+                if type(left) is not float or type(right) is not float:
+                    raise LoxRuntimeError(constants[code[ip + 1]], "operand must be a number")
+                stack[-1] = left * right
+                ip += 2
+            elif op == DIVIDE:
+                right = pop()
+                left = stack[-1]
+                if type(left) is not float or type(right) is not float:
+                    raise LoxRuntimeError(constants[code[ip + 1]], "operand must be a number")
+                try:
+                    stack[-1] = left / right
+                except ZeroDivisionError:
+                    stack[-1] = nan
+                ip += 2
+            elif op == MODULO:
+                right = pop()
+                left = stack[-1]
+                if type(left) is not float or type(right) is not float:
+                    raise LoxRuntimeError(constants[code[ip + 1]], "operand must be a number")
+                stack[-1] = left % right
+                ip += 2
+            elif op == LESS:
+                right = pop()
+                left = stack[-1]
+                if type(left) is not float or type(right) is not float:
+                    raise LoxRuntimeError(constants[code[ip + 1]], "operand must be a number")
+                stack[-1] = TRUE if left < right else FALSE
+                ip += 2
+            elif op == LESS_EQUAL:
+                right = pop()
+                left = stack[-1]
+                if type(left) is not float or type(right) is not float:
+                    raise LoxRuntimeError(constants[code[ip + 1]], "operand must be a number")
+                stack[-1] = TRUE if left <= right else FALSE
+                ip += 2
+            elif op == GREATER:
+                right = pop()
+                left = stack[-1]
+                if type(left) is not float or type(right) is not float:
+                    raise LoxRuntimeError(constants[code[ip + 1]], "operand must be a number")
+                stack[-1] = TRUE if left > right else FALSE
+                ip += 2
+            elif op == GREATER_EQUAL:
+                right = pop()
+                left = stack[-1]
+                if type(left) is not float or type(right) is not float:
+                    raise LoxRuntimeError(constants[code[ip + 1]], "operand must be a number")
+                stack[-1] = TRUE if left >= right else FALSE
+                ip += 2
+            elif op == EQUAL:
+                right = pop()
+                stack[-1] = is_equal(stack[-1], right)
+                ip += 1
+            elif op == NOT_EQUAL:
+                right = pop()
+                stack[-1] = FALSE if is_equal(stack[-1], right) is TRUE else TRUE
+                ip += 1
+            elif op == JUMP_IF_FALSE:
+                if is_truthy(stack[-1]):
+                    ip += 2
+                else:
+                    ip = code[ip + 1]
+            elif op == JUMP_IF_TRUE:
+                if is_truthy(stack[-1]):
+                    ip = code[ip + 1]
+                else:
+                    ip += 2
+            elif op == NOT:
+                stack[-1] = FALSE if is_truthy(stack[-1]) else TRUE
+                ip += 1
+            elif op == NEGATE:
+                check_num_operand(constants[code[ip + 1]], stack[-1])
+                stack[-1] = -stack[-1]
+                ip += 2
+            elif op == SET_GLOBAL:
+                env.assign(constants[code[ip + 1]], stack[-1])
+                ip += 2
+            elif op == DEFINE_GLOBAL:
+                env.define(constants[code[ip + 1]], pop())
+                ip += 2
+            elif op == POPN:
+                del stack[-code[ip + 1]:]
+                ip += 2
+            elif op == PRINT:
+                writeline(to_str(pop()))
+                ip += 1
+            elif op == REPR:
+                writeline(to_repr(pop()))
+                ip += 1
+            elif op == ECHO:
+                writeline(to_repr(pop()))
+                ip += 1
+            elif op == RETURN:
+                return
+            else:
+                raise RuntimeError(f"Unknown opcode {op} at {ip}")
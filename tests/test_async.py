@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+
+from pylox.lox import Lox
+from pylox.budget import Budget
+from pylox.output import OutputSink
+
+
+PROGRAMS = [
+    "var t = 0; for (var i = 0; i < 50; i = i + 1) { if (i == 40) break; t = t + i; } print t;",
+    "var a = 1; { var a = 2; { print a; } } print a; if (a > 0) { print \"yes\"; } else print \"no\";",
+    "var i = 0; while (true) { i = i + 1; { { if (i > 3) break; } } } print i;",
+]
+
+
+def run_async(source: str, budget: int, output: OutputSink) -> Lox:
+    lox = Lox(output=output)
+    asyncio.run(lox.interpreter.interpret_async(lox.compile(source), budget=budget))
+    return lox
+
+
+@pytest.mark.parametrize("budget", [1, 3, 1000])
+@pytest.mark.parametrize("source", PROGRAMS)
+def test_matches_sync(source, budget):
+    expected = OutputSink.capture()
+    Lox(output=expected).run(source)
+    output = OutputSink.capture()
+    run_async(source, budget, output)
+    assert output.getvalue() == expected.getvalue()
+
+
+def test_long_loop_yields_to_event_loop():
+    ticks = 0
+    done = False
+
+    async def ticker():
+        nonlocal ticks
+        while not done:
+            ticks += 1
+            await asyncio.sleep(0)
+
+    async def main():
+        nonlocal done
+        lox = Lox(output=OutputSink.capture())
+        task = asyncio.create_task(ticker())
+        await lox.interpreter.interpret_async(lox.compile("for (var i = 0; i < 2000; i = i + 1) {}"), budget=100)
+        done = True
+        await task
+
+    asyncio.run(main())
+    assert ticks >= 19
+
+
+def test_programs_interleave():
+    order = []
+
+    class Recorder:
+        def __init__(self, name):
+            self.name = name
+
+        def write(self, text):
+            order.append(self.name)
+
+        def flush(self):
+            pass
+
+    async def main():
+        sinks = [OutputSink(Recorder(n), buffer_size=0) for n in "ab"]
+        programs = [Lox(output=sink) for sink in sinks]
+        await asyncio.gather(*(lox.interpreter.interpret_async(lox.compile(
+            "for (var i = 0; i < 5; i = i + 1) print i;"), budget=2) for lox in programs))
+
+    asyncio.run(main())
+    assert order[:2] != ["a", "a"] and sorted(order) == ["a"] * 5 + ["b"] * 5
+
+
+def test_invalid_budget_and_backend():
+    with pytest.raises(ValueError):
+        Budget(0)
+    lox = Lox(backend="vm")
+    with pytest.raises(ValueError):
+        asyncio.run(lox.interpreter.interpret_async([]))
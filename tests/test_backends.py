@@ -0,0 +1,87 @@
+import pytest
+
+from pylox.lox import Lox
+from pylox.env import Env
+from pylox.grammar.statement import BREAK
+
+
+PROGRAMS = [
+    "print 2 + 3 * 4 - 6 / 3 % 4;",
+    'var a = "foo"; var b = "bar"; print a + b; repr a + b;',
+    "var a = 1; { var a = a + 1; print a; { var b = a * 10; print b; } } print a;",
+    "var a; { var b; b = 2; a = b; } print a;",
+    "var i = 0; while (i < 5) { i = i + 1; } print i;",
+    "for (var i = 0; i < 10; i = i + 1) { if (i == 3) break; print i; }",
+    "for (var i = 0; i < 3; i = i + 1) { var j = i; while (true) { var k = j; break; } print j; }",
+    'print nil or "yes"; print false and 1; print 1 and 2; print 3 or 4;',
+    "if (1 > 2) print 1; else if (2 >= 2) print 2; else print 3;",
+    "print -(1 - 4); print 1 / 0;",
+    "var a = 1; { var a = 2; var a = 3; print a; } print a;",
+]
+
+
+@pytest.mark.parametrize("source", PROGRAMS)
+def test_vm_matches_tree(capsys, source):
+    Lox.run_inline(source)
+    expected = capsys.readouterr()
+    Lox.run_inline(source, backend="vm")
+    assert capsys.readouterr() == expected
+
+
+def test_vm_uninitialised_local(capsys):
+    Lox.run_inline("{ var a; print a; }", backend="vm")
+    assert capsys.readouterr().err == "[line 1] RuntimeError at 'a': Uninitialised variable 'a'.\n"
+
+
+def test_vm_undefined_global(capsys):
+    Lox.run_inline("print a;", backend="vm")
+    assert capsys.readouterr().err == "[line 1] RuntimeError at 'a': Undefined variable 'a'.\n"
+
+
+def test_vm_operand_error(capsys):
+    Lox.run_inline('print 1 +\n"a";', backend="vm")
+    assert capsys.readouterr().err == "[line 1] RuntimeError at '+': operands must be both numbers or both strings\n"
+
+
+def test_vm_globals_persist():
+    lox = Lox(backend="vm")
+    lox.run("var a = 1;")
+    lox.run("a = a + 1;")
+    assert lox.interpreter.env._values["a"] == 2
+
+
+@pytest.mark.parametrize("source", PROGRAMS)
+def test_closure_matches_tree(capsys, source):
+    Lox.run_inline(source)
+    expected = capsys.readouterr()
+    Lox.run_inline(source, backend="closure")
+    assert capsys.readouterr() == expected
+
+
+def test_closure_operand_error(capsys):
+    Lox.run_inline('print 1 - "a";', backend="closure")
+    assert capsys.readouterr().err == "[line 1] RuntimeError at '-': operand must be a number\n"
+
+
+BREAK_PROGRAMS = [
+    "var i = 0; while (true) { { { i = i + 1; if (i > 4) break; } } } print i;",
+    "for (var i = 0; i < 3; i = i + 1) { for (var j = 0; j < 3; j = j + 1) { if (j > i) break; print j; } }",
+    "var a = 0; while (a < 10) { a = a + 1; if (a == 2) { print a; } else if (a == 5) { break; } } print a;",
+]
+
+
+@pytest.mark.parametrize("backend", ["tree", "closure", "vm"])
+@pytest.mark.parametrize("source", BREAK_PROGRAMS)
+def test_break(capsys, backend, source):
+    Lox.run_inline(source, backend=backend)
+    assert capsys.readouterr().out == {
+        BREAK_PROGRAMS[0]: "5\n",
+        BREAK_PROGRAMS[1]: "0\n0\n1\n0\n1\n2\n",
+        BREAK_PROGRAMS[2]: "2\n5\n",
+    }[source]
+
+
+def test_break_signal_does_not_escape_loop():
+    stmts = Lox().compile("while (true) { { break; } }")
+    assert stmts[0].body.eval(Env()) is BREAK
+    assert stmts[0].eval(Env()) is None
@@ -0,0 +1,41 @@
+from pylox.batch import collect_scripts, run_batch, run_script, summarise, EX_SOFTWARE
+
+
+def write_scripts(tmp_path):
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "a.lox").write_text("print 1 + 2;")
+    (tmp_path / "b.lox").write_text('print "b"; print 1 + nil;')
+    (tmp_path / "sub" / "c.lox").write_text("print (1;")
+    (tmp_path / "notes.txt").write_text("# scripts\na.lox\n\nsub/c.lox\n")
+
+
+def test_collect_scripts(tmp_path):
+    write_scripts(tmp_path)
+    names = lambda paths: [p.relative_to(tmp_path).as_posix() for p in paths]  # noqa: E731
+    assert names(collect_scripts([str(tmp_path)])) == ["a.lox", "b.lox", "sub/c.lox"]
+    assert names(collect_scripts([str(tmp_path / "notes.txt")])) == ["a.lox", "sub/c.lox"]
+    assert names(collect_scripts([str(tmp_path / "*.lox"), str(tmp_path / "sub" / "c.lox")])) == \
+        ["a.lox", "b.lox", "sub/c.lox"]
+
+
+def test_run_batch_isolates_scripts(tmp_path):
+    write_scripts(tmp_path)
+    scripts = collect_scripts([str(tmp_path)])
+    results = list(run_batch(scripts, jobs=2, use_cache=False))
+
+    assert [r.path for r in results] == [str(s) for s in scripts]
+    a, b, c = results
+    assert (a.status, a.stdout, a.stderr) == (0, "3\n", "")
+    assert (b.status, b.stdout) == (65, "b\n")
+    assert "RuntimeError" in b.stderr
+    assert c.status == 65 and "SyntaxError" in c.stderr and c.stdout == ""
+
+    summary = summarise(results, 1.0)
+    assert summary["passed"] == 1
+    assert summary["failed"] == [str(scripts[1]), str(scripts[2])]
+
+
+def test_missing_script(tmp_path):
+    result = run_script(tmp_path / "missing.lox")
+    assert result.status == EX_SOFTWARE
+    assert "FileNotFoundError" in result.stderr
@@ -0,0 +1,27 @@
+import pytest
+
+from benchmarks.suite import WORKLOADS, PHASES, time_phases, compare
+from pylox.lox import Lox
+
+
+@pytest.mark.parametrize("name", WORKLOADS)
+def test_workload_runs_on_every_backend(capsys, name):
+    source = WORKLOADS[name](1)
+    Lox.run_inline(source)
+    expected = capsys.readouterr()
+    assert expected.err == ""
+    for backend in ("closure", "vm"):
+        Lox.run_inline(source, backend=backend)
+        assert capsys.readouterr() == expected
+
+
+def test_time_phases():
+    times = time_phases("var a = 1; print a + 2;")
+    assert tuple(times) == PHASES
+    assert all(t >= 0 for t in times.values())
+
+
+def test_compare():
+    baseline = {"a": {"lex": 1.0, "parse": 1.0}, "b": {"lex": 1.0}}
+    results = {"a": {"lex": 1.05, "parse": 1.5}, "b": {"lex": 0.5}, "c": {"lex": 9.0}}
+    assert compare(results, baseline, threshold=0.1) == [("a", "parse", 1.5)]
@@ -0,0 +1,88 @@
+import pytest
+
+from pylox.lox import Lox
+from pylox import cache
+from pylox.grammar import expr
+
+
+SCRIPT = 'var a = 2; { var b = a * 3; if (b > 5) print "big " + "b"; else print nil; } print true;\n'
+
+
+def compiled(source: str):
+    return Lox().compile(source)
+
+
+def test_round_trip(tmp_path):
+    script = tmp_path / "a.lox"
+    stmts = compiled(SCRIPT)
+    cache.store(script, SCRIPT, True, stmts)
+    assert cache.cache_path(script).exists()
+
+    loaded = cache.load(script, SCRIPT, True)
+    assert repr(loaded) == repr(stmts)
+    # resolution results are kept too
+    assert loaded[1].size == stmts[1].size == 1
+
+
+def test_stale_entries_ignored(tmp_path):
+    script = tmp_path / "a.lox"
+    cache.store(script, SCRIPT, True, compiled(SCRIPT))
+    assert cache.load(script, SCRIPT + "print 1;", True) is None
+    assert cache.load(script, SCRIPT, False) is None
+
+
+def test_corrupt_entries_ignored(tmp_path):
+    script = tmp_path / "a.lox"
+    cache.store(script, SCRIPT, True, compiled(SCRIPT))
+    path = cache.cache_path(script)
+    path.write_bytes(path.read_bytes()[:-10])
+    assert cache.load(script, SCRIPT, True) is None
+
+
+def test_run_file_uses_cache(tmp_path, capsys):
+    script = tmp_path / "a.lox"
+    script.write_text(SCRIPT)
+    Lox.run_file(script)
+    first = capsys.readouterr()
+    assert first.out == "big b\ntrue\n"
+
+    cache.cache_path(script).write_bytes(b"garbage")
+    Lox.run_file(script)
+    assert capsys.readouterr() == first
+
+    Lox.run_file(script)
+    assert capsys.readouterr() == first
+
+    script.write_text("print 1;")
+    Lox.run_file(script)
+    assert capsys.readouterr().out == "1\n"
+
+
+def test_no_cache(tmp_path, capsys):
+    script = tmp_path / "a.lox"
+    script.write_text(SCRIPT)
+    Lox.run_file(script, use_cache=False)
+    assert not cache.cache_path(script).parent.exists()
+
+
+def test_unfoldable_binary(tmp_path, capsys):
+    script = tmp_path / "a.lox"
+    script.write_text('print "x";\nprint 1 + "a";\nprint 1 % 0;\n')
+    for _ in range(2):
+        with pytest.raises(SystemExit):
+            Lox.run_file(script)
+        captured = capsys.readouterr()
+        assert captured.out == "x\n"
+        assert "RuntimeError at '+'" in captured.err
+    assert cache.load(script, script.read_text(), True) is not None
+
+
+def test_specialised_nodes_stored_as_binary(tmp_path):
+    script = tmp_path / "a.lox"
+    source = "var a = 1; print a + a;"
+    lox = Lox(optimize=False)
+    stmts = lox.compile(source)
+    lox.execute(stmts)
+    assert type(stmts[1].expression) is expr.FloatAdd
+    cache.store(script, source, False, stmts)
+    assert type(cache.load(script, source, False)[1].expression) is expr.Binary
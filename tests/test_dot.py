@@ -0,0 +1,99 @@
+import json
+import re
+
+import pytest
+
+from pylox.lox import Lox
+from pylox.lexer import Lexer
+from pylox.parser import Parser
+from pylox.grammar.expression import Grouping, Literal
+from pylox.grammar.statement import Print
+from pylox.util.dot import AstExport, iter_dot, iter_json
+
+
+SOURCE = 'var a = "x"; { print a + 1; print true; } while (a) break;'
+
+
+def parse(source: str = SOURCE):
+    return Parser(Lexer(source).scan_tokens()).parse()
+
+
+def test_dot_defines_each_node_once():
+    diagram = "".join(iter_dot(parse()))
+    defined = re.findall(r"^    (n\d+) \[", diagram, re.M)
+    assert len(defined) == len(set(defined))
+    for parent, child in re.findall(r"^    (n\d+) -> (n\d+);", diagram, re.M):
+        assert parent in defined and child in defined
+    # statements inside blocks are walked too
+    assert diagram.count("label = <Print>") == 2
+    assert "label = <{IDENTIFIER|a}>" in diagram
+
+
+def test_json():
+    document = json.loads("".join(iter_json(parse())))
+    assert not document["truncated"]
+    var, block, loop = document["statements"]
+    assert var == {"type": "Var", "name": {"token": "IDENTIFIER", "lexeme": "a", "line": 1},
+                   "initialiser": {"type": "Literal", "value": "x"}}
+    assert [s["expression"]["type"] for s in block["statements"]] == ["Binary", "Literal"]
+    assert block["statements"][1]["expression"]["value"] is True
+    assert loop["body"] == {"type": "Break"}
+
+
+def test_deep_trees_dont_recurse():
+    expression = Literal(1.0)
+    for _ in range(50_000):
+        expression = Grouping(expression)
+    tree = [Print(expression)]
+    assert "".join(iter_dot(tree)).count("label = <Grouping>") == 50_000
+    document = "".join(iter_json(tree))
+    assert document.count('{"type": "Grouping", "expression": ') == 50_000
+    assert document.endswith('{"type": "Literal", "value": 1.0}' + "}" * 50_001 + '], "truncated": false}\n')
+
+
+def test_max_depth():
+    document = json.loads("".join(iter_json(parse(), max_depth=1)))
+    assert document["truncated"]
+    print_ = document["statements"][1]["statements"][0]
+    assert print_ == {"type": "Print", "expression": {"type": "Binary", "truncated": True}}
+    assert "<{Binary|...}> style = dashed" in "".join(iter_dot(parse(), max_depth=1))
+
+
+def test_max_nodes():
+    document = json.loads("".join(iter_json(parse(), max_nodes=3)))
+    assert document["truncated"]
+    assert [s["type"] for s in document["statements"]] == ["Var", "Block"]
+    assert document["statements"][1]["statements"] == []
+    diagram = "".join(iter_dot(parse(), max_nodes=3))
+    assert "truncated after 3 nodes" in diagram and "While" not in diagram
+
+
+def test_export_from_lox(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    Lox.run_inline("print 1;", dot=AstExport("json"))
+    assert capsys.readouterr().out == "1\n"
+    assert json.loads((tmp_path / "cmd.json").read_text())["statements"][0]["type"] == "Print"
+    Lox.run_inline("print 1;", dot=True)
+    assert (tmp_path / "cmd.dot").read_text().startswith("digraph G {")
+
+
+def test_unknown_format():
+    with pytest.raises(ValueError):
+        AstExport("xml")
+
+
+def test_specialised_nodes_are_exported_as_binary():
+    lox = Lox(optimize=False)
+    stmts = lox.compile('var a = 1; print a + a; print a + "b";')
+    lox.execute(stmts)
+    diagram = "".join(iter_dot(stmts))
+    assert diagram.count("label = <Binary>") == 2 and "Float" not in diagram and "Generic" not in diagram
+    document = json.loads("".join(iter_json(stmts)))
+    assert [s["expression"]["type"] for s in document["statements"][1:]] == ["Binary", "Binary"]
+
+
+def test_json_non_finite_numbers():
+    tree = [Print(Literal(float(value))) for value in ("nan", "inf", "-inf")]
+    tree.append(Print(Literal(1.5)))
+    document = json.loads("".join(iter_json(tree)), parse_constant=pytest.fail)
+    assert [s["expression"]["value"] for s in document["statements"]] == ["nan", "inf", "-inf", 1.5]
@@ -0,0 +1,115 @@
+import pytest
+
+from pylox.lox import Lox
+from pylox.grammar.expression import Assign, Binary
+from pylox.hooks import EVENTS
+from pylox.util.exceptions import LoxRuntimeError
+
+
+def run(source: str, **hooks) -> Lox:
+    lox = Lox()
+    for event, callback in hooks.items():
+        lox.interpreter.add_hook(event, callback)
+    lox.run(source)
+    return lox
+
+
+def test_statement_enter_exit(capsys):
+    events = []
+    run("print 1; { var a = 2; }",
+        statement_enter=lambda stmt, env: events.append(("enter", type(stmt).__name__)),
+        statement_exit=lambda stmt, env: events.append(("exit", type(stmt).__name__)))
+    assert capsys.readouterr().out == "1\n"
+    assert events == [("enter", "Print"), ("exit", "Print"),
+                      ("enter", "Block"), ("enter", "Var"), ("exit", "Var"), ("exit", "Block")]
+
+
+def test_define_and_assign():
+    events = []
+    run("var a = 1; var b; { var c = a + 1; c = c * 3; } a = 5;",
+        define=lambda name, value, env: events.append(("define", name.lexeme, value)),
+        assign=lambda name, value, env: events.append(("assign", name.lexeme, value)))
+    assert events == [("define", "a", 1.0), ("define", "b", None), ("define", "c", 2.0),
+                      ("assign", "c", 6.0), ("assign", "a", 5.0)]
+
+
+def test_loop_iterations(capsys):
+    iterations = []
+    run("var i = 0; while (i < 5) { i = i + 1; if (i == 3) break; } print i;",
+        loop_iteration=lambda stmt, env: iterations.append(stmt))
+    assert capsys.readouterr().out == "3\n"
+    assert len(iterations) == 3
+
+
+def test_error(capsys):
+    errors = []
+    run('print 1 + "a";', error=errors.append)
+    assert len(errors) == 1
+    assert isinstance(errors[0], LoxRuntimeError)
+    assert "operands" in capsys.readouterr().err
+
+
+def test_no_hooks_leaves_tree_untouched():
+    lox = Lox()
+    stmts = lox.compile("print a + 1;")
+    lox.interpreter.add_hook("assign", lambda *args: None)
+    lox.interpreter.hooks.instrument(stmts)
+    # only the classes involved in an event with callbacks are instrumented
+    assert type(stmts[0].expression) is Binary
+
+
+def test_hook_added_later_is_fired():
+    lox = Lox()
+    stmts = lox.compile("var a = 1; a = 2;")
+    lox.interpreter.add_hook("define", lambda *args: None)
+    lox.interpreter.interpret(stmts)
+    assigned = []
+    lox.interpreter.add_hook("assign", lambda name, value, env: assigned.append(value))
+    defined = []
+    lox.interpreter.add_hook("define", lambda name, value, env: defined.append(value))
+    lox.interpreter.interpret(stmts)
+    assert assigned == [2.0]
+    assert defined == [1.0]
+
+
+def test_remove_hook(capsys):
+    events = []
+    lox = Lox()
+    lox.interpreter.add_hook("statement_enter", events.append)
+    lox.interpreter.remove_hook("statement_enter", events.append)
+    lox.run("print 1;")
+    assert events == []
+
+
+def test_invalid_hooks():
+    lox = Lox()
+    with pytest.raises(ValueError):
+        lox.interpreter.add_hook("nonsense", print)
+    with pytest.raises(ValueError):
+        Lox(backend="vm").interpreter.add_hook("error", print)
+    assert "error" in EVENTS
+
+
+def test_hooks_dont_leak_between_interpreters(capsys):
+    events = []
+    first, second = Lox(), Lox()
+    stmts = first.compile("var a = 1; a = 2; print a;")
+    first.interpreter.add_hook("assign", lambda name, value, env: events.append(value))
+    first.interpreter.interpret(stmts)
+    assert all(type(stmt).__module__ == "pylox.grammar.statement" for stmt in stmts)
+
+    second.interpreter.interpret(stmts)
+    assert events == [2.0]
+    assert capsys.readouterr().out == "2\n2\n"
+
+
+def test_removed_hook_unwraps_nodes():
+    lox = Lox()
+    stmts = lox.compile("var a = 1; a = 2;")
+    classes = []
+    lox.interpreter.add_hook("assign", lambda name, value, env: None)
+    lox.interpreter.add_hook("statement_enter", lambda stmt, env: classes.append(type(stmts[1].expression)))
+    lox.interpreter.interpret(stmts)
+    lox.interpreter.remove_hook("assign", lox.interpreter.hooks.callbacks["assign"][0])
+    lox.interpreter.interpret(stmts)
+    assert classes[1] is not Assign and classes[-1] is Assign
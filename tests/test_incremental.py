@@ -0,0 +1,99 @@
+import random
+
+import pytest
+
+from pylox.lexer import Lexer
+from pylox.parser import Parser
+from pylox.incremental import Document
+from pylox.util.exceptions import LoxParseError, LoxSyntaxError
+
+
+SOURCE = """var a = 1;
+// a comment
+var s = "two
+lines";
+if (a > 0) print a; else print "no";
+while (a < 10) { a = a + 1; if (a == 5) break; }
+for (var i = 0; i < 3; i = i + 1) print i * 2.5;
+print s;
+"""
+
+PIECES = ["", " ", "\n", ";", "1", "2.5", "a", "var", "or", "print", "//", "\"", "{", "}", "(", ")", "=", "==",
+          "!", "+", "if", "else", "b;", "\"x\"", "/*", "*/"]
+
+
+def full(source: str):
+    tokens = Lexer(source).scan_tokens()
+    return tokens, Parser(tokens).parse()
+
+
+def check(document: Document):
+    try:
+        tokens, statements = full(document.source)
+    except (LoxParseError, LoxSyntaxError):
+        return
+    assert [(t.type, t.lexeme, t.line) for t in document.tokens] == [(t.type, t.lexeme, t.line) for t in tokens]
+    assert repr(document.statements) == repr(statements)
+
+
+def test_edit_matches_full_parse():
+    document = Document(SOURCE)
+    check(document)
+    document.edit(SOURCE.index("1;"), 1, "42")
+    check(document)
+    document.edit(0, 0, "print 0;\n\n")
+    check(document)
+    document.edit(len(document.source), 0, "print a;")
+    check(document)
+
+
+def test_unchanged_declarations_are_reused():
+    document = Document(SOURCE)
+    before = document.statements
+    document.edit(SOURCE.index("10"), 2, "20")
+    after = document.statements
+    changed = [i for i, (old, new) in enumerate(zip(before, after)) if old is not new]
+    assert changed == [3]
+    assert after[3].condition.right.value == 20.0
+
+
+def test_lines_after_edit_are_updated():
+    document = Document(SOURCE)
+    document.edit(0, 0, "\n\n")
+    assert document.statements[-1].expression.name.line == 10
+    check(document)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_random_edits_match_full_parse(seed):
+    rng = random.Random(seed)
+    document = Document(SOURCE)
+    for _ in range(100):
+        offset = rng.randint(0, len(document.source))
+        removed = rng.randint(0, min(4, len(document.source) - offset))
+        inserted = "".join(rng.choice(PIECES) for _ in range(rng.randint(0, 3)))
+        old = document.source[offset:offset + removed]
+        try:
+            document.edit(offset, removed, inserted)
+        except (LoxParseError, LoxSyntaxError):
+            with pytest.raises((LoxParseError, LoxSyntaxError)):
+                full(document.source)
+            # undo the edit, so the document doesn't stay broken
+            document.edit(offset, len(inserted), old)
+        check(document)
+
+
+def test_errors_then_recovery():
+    document = Document("print 1;")
+    with pytest.raises(LoxSyntaxError):
+        document.edit(7, 1, "")
+    with pytest.raises(ValueError):
+        document.statements
+    with pytest.raises(LoxParseError):
+        document.edit(7, 0, ";\"")
+    assert repr(document.edit(8, 1, "")) == repr(full("print 1;")[1])
+
+
+def test_edit_outside_source():
+    with pytest.raises(ValueError):
+        Document("print 1;").edit(5, 10, "")
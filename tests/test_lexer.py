@@ -0,0 +1,53 @@
+import math
+
+import pytest
+
+from pylox.lexer import Lexer
+from pylox.grammar.token import TokenType
+from pylox.util.exceptions import LoxParseError
+
+
+def scan(source: str):
+    return [(t.type, t.lexeme, t.line, t.literal) for t in Lexer(source).scan_tokens()]
+
+
+def test_operators_and_keywords():
+    assert [t[0] for t in scan("var x = !a != b <= c; // done\n")] == [
+        TokenType.VAR, TokenType.IDENTIFIER, TokenType.EQUAL, TokenType.BANG, TokenType.IDENTIFIER,
+        TokenType.BANG_EQUAL, TokenType.IDENTIFIER, TokenType.LESS_EQUAL, TokenType.IDENTIFIER,
+        TokenType.SEMICOLON, TokenType.EOF,
+    ]
+
+
+def test_numbers():
+    assert scan("1 2.5 3e2 4e-1 5.")[:-1] == [
+        (TokenType.NUMBER, "1", 1, 1.0),
+        (TokenType.NUMBER, "2.5", 1, 2.5),
+        (TokenType.NUMBER, "3e2", 1, 300.0),
+        (TokenType.NUMBER, "4e-1", 1, 0.4),
+        (TokenType.NUMBER, "5", 1, 5.0),
+        (TokenType.DOT, ".", 1, None),
+    ]
+
+
+def test_nan_inf():
+    (_, _, _, nan), (_, _, _, inf), _ = scan("nan inf")
+    assert math.isnan(nan) and inf == math.inf
+
+
+def test_multiline_string_and_comment_lines():
+    tokens = scan('/* a\nb */ "x\ny" z')
+    assert tokens[0] == (TokenType.STRING, '"x\ny"', 3, "x\ny")
+    assert tokens[1] == (TokenType.IDENTIFIER, "z", 3, None)
+
+
+@pytest.mark.parametrize("source, line, message", [
+    ('a\n"abc\n', 3, "Unterminated string."),
+    ("/* abc\n\n", 3, "Unterminated comment."),
+    ("a\n@", 2, "Unexepected character."),
+    ("1e2e+3", 1, "Unable to parse number."),
+])
+def test_errors(source, line, message):
+    with pytest.raises(LoxParseError) as e:
+        Lexer(source).scan_tokens()
+    assert (e.value.line, e.value.message) == (line, message)
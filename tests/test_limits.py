@@ -0,0 +1,138 @@
+import asyncio
+
+import pytest
+
+from pylox.lox import Lox
+from pylox.grammar.statement import Block
+from pylox.interpreter import Interpreter
+from pylox.limits import Limits
+from pylox.profiler import Profiler
+from pylox.util.exceptions import LoxLimitError
+
+
+def run(source: str, **limits) -> Lox:
+    lox = Lox(limits=Limits(**limits))
+    lox.interpreter.interpret(lox.compile(source))
+    return lox
+
+
+def test_max_steps():
+    with pytest.raises(LoxLimitError, match="100 steps"):
+        run("var i = 0; while (true) { i = i + 1; }", max_steps=100)
+    run("for (var i = 0; i < 10; i = i + 1) {}", max_steps=100)
+
+
+def test_timeout():
+    with pytest.raises(LoxLimitError, match="time limit"):
+        run("while (true) {}", timeout=0.05)
+
+
+def test_max_string_length():
+    with pytest.raises(LoxLimitError, match="'s' exceeded the limit of 100 characters") as e:
+        run('var s = "ab";\nwhile (true) { s = s + s; }', max_string_length=100)
+    assert e.value.line == 2
+    run('var s = "ab"; { var t = s + s; }', max_string_length=4)
+
+
+def test_max_depth():
+    with pytest.raises(LoxLimitError, match="2 nested scopes"):
+        run("{ var a = 1; { var b = 2; { var c = 3; } } }", max_depth=2)
+    # blocks without their own frame don't count
+    run("{ var a = 1; { { { var b = 2; } } } }", max_depth=2)
+
+
+def test_limits_reset_between_programs(capsys):
+    lox = Lox(limits=Limits(max_steps=5))
+    for _ in range(3):
+        lox.run("print 1; print 2; print 3;")
+    assert capsys.readouterr() == ("1\n2\n3\n" * 3, "")
+
+
+def test_reported_like_other_errors(capsys):
+    Lox.run_inline('print "a"; while (true) {}', limits=Limits(max_steps=10))
+    out, err = capsys.readouterr()
+    assert out == "a\n"
+    assert err == "LimitError: exceeded the limit of 10 steps.\n"
+
+
+def test_no_limits_adds_no_hooks():
+    assert not Limits()
+    assert not Lox(limits=Limits()).interpreter.hooks
+    with pytest.raises(ValueError):
+        Lox(backend="vm", limits=Limits(max_steps=1))
+
+
+def test_limits_dont_leak_between_interpreters(capsys):
+    stmts = Lox().compile("var i = 0; while (i < 100) i = i + 1; print i;")
+    limited = Interpreter(limits=Limits(max_steps=60))
+    with pytest.raises(LoxLimitError):
+        limited.interpret(stmts)
+    steps = limited.env.limits.steps
+    Interpreter().interpret(stmts)
+    assert capsys.readouterr().out == "100\n"
+    assert limited.env.limits.steps == steps
+    assert all(type(stmt).__module__ == "pylox.grammar.statement" for stmt in stmts)
+
+
+def test_stream_limits_apply_to_the_whole_script(tmp_path, capsys):
+    script = tmp_path / "a.lox"
+    script.write_text("var i = 0;\n" + "i = i + 1;\n" * 300 + "print i;\n")
+    for stream in (False, True):
+        with pytest.raises(SystemExit):
+            Lox.run_file(script, stream=stream, use_cache=False, limits=Limits(max_steps=50))
+        out, err = capsys.readouterr()
+        assert out == "" and "50 steps" in err
+
+
+def test_prepared_programs_keep_limits():
+    program = Lox(limits=Limits(max_steps=5)).prepare("var i = 0; while (i < 1000) i = i + 1; print i;")
+    for _ in range(2):
+        with pytest.raises(LoxLimitError):
+            program.run()
+
+
+def test_prepared_program_runs_have_their_own_budgets(capsys):
+    program = Lox(limits=Limits(max_steps=100)).prepare("var i = 0; while (i < n) i = i + 1; print i;")
+    program.run({"n": 90})
+    with pytest.raises(LoxLimitError):
+        program.run({"n": 1000})
+    program.run({"n": 90})
+    assert capsys.readouterr().out == "90\n90\n"
+
+
+def test_async_rejects_limits():
+    lox = Lox(limits=Limits(max_steps=5))
+    with pytest.raises(ValueError, match="limits"):
+        asyncio.run(lox.interpreter.interpret_async(lox.compile("print 1;")))
+
+
+def test_max_depth_only_instruments_blocks_with_frames():
+    lox = Lox(limits=Limits(max_depth=5))
+    stmts = lox.compile("{ var a = 1; { print a; } }")
+    seen = []
+    lox.interpreter.add_hook("statement_enter", lambda stmt, env: seen.append(type(stmt).__base__))
+    lox.interpreter.interpret(stmts)
+    # hooks wrap the classes they find, the limits' subclass of Block for the outer block only
+    assert seen[0] is not Block and seen[2] is Block
+
+
+@pytest.mark.parametrize("limits", [Limits(max_steps=1000), Limits(max_string_length=100), Limits(max_depth=5),
+                                    Limits(timeout=10)])
+def test_profiling_with_limits(limits, capsys):
+    profiler = Profiler()
+    Lox(profiler=profiler, limits=limits).run("var i = 0;\nwhile (i < 3) {\nvar s = \"a\";\ni = i + 1; }")
+    counts = {entry.label: entry.count for entry in profiler.stats.values()}
+    assert counts["Var i"] == 1 and counts["While"] == 1
+    assert counts["Var s"] == 3 and counts["Assign i"] == 3
+
+
+def test_hooks_with_limits():
+    defined, iterations = [], []
+    lox = Lox(limits=Limits(max_string_length=5, max_steps=50))
+    lox.interpreter.add_hook("define", lambda name, value, env: defined.append(value))
+    lox.interpreter.add_hook("loop_iteration", lambda stmt, env: iterations.append(stmt))
+    with pytest.raises(LoxLimitError, match="5 characters"):
+        lox.interpreter.interpret(lox.compile('var s = "aaaaaaaaaaaaaaaaaa"; print s;'))
+    with pytest.raises(LoxLimitError, match="50 steps"):
+        lox.interpreter.interpret(lox.compile("var i = 0; while (true) i = i + 1;"))
+    assert defined == [0.0] and 40 < len(iterations) < 50
@@ -0,0 +1,41 @@
+import copy
+import pickle
+
+import pytest
+
+from pylox.lox import Lox
+from pylox.grammar.literals import LoxBool, LoxNil, TRUE, FALSE, NIL
+from pylox.util.helpers import is_truthy, is_equal
+
+
+def test_singletons():
+    assert LoxBool(True) is TRUE and LoxBool(1) is TRUE
+    assert LoxBool(False) is FALSE and LoxBool() is FALSE
+    assert LoxNil() is NIL
+    assert copy.deepcopy(TRUE) is TRUE and pickle.loads(pickle.dumps(NIL)) is NIL
+
+
+def test_truthiness():
+    assert not is_truthy(NIL) and not is_truthy(FALSE)
+    assert is_truthy(TRUE) and is_truthy(0.0) and is_truthy("")
+
+
+def test_equality():
+    assert is_equal(NIL, NIL) is TRUE
+    assert is_equal(TRUE, TRUE) is TRUE and is_equal(TRUE, FALSE) is FALSE
+    assert is_equal(1.0, 1.0) is TRUE and is_equal(float("nan"), float("nan")) is FALSE
+    assert is_equal(1.0, TRUE) is FALSE and is_equal("a", "a") is TRUE
+
+
+@pytest.mark.parametrize("backend", ["tree", "closure", "vm"])
+@pytest.mark.parametrize("source, expected", [
+    ("print 1 != 2; print 1 != 1;", "true\nfalse\n"),
+    ("print !true; print !nil; print !0;", "false\ntrue\nfalse\n"),
+    ('if (!false) print "yes";', "yes\n"),
+    ("print 1 < 2; print 2 <= 1; print nil == nil; print nan == nan;", "true\nfalse\ntrue\nfalse\n"),
+])
+def test_boolean_results(capsys, backend, source, expected):
+    Lox.run_inline(source, backend=backend, optimize=False)
+    assert capsys.readouterr().out == expected
+    Lox.run_inline(source, backend=backend)
+    assert capsys.readouterr().out == expected
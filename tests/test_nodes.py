@@ -0,0 +1,28 @@
+from dataclasses import fields
+
+import pytest
+
+from pylox.lexer import Lexer
+from pylox.parser import Parser
+from pylox.util.dot import dot_diagram
+from pylox.grammar import expr, stmt
+
+
+NODE_CLASSES = [cls for module in (expr, stmt) for cls in vars(module).values()
+                if isinstance(cls, type) and cls.__module__ == module.__name__
+                and issubclass(cls, (expr.Expr, stmt.Stmt)) and cls not in (expr.Expr, stmt.Stmt)]
+
+
+@pytest.mark.parametrize("cls", NODE_CLASSES, ids=lambda cls: cls.__name__)
+def test_nodes_are_slotted(cls):
+    node = cls.__new__(cls)
+    assert not hasattr(node, "__dict__")
+    # subclasses such as the specialised Binary nodes inherit their slots
+    slots = {slot for base in cls.__mro__ for slot in getattr(base, "__slots__", ())}
+    assert {f.name for f in fields(cls)} <= slots
+
+
+def test_dot_diagram_of_slotted_nodes():
+    stmts = Parser(Lexer("var a = 1; if (a > 0) print -a; else { a = 2; }").scan_tokens()).parse()
+    diagram = dot_diagram(stmts[0], stmts)
+    assert diagram.startswith("digraph G {") and "label = <If>" in diagram
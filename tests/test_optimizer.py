@@ -0,0 +1,93 @@
+import pytest
+
+from pylox.lexer import Lexer
+from pylox.lox import Lox
+from pylox.optimizer import child_fields, optimize
+from pylox.parser import Parser
+from pylox.grammar.expression import Expr, Literal, Variable, Binary
+from pylox.grammar.statement import Stmt, Print, Var, While, Block, If
+
+
+def optimized(source: str):
+    return optimize(Parser(Lexer(source).scan_tokens()).parse())
+
+
+def test_fold_arithmetic():
+    stmt, = optimized("print (1 + 2) * 3 - -4;")
+    assert isinstance(stmt, Print)
+    assert stmt.expression == Literal(13.0)
+
+
+def test_fold_logical():
+    stmt, = optimized('print nil or "a";')
+    assert stmt.expression == Literal("a")
+
+
+def test_runtime_error_not_folded(capsys):
+    stmt, = optimized('print 1 + "a";')
+    assert isinstance(stmt.expression, Binary)
+    Lox.run_inline('print 1 + "a";')
+    assert capsys.readouterr().err == "[line 1] RuntimeError at '+': operands must be both numbers or both strings\n"
+
+
+def test_propagate_chained_constants():
+    stmts = optimized("var n = 10; var m = n * 2; print m + n;")
+    assert isinstance(stmts[1], Var) and stmts[1].initialiser == Literal(20.0)
+    assert stmts[2].expression == Literal(30.0)
+
+
+def test_reassigned_not_propagated():
+    stmts = optimized("var i = 0; while (i < 3) i = i + 1;")
+    assert isinstance(stmts[1], While)
+    assert isinstance(stmts[1].condition.left, Variable)
+
+
+def test_shadowing_respected():
+    block, = optimized("{ var a = 1; { var a = 2; a = 3; print a; } print a; }")
+    inner, outer_print = block.statements[1], block.statements[2]
+    assert isinstance(inner.statements[2].expression, Variable)
+    assert outer_print.expression == Literal(1.0)
+
+
+def test_dead_branches():
+    stmts = optimized("var debug = false; if (debug) print 1; else print 2; while (debug) print 3;")
+    assert len(stmts) == 2
+    assert isinstance(stmts[1], Print) and stmts[1].expression == Literal(2.0)
+
+
+def test_nested_dead_branch_becomes_empty_block():
+    stmt, = optimized("var x = 0; while (x < 1) if (false) print 1;")[1:]
+    assert isinstance(stmt, While) and stmt.body == Block([])
+
+
+def test_live_condition_kept():
+    stmts = optimized("var a = 1; a = 2; if (a) print 1;")
+    assert isinstance(stmts[2], If)
+
+
+@pytest.mark.parametrize("source", [
+    "var a = 1; { print a; var a = 2; print a; } print a;",
+    "for (var i = 0; i < 3; i = i + 1) { var k = 2; print i * k; }",
+    "var a = 1; { var a = a + 1; print a; }",
+    'var s = "a"; { var t = s + "b"; print t; }',
+])
+def test_same_output_as_unoptimized(capsys, source):
+    Lox.run_inline(source, optimize=False)
+    expected = capsys.readouterr()
+    Lox.run_inline(source)
+    assert capsys.readouterr() == expected
+
+
+def test_child_fields():
+    assert child_fields(Binary) == (("left", Expr), ("right", Expr))
+    assert child_fields(Var) == (("initialiser", Expr),)
+    assert child_fields(If) == (("condition", Expr), ("then_branch", Stmt), ("else_branch", Stmt))
+    assert child_fields(Block) == (("statements", list),)
+
+
+def test_visit_methods_found_through_subclasses():
+    lox = Lox(optimize=False)
+    stmts = lox.compile("var a = 1; print a + 2;")
+    lox.execute(stmts)
+    assert type(stmts[1].expression) is not Binary
+    assert optimize(stmts)[1].expression == Literal(3.0)
@@ -0,0 +1,48 @@
+import io
+
+import pytest
+
+from pylox.lox import Lox
+from pylox.output import OutputSink
+
+
+@pytest.mark.parametrize("backend", ["tree", "closure", "vm"])
+def test_capture(capsys, backend):
+    output = OutputSink.capture()
+    lox = Lox(backend=backend, output=output)
+    lox.run('print 1; repr "a"; { print "b"; }')
+    assert output.getvalue() == '1\n"a"\nb\n'
+    assert capsys.readouterr().out == ""
+
+
+def test_buffered_until_flush():
+    stream = io.StringIO()
+    output = OutputSink(stream, buffer_size=10)
+    output.writeline("abc")
+    assert stream.getvalue() == ""
+    output.writeline("defghi")
+    assert stream.getvalue() == "abc\ndefghi\n"
+    output.writeline("j")
+    output.flush()
+    assert stream.getvalue() == "abc\ndefghi\nj\n"
+
+
+def test_unbuffered():
+    stream = io.StringIO()
+    output = OutputSink(stream, buffer_size=0)
+    output.writeline("a")
+    assert stream.getvalue() == "a\n"
+
+
+@pytest.mark.parametrize("backend", ["tree", "closure", "vm"])
+def test_flushed_before_error(capsys, backend):
+    output = OutputSink.capture(buffer_size=1 << 20)
+    lox = Lox(backend=backend, output=output)
+    lox.run('print "before"; print 1 + nil; print "after";')
+    assert output.stream.getvalue() == "before\n"
+    assert "RuntimeError" in capsys.readouterr().err
+
+
+def test_default_sink_writes_to_current_stdout(capsys):
+    Lox.run_inline("print 1; print 2;")
+    assert capsys.readouterr().out == "1\n2\n"
@@ -0,0 +1,55 @@
+import pytest
+
+from pylox.lexer import Lexer
+from pylox.parser import Parser
+from pylox.grammar.expression import Assign, Binary, Grouping, Literal, Logical, Unary, Variable
+from pylox.util.exceptions import LoxSyntaxError
+
+
+def expression(source: str):
+    return Parser(Lexer(f"{source};").scan_tokens()).parse()[0].expression
+
+
+def shape(expr) -> str:
+    if isinstance(expr, (Binary, Logical)):
+        return f"({shape(expr.left)} {expr.operator.lexeme} {shape(expr.right)})"
+    elif isinstance(expr, Unary):
+        return f"({expr.operator.lexeme}{shape(expr.right)})"
+    elif isinstance(expr, Grouping):
+        return f"[{shape(expr.expression)}]"
+    elif isinstance(expr, Assign):
+        return f"({expr.name.lexeme} = {shape(expr.value)})"
+    elif isinstance(expr, Variable):
+        return expr.name.lexeme
+    assert isinstance(expr, Literal)
+    return str(expr.value)
+
+
+@pytest.mark.parametrize("source, expected", [
+    ("a - b - c", "((a - b) - c)"),
+    ("a = b = c", "(a = (b = c))"),
+    ("a = b or c and d == e < f + g * -h", "(a = (b or (c and (d == (e < (f + (g * (-h))))))))"),
+    ("-a * b % !c", "(((-a) * b) % (!c))"),
+    ("a * (b + c) / --d", "((a * [(b + c)]) / (-(-d)))"),
+    ("(a = b) or c", "([(a = b)] or c)"),
+])
+def test_precedence_and_associativity(source, expected):
+    assert shape(expression(source)) == expected
+
+
+@pytest.mark.parametrize("source, message", [
+    ("a + b = c", "SyntaxError at '=': Invalid assignment target."),
+    ("(a) = c", "SyntaxError at '=': Invalid assignment target."),
+    ("(a + b", "SyntaxError at ';': Expected ')' after expression."),
+    ("a * ", "SyntaxError at ';': Expected expression."),
+])
+def test_errors(source, message):
+    with pytest.raises(LoxSyntaxError, match=message.replace("(", r"\(").replace(")", r"\)")):
+        expression(source)
+
+
+def test_deep_nesting_does_not_recurse():
+    expr = expression("(" * 100_000 + "-1" + ")" * 100_000)
+    for _ in range(100_000):
+        expr = expr.expression
+    assert isinstance(expr, Unary)
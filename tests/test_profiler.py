@@ -0,0 +1,75 @@
+import io
+
+import pytest
+
+from pylox.lox import Lox
+from pylox.grammar.expression import Binary
+from pylox.profiler import Profiler
+
+
+SOURCE = """var total = 0;
+for (var i = 0; i < 10; i = i + 1) {
+    total = total + i;
+}
+print total;
+"""
+
+
+def test_profile_counts_lines(capsys):
+    profiler = Profiler()
+    Lox.run_inline(SOURCE, profiler=profiler)
+    assert capsys.readouterr().out == "45\n"
+
+    lines = {line: count for line, count, _ in profiler.lines()}
+    assert lines[1] == 1
+    assert lines[2] == 11
+    assert lines[3] == 10
+    assert lines[5] == 1
+
+    stats = [entry for entry in profiler.stats.values() if entry.label == "Binary +" and entry.line == 3]
+    assert len(stats) == 1
+    assert stats[0].count == 10
+    assert stats[0].total >= stats[0].own >= 0
+
+
+def test_profile_matches_unprofiled_output(capsys):
+    source = "var i = 0; while (true) { i = i + 1; if (i > 3) break; print i; } print i;"
+    Lox.run_inline(source)
+    expected = capsys.readouterr()
+    Lox.run_inline(source, profiler=Profiler())
+    assert capsys.readouterr() == expected
+
+
+def test_unprofiled_nodes_are_untouched():
+    lox = Lox()
+    stmts = lox.compile("print 1 + a;")
+    assert type(stmts[0].expression) is Binary
+
+    lox = Lox(profiler=Profiler())
+    stmts = lox.compile("print 1 + a;")
+    lox.profiler.instrument(stmts)
+    assert type(stmts[0].expression) is not Binary
+    assert isinstance(stmts[0].expression, Binary)
+
+
+def test_report():
+    profiler = Profiler()
+    Lox.run_inline("var a = 1;\nprint a;", optimize=False, profiler=profiler)
+    out = io.StringIO()
+    profiler.report(out)
+    assert "Variable a" in out.getvalue()
+
+
+def test_profile_requires_tree_backend():
+    with pytest.raises(ValueError):
+        Lox(backend="vm", profiler=Profiler())
+
+
+def test_labels_of_specialised_nodes(capsys):
+    lox = Lox(optimize=False)
+    stmts = lox.compile("var a = 1; print a + a;")
+    lox.execute(stmts)
+    profiler = Profiler()
+    profiler.instrument(stmts)
+    lox.interpreter.interpret(stmts)
+    assert "Binary +" in {entry.label for entry in profiler.stats.values()}
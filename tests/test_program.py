@@ -0,0 +1,68 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from pylox.lox import Lox
+from pylox.grammar.token import Token, TokenType
+from pylox.output import OutputSink
+from pylox.util.exceptions import LoxRuntimeError, LoxSyntaxError
+
+
+RULE = """
+var score = 0;
+if (age >= 18) score = score + 10;
+if (country == "NZ" and verified) score = score + 5;
+print name + ": " + label;
+"""
+
+
+def get(env, name):
+    return env[Token(TokenType.IDENTIFIER, name, 0)]
+
+
+@pytest.mark.parametrize("backend", ["tree", "closure", "vm"])
+def test_run_many_times(backend):
+    program = Lox(backend=backend).prepare(RULE.replace("label", '"checked"'))
+    records = [
+        {"name": "a", "age": 20, "country": "NZ", "verified": True},
+        {"name": "b", "age": 12, "country": "NZ", "verified": False},
+        {"name": "c", "age": 40.5, "country": "AU", "verified": None},
+    ]
+    output = OutputSink.capture()
+    scores = [get(program.run(record, output=output), "score") for record in records]
+    assert scores == [15.0, 0.0, 10.0]
+    assert output.getvalue() == "a: checked\nb: checked\nc: checked\n"
+
+
+def test_runs_are_isolated():
+    program = Lox().prepare("if (count == nil) count = 0; count = count + 1;")
+    first = program.run({"count": None})
+    assert get(first, "count") == 1.0
+    second = program.run({"count": 5})
+    assert get(second, "count") == 6.0
+    assert get(first, "count") == 1.0
+    with pytest.raises(LoxRuntimeError):
+        program.run()
+
+
+def test_errors_are_raised():
+    with pytest.raises(LoxSyntaxError):
+        Lox().prepare("print (;")
+    program = Lox().prepare("print missing;")
+    with pytest.raises(LoxRuntimeError):
+        program.run(output=OutputSink.capture())
+    with pytest.raises(TypeError):
+        program.run({"missing": [1]})
+
+
+@pytest.mark.parametrize("backend", ["tree", "closure", "vm"])
+def test_shared_between_threads(backend):
+    program = Lox(backend=backend).prepare(
+        'var total = 0; for (var i = 0; i < n; i = i + 1) { var s = "x"; total = total + i; }')
+
+    def run(n):
+        return get(program.run({"n": n}, output=OutputSink.capture()), "total")
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(run, range(200)))
+    assert results == [float(n * (n - 1) // 2) for n in range(200)]
@@ -0,0 +1,62 @@
+import copy
+import pickle
+
+from pylox.lox import Lox
+from pylox.grammar.expression import (Binary, GenericBinary, FloatAdd, FloatDivide, FloatLess, StringConcat, Equal)
+from pylox.instrument import children
+from pylox.profiler import Profiler
+
+
+def binaries(stmts) -> list[Binary]:
+    nodes, found = list(stmts), []
+    while nodes:
+        node = nodes.pop()
+        if isinstance(node, Binary):
+            found.append(node)
+        nodes += children(node)
+    return sorted(found, key=lambda node: node.operator.line)
+
+
+def run(source: str, profiler=None) -> list[Binary]:
+    lox = Lox(optimize=False, profiler=profiler)
+    stmts = lox.compile(source)
+    lox.execute(stmts)
+    return binaries(stmts)
+
+
+def test_nodes_specialise(capsys):
+    nodes = run('var i = 0;\nwhile (i < 3)\ni = i + 1;\nprint "a" + "b";\nprint i == 3;\nprint nil < 1;')
+    assert [type(node) for node in nodes] == [FloatLess, FloatAdd, StringConcat, Equal, GenericBinary]
+    assert capsys.readouterr().out == "ab\ntrue\n"
+
+
+def test_guard_failure_falls_back(capsys):
+    source = 'var x = 1; var i = 0;\nwhile (i < 3) {\nprint x + x;\nx = "a"; i = i + 1; }'
+    nodes = run(source)
+    assert capsys.readouterr().out == "2\naa\naa\n"
+    assert type(nodes[1]) is GenericBinary
+
+
+def test_errors_are_unchanged(capsys):
+    run('var x = 1; var i = 0;\nwhile (i < 2) {\nprint x - 1;\nx = "a"; i = i + 1; }')
+    captured = capsys.readouterr()
+    assert captured.out == "0\n"
+    assert "operand must be a number" in captured.err
+
+
+def test_division_by_zero_stays_specialised(capsys):
+    nodes = run("var x = 1; var i = 0;\nwhile (i < 2) {\nprint 1 / x;\nx = 0; i = i + 1; }")
+    assert capsys.readouterr().out == "1\nnan\n"
+    assert type(nodes[1]) is FloatDivide
+
+
+def test_instrumented_nodes_are_not_specialised(capsys):
+    nodes = run("var i = 0; while (i < 3) i = i + 1;", profiler=Profiler())
+    assert all(type(node).__base__ is Binary for node in nodes)
+
+
+def test_specialised_nodes_copy_as_binary(capsys):
+    node = run("print 1 + 2;")[0]
+    assert type(node) is FloatAdd
+    for clone in (copy.deepcopy(node), pickle.loads(pickle.dumps(node))):
+        assert type(clone) is Binary and repr(clone) == repr(node)
@@ -0,0 +1,91 @@
+import pytest
+
+from pylox.lexer import Lexer
+from pylox.lox import Lox
+from pylox.parser import Parser
+from pylox.resolver import Resolver
+from pylox.grammar.statement import Block, Var, Print
+from pylox.grammar.expression import Variable
+
+
+def resolve(source: str):
+    return Resolver().resolve(Parser(Lexer(source).scan_tokens()).parse())
+
+
+def test_slots_and_depths():
+    outer, = resolve("{ var a = 1; var b = 2; { var c = 3; print a; print c; print d; } }")
+    assert isinstance(outer, Block) and outer.size == 2
+    inner = outer.statements[2]
+    assert inner.size == 1
+    assert isinstance(inner.statements[0], Var) and inner.statements[0].slot == 0
+
+    uses = [stmt.expression for stmt in inner.statements if isinstance(stmt, Print)]
+    assert all(isinstance(use, Variable) for use in uses)
+    assert [(use.depth, use.slot) for use in uses] == [(1, 0), (0, 0), (None, None)]
+
+
+def test_redeclaration_reuses_slot():
+    block, = resolve("{ var a = 1; var a = a + 1; }")
+    assert block.size == 1
+    assert [stmt.slot for stmt in block.statements] == [0, 0]
+
+
+@pytest.mark.parametrize("source, expected", [
+    ("var a = 1; { print a; var a = 2; print a; } print a;", "1\n2\n1\n"),
+    ("var a = 1; { var a = a + 1; print a; }", "2\n"),
+    ("var a = 1; { var b = 0; { a = 3; b = a; } print b; } print a;", "3\n3\n"),
+    ("for (var i = 0; i < 3; i = i + 1) { var j = i * 2; print j; }", "0\n2\n4\n"),
+])
+def test_scoping(capsys, source, expected):
+    Lox.run_inline(source)
+    assert capsys.readouterr().out == expected
+
+
+def test_uninitialised_local(capsys):
+    Lox.run_inline("{ var a; print a; }")
+    assert capsys.readouterr().err == "[line 1] RuntimeError at 'a': Uninitialised variable 'a'.\n"
+
+
+def test_undefined_global_from_block(capsys):
+    Lox.run_inline("{ { b = 1; } }")
+    assert capsys.readouterr().err == "[line 1] RuntimeError at 'b': Undefined variable 'b'.\n"
+
+
+def test_blocks_without_declarations_have_no_frame():
+    outer, = resolve("{ var a = 1; { print a; { a = 2; } } }")
+    assert outer.size == 1
+    inner = outer.statements[1]
+    assert inner.size == 0
+    assert (inner.statements[0].expression.depth, inner.statements[0].expression.slot) == (0, 0)
+
+
+def test_loop_variables_are_hoisted():
+    loop, = resolve("for (var i = 0; i < 3; i = i + 1) { var j = i; { var k = j; print i + k; } }")
+    # the for loop's block holds i, and j and k from the body are hoisted into it
+    assert loop.size == 3
+    body = loop.statements[1].body
+    assert body.size == 0
+    user_body = body.statements[0]
+    assert user_body.size == 0 and user_body.statements[0].slot == 1
+    use = user_body.statements[1].statements[1].expression
+    assert [(v.depth, v.slot) for v in (use.left, use.right)] == [(0, 0), (0, 2)]
+
+
+def test_top_level_loop_body_keeps_its_frame():
+    loop, = resolve("while (true) { var a = 1; while (false) { var b = a; } }")
+    assert loop.body.size == 2
+    assert loop.body.statements[1].body.size == 0
+
+
+@pytest.mark.parametrize("backend", ["tree", "closure"])
+@pytest.mark.parametrize("source, expected", [
+    ("for (var i = 0; i < 3; i = i + 1) { var j; if (i == 1) j = 5; print j; }",
+     "[line 1] RuntimeError at 'j': Uninitialised variable 'j'.\n"),
+    ("for (var i = 0; i < 3; i = i + 1) { var i = i * 10; print i; }", "0\n10\n20\n"),
+    ("{ var t = 0; for (var i = 0; i < 3; i = i + 1) { for (var j = 0; j < 3; j = j + 1) "
+     "{ var k = i * j; t = t + k; } } print t; }", "9\n"),
+])
+def test_hoisted_scoping(capsys, backend, source, expected):
+    Lox.run_inline(source, backend=backend)
+    out, err = capsys.readouterr()
+    assert out + err == expected
@@ -0,0 +1,60 @@
+import pytest
+
+from pylox.lox import Lox
+from pylox.grammar.literals import LoxRope
+from pylox.util.helpers import concat, is_equal, to_str, to_repr, ROPE_THRESHOLD
+from pylox.grammar.literals import TRUE, FALSE
+
+
+LONG = "x" * ROPE_THRESHOLD
+
+
+def test_short_concatenation_stays_str():
+    assert type(concat("a", "b")) is str
+
+
+def test_long_concatenation_is_deferred():
+    rope = concat(LONG, "a")
+    assert type(rope) is LoxRope
+    rope = concat(concat(rope, "b"), concat(LONG, "c"))
+    assert type(rope) is LoxRope
+    assert rope.flatten() == LONG + "ab" + LONG + "c"
+    assert len(rope) == len(rope.flatten())
+
+
+def test_branching_ropes_are_independent():
+    base = concat(LONG, "-")
+    first = concat(base, "first")
+    second = concat(base, "second")
+    third = concat(first, "!")
+    assert to_str(base) == LONG + "-"
+    assert to_str(first) == LONG + "-first"
+    assert to_str(second) == LONG + "-second"
+    assert to_str(third) == LONG + "-first!"
+    # appending after flattening still works
+    assert to_str(concat(base, "again")) == LONG + "-again"
+
+
+def test_observers():
+    rope = concat(LONG, "a")
+    assert to_repr(rope) == f'"{LONG}a"'
+    assert is_equal(rope, LONG + "a") is TRUE
+    assert is_equal(LONG + "a", rope) is TRUE
+    assert is_equal(rope, concat(LONG, "a")) is TRUE
+    assert is_equal(rope, LONG) is FALSE
+    assert rope == LONG + "a" and hash(rope) == hash(LONG + "a")
+
+
+@pytest.mark.parametrize("backend", ["tree", "closure", "vm"])
+def test_string_building(capsys, backend):
+    Lox.run_inline(
+        'var s = ""; var t = ""; for (var i = 0; i < 100; i = i + 1) { s = s + "ab"; if (i == 49) t = s; }'
+        ' print s == t + t; print t; repr s + "!"; print s == "x";',
+        backend=backend)
+    assert capsys.readouterr().out == f'true\n{"ab" * 50}\n"{"ab" * 100}!"\nfalse\n'
+
+
+def test_folded_long_literals_are_str():
+    stmts = Lox().compile(f'print "{LONG}" + "{LONG}";')
+    assert stmts[0].expression.value == LONG * 2
+    assert type(stmts[0].expression.value) is str
@@ -0,0 +1,60 @@
+import io
+
+import pytest
+
+from pylox.lexer import Lexer
+from pylox.lox import Lox
+from pylox.parser import Parser
+from pylox.grammar.statement import Print
+
+
+SCRIPT = """\
+var total = 0;
+for (var i = 0; i < 5; i = i + 1) {
+    total = total + i;
+}
+print total;
+print "a
+b";
+"""
+
+
+def test_chunked_lexer_matches_full_source():
+    expected = [(t.type, t.lexeme, t.line) for t in Lexer(SCRIPT).scan_tokens()]
+    for chunk_size in (1, 2, 5, 64):
+        tokens = Lexer.from_file(io.StringIO(SCRIPT), chunk_size=chunk_size).iter_tokens()
+        assert [(t.type, t.lexeme, t.line) for t in tokens] == expected
+
+
+def test_parser_pulls_tokens_on_demand():
+    consumed = []
+
+    def tokens():
+        for token in Lexer("print 1; print 2;").scan_tokens():
+            consumed.append(token)
+            yield token
+
+    statements = Parser(tokens()).parse_iter()
+    assert isinstance(next(statements), Print)
+    # the first statement and one token of lookahead
+    assert len(consumed) == 4
+
+
+@pytest.mark.parametrize("backend", ["tree", "vm"])
+def test_stream_matches_run(tmp_path, capsys, backend):
+    path = tmp_path / "script.lox"
+    path.write_text(SCRIPT)
+    Lox.run_file(path, backend=backend)
+    expected = capsys.readouterr()
+    Lox.run_file(path, backend=backend, stream=True)
+    assert capsys.readouterr() == expected
+
+
+def test_stream_runs_before_syntax_error(tmp_path, capsys):
+    path = tmp_path / "script.lox"
+    path.write_text("print 1;\nprint 2;\nprint ;\nprint 3;\n")
+    with pytest.raises(SystemExit):
+        Lox.run_file(path, stream=True)
+    captured = capsys.readouterr()
+    assert captured.out == "1\n2\n"
+    assert captured.err == "[line 3] SyntaxError at ';': Expected expression.\n"
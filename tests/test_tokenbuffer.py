@@ -0,0 +1,35 @@
+from pylox.lexer import Lexer
+from pylox.parser import Parser
+from pylox.grammar.token import TokenType
+
+
+SOURCE = 'var abc = 1.5;\nprint abc + "x\ny" + nan; // comment\n{ var d = abc; }'
+
+
+def fields(tokens):
+    return [(t.type, t.lexeme, t.line, repr(t.literal)) for t in tokens]
+
+
+def test_buffer_matches_token_list():
+    buffer = Lexer(SOURCE).scan_buffer()
+    tokens = Lexer(SOURCE).scan_tokens()
+    assert len(buffer) == len(tokens)
+    assert fields(buffer) == fields(tokens)
+    assert buffer.type(0) is TokenType.VAR
+    assert buffer.lexeme(1) == "abc" and buffer.literal(3) == 1.5 and buffer.line(len(buffer) - 1) == 4
+
+
+def test_identifiers_interned():
+    first, second = [t for t in Lexer("abc; abc;").scan_tokens() if t.type is TokenType.IDENTIFIER]
+    assert first.lexeme is second.lexeme
+    buffer = Lexer("abc; abc;").scan_buffer()
+    assert buffer.lexeme(0) is buffer.lexeme(2) is first.lexeme
+
+
+def test_parser_accepts_buffer():
+    assert repr(Parser(Lexer(SOURCE).scan_buffer()).parse()) == repr(Parser(Lexer(SOURCE).scan_tokens()).parse())
+
+
+def test_buffer_is_compact():
+    buffer = Lexer(SOURCE * 100).scan_buffer()
+    assert buffer.nbytes == 13 * len(buffer)